@@ -0,0 +1,447 @@
+"""
+批量报告生成模块
+
+对一个目录或清单文件中的所有盘查清册 xlsx 批量生成报告：
+- 使用进程池在多个 CPU 核心上并行（数据提取和文档后处理都是纯 Python 的 CPU 密集型计算）
+- 每个任务有独立的超时限制，失败互不影响，输出日志写入各自的 .log 文件
+- 工作进程异常退出（段错误、被 OOM 杀掉等）时只把导致崩溃的任务记为失败，
+  其余未完成的任务在新的进程池中重新执行
+- 结束后汇总成功/失败数量、吞吐量和各阶段耗时
+
+清单文件格式：
+- .json：列表，元素为 xlsx 路径字符串或 {"xlsx": "...", "output": "..."}
+- 其他：文本文件，每行一个 xlsx 路径，可用制表符分隔指定输出路径，# 开头为注释
+清单中的相对路径相对于清单文件所在目录。
+"""
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from report_logging import configure_logging
+
+logger = logging.getLogger('report.batch')
+
+# 主进程检查运行中任务的间隔（秒）
+_POLL_SECONDS = 0.5
+# 任务超过时间限制后，再等待多久仍未结束就由主进程强制结束工作进程（秒）
+_KILL_GRACE_SECONDS = 10.0
+
+
+@dataclass
+class BatchJob:
+    """单个报告生成任务"""
+    xlsx_path: str
+    output_path: str
+
+
+@dataclass
+class JobResult:
+    """单个任务的执行结果"""
+    xlsx_path: str
+    output_path: str
+    status: str                      # ok / failed / timeout
+    seconds: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    log_path: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+
+class JobTimeout(BaseException):
+    """任务超过时间限制（继承 BaseException，避免被生成流程中的 except Exception 吞掉）"""
+
+
+def _output_for(xlsx_path: str, output_dir: str, used: set) -> str:
+    """按 xlsx 文件名生成输出路径，重名时追加序号"""
+    stem = os.path.splitext(os.path.basename(xlsx_path))[0]
+    name = f"{stem}.docx"
+    suffix = 2
+    while name in used:
+        name = f"{stem}_{suffix}.docx"
+        suffix += 1
+    used.add(name)
+    return os.path.join(output_dir, name)
+
+
+def collect_jobs(source: str, output_dir: str) -> List[BatchJob]:
+    """
+    从目录或清单文件收集任务
+
+    Args:
+        source: 包含 xlsx 的目录，或清单文件路径
+        output_dir: 报告输出目录（清单中未指定输出路径时使用）
+
+    Returns:
+        任务列表（目录模式按文件名排序，清单模式保持清单顺序）
+    """
+    entries = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith('.xlsx') and not name.startswith('~$'):
+                entries.append((os.path.join(source, name), None))
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        if source.lower().endswith('.json'):
+            with open(source, 'r', encoding='utf-8') as fh:
+                items = json.load(fh)
+            for item in items:
+                if isinstance(item, str):
+                    entries.append((item, None))
+                else:
+                    entries.append((item['xlsx'], item.get('output')))
+        else:
+            with open(source, 'r', encoding='utf-8') as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    parts = [p.strip() for p in line.split('\t')]
+                    entries.append((parts[0], parts[1] if len(parts) > 1 and parts[1] else None))
+        entries = [
+            (os.path.join(base_dir, xlsx), os.path.join(base_dir, out) if out else None)
+            for xlsx, out in entries
+        ]
+
+    used = set()
+    jobs = []
+    for xlsx_path, output_path in entries:
+        if output_path is None:
+            output_path = _output_for(xlsx_path, output_dir, used)
+        jobs.append(BatchJob(xlsx_path, output_path))
+    return jobs
+
+
+def _log_path_for(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + '.log'
+
+
+@contextmanager
+def _time_limit(seconds: Optional[float]):
+    """
+    在当前进程内限制执行时间（依赖 SIGALRM，不支持的平台上不做限制）
+
+    SIGALRM 的处理函数只在 Python 字节码之间执行，无法中断卡在 C 扩展（lxml、zipfile
+    解压等）内部的调用；这种情况由 run_batch 在主进程中强制结束工作进程。
+    """
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def handle_alarm(signum, frame):
+        raise JobTimeout(f"超过时间限制 {seconds} 秒")
+
+    previous = signal.signal(signal.SIGALRM, handle_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_job(job: BatchJob, template_path: str = "template.docx",
+            timeout: Optional[float] = None, use_cache: bool = True,
+            profile: bool = False, log_level: Union[int, str] = logging.INFO) -> JobResult:
+    """
+    执行单个任务（在进程池的工作进程中运行），异常不会向外抛出
+
+    报告生成过程的日志（log_level 级别）写入与报告同名的 .log 文件；
+    profile 为 True 时剖析结果写入与报告同名的 .profile.json 文件。
+    """
+    from main import generate_report_from_xlsx, profile_path_for
+
+    # 工作进程不一定继承主进程的日志配置（spawn 方式启动时），在这里重新配置
+    configure_logging(log_level)
+
+    output_dir = os.path.dirname(os.path.abspath(job.output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    log_path = _log_path_for(job.output_path)
+
+    result = JobResult(job.xlsx_path, job.output_path, 'ok', log_path=log_path)
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        try:
+            with redirect_stdout(log), redirect_stderr(log), _time_limit(timeout):
+                generate_report_from_xlsx(
+                    xlsx_path=job.xlsx_path,
+                    template_path=template_path,
+                    output_path=job.output_path,
+                    use_cache=use_cache,
+                    timings=result.timings,
+                    profile_path=profile_path_for(job.output_path) if profile else None,
+                )
+        except JobTimeout as e:
+            result.status = 'timeout'
+            result.error = str(e)
+        except Exception as e:
+            result.status = 'failed'
+            result.error = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=log)
+    result.seconds = time.perf_counter() - start
+
+    # 无法在进程内中断的平台上，超时的任务在完成后标记
+    if result.ok and timeout and result.seconds > timeout:
+        result.status = 'timeout'
+        result.error = f"超过时间限制 {timeout} 秒（耗时 {result.seconds:.1f} 秒）"
+    return result
+
+
+# 工作进程中：任务开始时向主进程报告 (任务序号, 进程号, 开始时间)
+_STARTED_QUEUE = None
+
+
+def _init_worker(started_queue):
+    global _STARTED_QUEUE
+    _STARTED_QUEUE = started_queue
+
+
+def _run_reported_job(index: int, job: BatchJob, *args) -> JobResult:
+    """报告任务开始后执行 run_job（主进程据此得知崩溃时哪些任务正在执行）"""
+    if _STARTED_QUEUE is not None:
+        _STARTED_QUEUE.put((index, os.getpid(), time.time()))
+    return run_job(job, *args)
+
+
+def _kill_worker(pid: int):
+    try:
+        os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+    except OSError:
+        pass
+
+
+def _run_pool(jobs: List[BatchJob], indices: List[int], workers: int, job_args: tuple,
+              timeout: Optional[float], on_result: Callable[[int, JobResult], None]
+              ) -> Tuple[Set[int], Set[int]]:
+    """
+    在一个新的进程池中执行 indices 中的任务，每个任务结束时调用 on_result(序号, 结果)
+
+    超过时间限制 _KILL_GRACE_SECONDS 秒后仍未结束的任务（卡在 C 扩展中，SIGALRM 无法中断）
+    由主进程结束其工作进程并记为超时；这会使进程池崩溃，其余任务按崩溃处理。
+
+    Returns:
+        (进程池崩溃时正在执行且没有结果的任务, 尚未开始的任务)，进程池正常结束时均为空
+    """
+    context = multiprocessing.get_context()
+    started_queue = context.SimpleQueue()
+    running: Dict[int, Tuple[int, float]] = {}       # 序号 -> (进程号, 开始时间)
+    finished: Set[int] = set()
+    killed: Dict[int, float] = {}                    # 序号 -> 开始时间
+    broken = False
+
+    def drain_started():
+        while not started_queue.empty():
+            index, pid, started_at = started_queue.get()
+            if index not in finished:
+                running[index] = (pid, started_at)
+
+    def finish(index: int, result: JobResult):
+        finished.add(index)
+        running.pop(index, None)
+        on_result(index, result)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(started_queue,)) as pool:
+        futures = {pool.submit(_run_reported_job, i, jobs[i], *job_args): i for i in indices}
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            drain_started()
+            for future in done:
+                i = futures[future]
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    # 进程池已崩溃，该任务是否为元凶在所有任务结束后判断
+                    broken = True
+                    continue
+                except Exception as e:
+                    job = jobs[i]
+                    result = JobResult(job.xlsx_path, job.output_path, 'failed',
+                                       error=f"{type(e).__name__}: {e}",
+                                       log_path=_log_path_for(job.output_path))
+                finish(i, result)
+
+            if timeout and not broken:
+                now = time.time()
+                for i, (pid, started_at) in running.items():
+                    if i not in killed and now - started_at > timeout + _KILL_GRACE_SECONDS:
+                        logger.warning("[批量] %s 超时后仍未结束，强制结束工作进程 %s",
+                                       os.path.basename(jobs[i].xlsx_path), pid)
+                        killed[i] = started_at
+                        _kill_worker(pid)
+
+    drain_started()
+    for i, started_at in killed.items():
+        if i not in finished:
+            job = jobs[i]
+            finish(i, JobResult(job.xlsx_path, job.output_path, 'timeout',
+                                seconds=time.time() - started_at,
+                                error=f"超过时间限制 {timeout} 秒，工作进程已被强制结束",
+                                log_path=_log_path_for(job.output_path)))
+    if killed:
+        # 崩溃由主进程强制结束超时任务引起，其余正在执行的任务没有责任，直接重新执行
+        return set(), {i for i in indices if i not in finished}
+    crashed = set(running) - finished
+    unstarted = {i for i in indices if i not in finished and i not in crashed}
+    return crashed, unstarted
+
+
+def run_batch(jobs: List[BatchJob], workers: Optional[int] = None,
+              template_path: str = "template.docx", timeout: Optional[float] = None,
+              use_cache: bool = True, profile: bool = False,
+              log_level: Union[int, str] = logging.INFO) -> List[JobResult]:
+    """
+    使用进程池并行执行所有任务
+
+    工作进程异常退出会使整个进程池崩溃，此时：
+    - 崩溃时正在执行的任务逐个在单独的进程池中重新执行，再次崩溃的任务记为失败
+      （同一时刻可能有多个任务在执行，无法直接判断是哪一个导致的崩溃）
+    - 尚未开始的任务在新的进程池中继续执行
+
+    Args:
+        jobs: 任务列表
+        workers: 工作进程数（默认 CPU 核心数）
+        template_path: Word 模板文件路径
+        timeout: 单个任务的时间限制（秒），None 表示不限制。工作进程内通过 SIGALRM 中断；
+            卡在 C 扩展中无法中断的任务，超时 _KILL_GRACE_SECONDS 秒后由主进程结束工作进程
+        use_cache: 是否使用提取结果的磁盘缓存
+        profile: 是否为每个任务输出剖析结果
+        log_level: 各任务 .log 文件的日志级别
+
+    Returns:
+        与 jobs 顺序一致的结果列表
+    """
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    job_args = (template_path, timeout, use_cache, profile, log_level)
+
+    def on_result(i: int, result: JobResult):
+        results[i] = result
+        logger.info("[批量] [%s/%s] %s %s (%.1fs)",
+                    sum(r is not None for r in results), len(jobs),
+                    result.status, os.path.basename(jobs[i].xlsx_path), result.seconds)
+
+    def crash_result(i: int) -> JobResult:
+        job = jobs[i]
+        return JobResult(job.xlsx_path, job.output_path, 'failed', error="工作进程异常退出",
+                         log_path=_log_path_for(job.output_path))
+
+    pending = list(range(len(jobs)))
+    while pending:
+        crashed, unstarted = _run_pool(jobs, pending, workers, job_args, timeout, on_result)
+        if crashed:
+            logger.warning("[批量] 工作进程异常退出，逐个重新执行崩溃时正在执行的 %s 个任务",
+                           len(crashed))
+        for i in sorted(crashed):
+            again, not_run = _run_pool(jobs, [i], 1, job_args, timeout, on_result)
+            if again or not_run:
+                on_result(i, crash_result(i))
+        if not crashed and len(unstarted) == len(pending):
+            # 进程池没有执行任何任务就崩溃（如工作进程无法启动），不再重试
+            for i in sorted(unstarted):
+                on_result(i, crash_result(i))
+            break
+        pending = sorted(unstarted)
+    return results
+
+
+def summarize(results: List[JobResult], wall_seconds: float) -> Dict[str, object]:
+    """
+    汇总批量执行结果
+
+    Returns:
+        包含数量、总耗时、吞吐量（份/分钟）和各阶段平均耗时的字典
+    """
+    succeeded = [r for r in results if r.ok]
+    stage_totals: Dict[str, float] = {}
+    for r in succeeded:
+        for stage, seconds in r.timings.items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+    return {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': sum(r.status == 'failed' for r in results),
+        'timed_out': sum(r.status == 'timeout' for r in results),
+        'wall_seconds': wall_seconds,
+        'reports_per_minute': len(succeeded) / wall_seconds * 60 if wall_seconds > 0 else 0.0,
+        'stage_mean_seconds': {
+            stage: total / len(succeeded) for stage, total in stage_totals.items()
+        },
+    }
+
+
+def print_summary(results: List[JobResult], summary: Dict[str, object]):
+    """打印批量执行汇总"""
+    logger.info("\n" + "=" * 50)
+    logger.info("[批量] 共 %s 个任务：成功 %s，失败 %s，超时 %s",
+                summary['total'], summary['succeeded'], summary['failed'], summary['timed_out'])
+    logger.info("[批量] 总耗时 %.1f 秒，吞吐量 %.1f 份/分钟", summary['wall_seconds'], summary['reports_per_minute'])
+    if summary['stage_mean_seconds']:
+        stages = "，".join(f"{stage} {seconds:.2f}s"
+                          for stage, seconds in summary['stage_mean_seconds'].items())
+        logger.info("[批量] 各阶段平均耗时（成功任务）：%s", stages)
+    for r in results:
+        if not r.ok:
+            log_hint = f"（日志: {r.log_path}）" if r.log_path else ""
+            logger.warning("[批量] %s: %s - %s%s", r.status, r.xlsx_path, r.error, log_hint)
+    logger.info("=" * 50)
+
+
+def generate_reports(source: str, output_dir: str = "reports", workers: Optional[int] = None,
+                     template_path: str = "template.docx", timeout: Optional[float] = None,
+                     use_cache: bool = True, profile: bool = False,
+                     log_level: Union[int, str] = logging.INFO) -> List[JobResult]:
+    """
+    批量生成报告（收集任务 -> 并行执行 -> 打印汇总）
+
+    Args:
+        source: 包含 xlsx 的目录，或清单文件路径
+        output_dir: 报告输出目录
+        workers: 工作进程数（默认 CPU 核心数）
+        template_path: Word 模板文件路径
+        timeout: 单个任务的时间限制（秒）
+        use_cache: 是否使用提取结果的磁盘缓存
+        profile: 是否为每个任务输出剖析结果（<报告名>.profile.json）
+        log_level: 各任务 .log 文件的日志级别
+
+    Returns:
+        每个任务的执行结果
+    """
+    jobs = collect_jobs(source, output_dir)
+    if not jobs:
+        logger.info("[批量] 未找到任何 xlsx 文件: %s", source)
+        return []
+
+    logger.info("[批量] 共 %s 个任务，输出目录: %s", len(jobs), output_dir)
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=workers, template_path=template_path,
+                        timeout=timeout, use_cache=use_cache, profile=profile,
+                        log_level=log_level)
+    print_summary(results, summarize(results, time.perf_counter() - start))
+    return results
+
+
+__all__ = [
+    'BatchJob',
+    'JobResult',
+    'JobTimeout',
+    'collect_jobs',
+    'generate_reports',
+    'print_summary',
+    'run_batch',
+    'run_job',
+    'summarize',
+]
@@ -0,0 +1,7 @@
+"""
+基准测试
+
+- scaled_workbooks: 按真实工作簿布局生成放大 N 倍的工作簿
+- synthetic_workbook: 以真实工作簿为结构样板生成可配置规模的合成工作簿
+- run: 逐阶段计时的运行器（python -m benchmarks.run），结果写入 JSON 供对比
+"""
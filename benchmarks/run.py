@@ -0,0 +1,328 @@
+"""
+基准测试运行器
+
+对仓库自带的真实工作簿（及其放大版本）逐阶段计时：
+- openpyxl.load_workbook、WorkbookIndex.from_workbook
+- TableFingerprint.identify（逐个工作表）
+- 各专项读取器的 extract / extract_all、ProtocolExtractor.extract_from_sheet
+- ExcelDataReaderRefactored.get_all_context（完整提取）
+- prepare_context_with_formatting、build_render_context
+- load_template、template.render
+- 渲染后的各后处理函数、保存
+
+用法（在项目根目录运行）：
+    python -m benchmarks.run                                # 两个自带工作簿，1/10/100 倍
+    python -m benchmarks.run test_data.xlsx --scales 1,10 --repeat 5 --output bench.json
+    python -m benchmarks.run --compare base.json --output new.json
+
+结果写入 JSON（每个阶段的每次耗时及最小值/中位数/平均值），--compare 与之前的结果对比中位数。
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import openpyxl
+
+from benchmarks.scaled_workbooks import DEFAULT_SCALED_DIR, count_rows, scaled_workbook_path
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_WORKBOOKS = (
+    'test_data.xlsx',
+    'DY-GHG-2026-01 大冶特殊钢-温室气体盘查清册-Update 20260317Protocol-tr-0408.xlsx',
+)
+DEFAULT_SCALES = (1, 10, 100)
+
+# (阶段名称, 读取器类名, 方法名)
+READER_STAGES = (
+    ('BasicInfoReader.extract', 'BasicInfoReader', 'extract'),
+    ('Scope1Reader.extract_all', 'Scope1Reader', 'extract_all'),
+    ('Scope2Reader.extract_all', 'Scope2Reader', 'extract_all'),
+    ('Scope3Reader.extract_all', 'Scope3Reader', 'extract_all'),
+    ('EmissionFactorReader.extract_all', 'EmissionFactorReader', 'extract_all'),
+    ('ActivitySummaryReader.extract_table1_table2_data', 'ActivitySummaryReader',
+     'extract_table1_table2_data'),
+    ('ReductionActionReader.extract', 'ReductionActionReader', 'extract'),
+)
+
+
+class StageTimer:
+    """收集每个阶段的多次耗时"""
+
+    def __init__(self):
+        self.runs: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        self.runs.setdefault(name, []).append(seconds)
+
+    def time(self, name: str, func: Callable, *args, **kwargs):
+        """调用 func 并记录耗时，返回 func 的结果"""
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(name, time.perf_counter() - start)
+        return result
+
+    def to_dict(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {
+                'runs': [round(s, 6) for s in runs],
+                'min': round(min(runs), 6),
+                'median': round(statistics.median(runs), 6),
+                'mean': round(statistics.mean(runs), 6),
+            }
+            for name, runs in self.runs.items()
+        }
+
+
+def _bench_extraction(timer: StageTimer, xlsx_path: str):
+    """数据提取各阶段（与报告生成一致，使用只读模式加载）"""
+    from data_reader import readers
+    from data_reader.extractor import ProtocolExtractor
+    from data_reader.fingerprint import TableFingerprint
+    from data_reader.workbook_index import WorkbookIndex
+
+    workbook = timer.time('openpyxl.load_workbook', openpyxl.load_workbook,
+                          xlsx_path, read_only=True, data_only=True)
+    index = timer.time('WorkbookIndex.from_workbook', WorkbookIndex.from_workbook, workbook, xlsx_path)
+    workbook.close()
+
+    # 逐个工作表识别（新的识别器，不受缓存影响）
+    fingerprint = TableFingerprint()
+    identified = []
+    total = 0.0
+    for sheet in index.worksheets:
+        start = time.perf_counter()
+        protocol_name = fingerprint.identify(sheet, sheet.title)
+        elapsed = time.perf_counter() - start
+        timer.add(f'TableFingerprint.identify[{sheet.title}]', elapsed)
+        total += elapsed
+        if protocol_name:
+            identified.append((sheet, protocol_name))
+    timer.add('TableFingerprint.identify', total)
+
+    # 各读取器单独计时（每个读取器使用新的识别器）
+    for stage_name, class_name, method_name in READER_STAGES:
+        reader = getattr(readers, class_name)(workbook, index, TableFingerprint())
+        timer.time(stage_name, getattr(reader, method_name))
+
+    extractor = ProtocolExtractor()
+    start = time.perf_counter()
+    for sheet, protocol_name in identified:
+        if protocol_name != 'EmissionFactorProtocol':
+            extractor.extract_from_sheet(sheet, protocol_name)
+    timer.add('ProtocolExtractor.extract_from_sheet', time.perf_counter() - start)
+
+
+def _full_context(timer: StageTimer, xlsx_path: str) -> dict:
+    """完整提取（含加载），返回提取结果"""
+    from data_reader import ExcelDataReaderRefactored
+
+    def extract():
+        reader = ExcelDataReaderRefactored(xlsx_path, read_only=True)
+        try:
+            return reader.get_all_context()
+        finally:
+            reader.close()
+
+    return timer.time('ExcelDataReaderRefactored.get_all_context', extract)
+
+
+def _bench_report(timer: StageTimer, context: dict, template_path: str):
+    """展示层准备、渲染和后处理各阶段（与 main._generate_report_from_xlsx 的顺序一致）"""
+    import main
+    from document_index import DocumentIndex
+
+    timer.time('prepare_context_with_formatting', main.prepare_context_with_formatting, context)
+    render_context = timer.time('build_render_context', main.build_render_context, context)
+
+    template = timer.time('load_template', main.load_template, template_path)
+    timer.time('template.render', template.render, render_context, template.jinja_env)
+
+    doc = template.docx
+    index = timer.time('DocumentIndex', DocumentIndex, doc)
+    timer.time('clean_excessive_blank_lines', main.clean_excessive_blank_lines, doc, index=index)
+    timer.time('clean_empty_category_tables_v2', main.clean_empty_category_tables_v2,
+               doc, context, index=index)
+    timer.time('fix_scope3_category_headers', main.fix_scope3_category_headers, doc, index=index)
+
+    def merge_main_tables():
+        for table in index.tables[:2]:
+            main.merge_vertical_cells(table, 0)
+            index.table_changed(table)
+
+    timer.time('merge_vertical_cells', merge_main_tables)
+    timer.time('merge_other_tables_vertical_cells', main.merge_other_tables_vertical_cells,
+               doc, context, index=index)
+    timer.time('template.save', template.save, io.BytesIO())
+
+
+def bench_workbook(xlsx_path: str, template_path: str, repeat: int,
+                   include_report: bool = True) -> Dict[str, Dict[str, object]]:
+    """
+    对一个工作簿运行 repeat 次全部阶段
+
+    Returns:
+        阶段名称 -> 统计信息
+    """
+    timer = StageTimer()
+    for _ in range(repeat):
+        _bench_extraction(timer, xlsx_path)
+        context = _full_context(timer, xlsx_path)
+        if include_report:
+            _bench_report(timer, context, template_path)
+    return timer.to_dict()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(workbooks: List[str], scales: List[int], repeat: int, template_path: str,
+        include_report: bool = True, scaled_dir: Optional[str] = None) -> Dict[str, object]:
+    """
+    运行基准测试
+
+    Args:
+        workbooks: 真实工作簿路径列表
+        scales: 放大倍数列表（1 表示原始文件）
+        repeat: 每个工作簿的重复次数
+        template_path: Word 模板路径
+        include_report: 是否包含渲染和后处理阶段
+        scaled_dir: 放大工作簿的缓存目录
+
+    Returns:
+        可直接写入 JSON 的结果
+    """
+    results = []
+    for source in workbooks:
+        for scale in scales:
+            print(f"[基准] {os.path.basename(source)} x{scale} ...", flush=True)
+            path = scaled_workbook_path(source, scale, scaled_dir)
+            rows = count_rows(path)
+            stages = bench_workbook(path, template_path, repeat, include_report)
+            results.append({
+                'workbook': os.path.basename(source),
+                'scale': scale,
+                'path': path,
+                'sheets': len(rows),
+                'rows': sum(rows),
+                'stages': stages,
+            })
+            _print_result(results[-1])
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'openpyxl': openpyxl.__version__,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _print_result(result: Dict[str, object]):
+    print(f"  {result['rows']} 行，{result['sheets']} 个工作表")
+    for name, stats in result['stages'].items():
+        if '[' in name:
+            continue  # 逐个工作表的识别耗时只写入 JSON
+        print(f"  {name:<52} {stats['median'] * 1000:>10.1f} ms")
+
+
+def print_scaling(data: Dict[str, object]):
+    """打印各阶段中位数耗时随放大倍数的增长"""
+    by_workbook: Dict[str, List[dict]] = {}
+    for result in data['results']:
+        by_workbook.setdefault(result['workbook'], []).append(result)
+
+    for workbook, results in by_workbook.items():
+        results = sorted(results, key=lambda r: r['scale'])
+        if len(results) < 2:
+            continue
+        base = results[0]
+        print(f"\n[基准] {workbook} 耗时增长（相对 x{base['scale']}）")
+        header = "".join(f"{'x' + str(r['scale']):>12}" for r in results[1:])
+        print(f"  {'阶段':<52}{header}")
+        for name, stats in base['stages'].items():
+            if '[' in name or stats['median'] <= 0:
+                continue
+            ratios = "".join(
+                f"{r['stages'][name]['median'] / stats['median']:>11.1f}x"
+                if name in r['stages'] else f"{'-':>12}"
+                for r in results[1:]
+            )
+            print(f"  {name:<52}{ratios}")
+
+
+def print_comparison(base: Dict[str, object], current: Dict[str, object]):
+    """对比两次结果的中位数耗时（current / base）"""
+    base_results = {(r['workbook'], r['scale']): r for r in base['results']}
+    print(f"\n[基准] 与 {base['meta'].get('git_commit') or base['meta'].get('created')} 对比（中位数）")
+    for result in current['results']:
+        key = (result['workbook'], result['scale'])
+        old = base_results.get(key)
+        if old is None:
+            continue
+        print(f"  {result['workbook']} x{result['scale']}")
+        for name, stats in result['stages'].items():
+            old_stats = old['stages'].get(name)
+            if '[' in name or old_stats is None or old_stats['median'] <= 0:
+                continue
+            ratio = stats['median'] / old_stats['median']
+            print(f"    {name:<50} {old_stats['median'] * 1000:>10.1f} -> "
+                  f"{stats['median'] * 1000:>10.1f} ms  ({ratio:.2f}x)")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="报告生成各阶段的基准测试")
+    parser.add_argument('workbooks', nargs='*', help="工作簿路径（默认使用仓库自带的两个工作簿）")
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help="放大倍数，逗号分隔（默认 1,10,100）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个工作簿的重复次数（默认 3）")
+    parser.add_argument('--template', default=os.path.join(ROOT_DIR, 'template.docx'),
+                        help="Word 模板路径")
+    parser.add_argument('--extract-only', action='store_true', help="只测试数据提取阶段")
+    parser.add_argument('--scaled-dir', default=DEFAULT_SCALED_DIR, help="放大工作簿的缓存目录")
+    parser.add_argument('--output', help="结果 JSON 路径")
+    parser.add_argument('--compare', help="与之前的结果 JSON 对比")
+    args = parser.parse_args(argv)
+
+    # 基准测试期间只保留警告，避免日志输出影响计时
+    from report_logging import configure_logging
+    configure_logging('WARNING')
+
+    workbooks = args.workbooks or [os.path.join(ROOT_DIR, name) for name in DEFAULT_WORKBOOKS]
+    workbooks = [path for path in workbooks if os.path.exists(path)]
+    if not workbooks:
+        parser.error("未找到任何工作簿")
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+
+    data = run(workbooks, scales, args.repeat, args.template,
+               include_report=not args.extract_only, scaled_dir=args.scaled_dir)
+    print_scaling(data)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as fh:
+            print_comparison(json.load(fh), data)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=2)
+        print(f"\n[基准] 结果已写入: {args.output}")
+    return data
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+放大工作簿生成
+
+按真实盘查清册的表格布局生成 N 倍数据量的工作簿，用于观察各阶段耗时随输入规模的增长：
+- 数据行（含数值单元格、且不是合计/总计行）在原位置重复 N 次
+- 表头、标题、合计行及基本信息表保持原样，子表结构（如附表2-EF 的多个子表）不变
+- 合并单元格按行号映射到新位置，跨数据行的纵向合并覆盖所有重复行
+- 只写入单元格值（与 data_only=True 读取的结果一致），不复制样式
+
+生成结果按源文件内容哈希和倍数缓存，重复运行基准测试时直接复用。
+"""
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+# 放大工作簿的默认缓存目录（项目根目录下）
+DEFAULT_SCALED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.bench_workbooks'
+)
+
+# 不放大的工作表（按名称包含关系匹配）
+_FIXED_SHEETS = ('基本信息', '修改日志')
+
+# 含这些关键词的行视为汇总行，不重复
+_SUMMARY_KEYWORDS = ('合计', '总计', '小计', '总排放量')
+
+
+def _is_data_row(values) -> bool:
+    """判断是否为可重复的数据行：至少一个数值单元格，且没有汇总关键词"""
+    has_number = False
+    for value in values:
+        if isinstance(value, str):
+            if any(keyword in value for keyword in _SUMMARY_KEYWORDS):
+                return False
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            has_number = True
+    return has_number
+
+
+def _scale_sheet(source, target, factor: int) -> int:
+    """
+    把 source 工作表的内容放大写入 target
+
+    Returns:
+        写入的行数
+    """
+    # 原行号 -> (新起始行号, 新结束行号)
+    row_map: Dict[int, tuple] = {}
+    new_row = 1
+    for row_idx, values in enumerate(source.iter_rows(values_only=True), start=1):
+        copies = factor if _is_data_row(values) else 1
+        row_map[row_idx] = (new_row, new_row + copies - 1)
+        if any(value is not None for value in values):
+            for offset in range(copies):
+                for col_idx, value in enumerate(values, start=1):
+                    if value is not None:
+                        target.cell(row=new_row + offset, column=col_idx, value=value)
+        new_row += copies
+
+    for merged in source.merged_cells.ranges:
+        start = row_map.get(merged.min_row)
+        end = row_map.get(merged.max_row)
+        if start is None or end is None:
+            continue
+        min_col = get_column_letter(merged.min_col)
+        max_col = get_column_letter(merged.max_col)
+        if merged.max_row == merged.min_row:
+            # 单行内的横向合并：每一份重复行各自合并
+            for row in range(start[0], start[1] + 1):
+                target.merge_cells(f"{min_col}{row}:{max_col}{row}")
+        else:
+            # 跨行的纵向合并：从第一份延伸到最后一份
+            target.merge_cells(f"{min_col}{start[0]}:{max_col}{end[1]}")
+    return new_row - 1
+
+
+def scale_workbook(source_path: str, output_path: str, factor: int) -> Dict[str, int]:
+    """
+    生成放大 factor 倍的工作簿
+
+    Args:
+        source_path: 真实工作簿路径
+        output_path: 输出路径
+        factor: 数据行重复次数
+
+    Returns:
+        工作表名称 -> 写入的行数
+    """
+    source_wb = openpyxl.load_workbook(source_path, data_only=True)
+    target_wb = openpyxl.Workbook()
+    target_wb.remove(target_wb.active)
+
+    rows = {}
+    for source in source_wb.worksheets:
+        target = target_wb.create_sheet(source.title)
+        sheet_factor = 1 if any(name in source.title for name in _FIXED_SHEETS) else factor
+        rows[source.title] = _scale_sheet(source, target, sheet_factor)
+    source_wb.close()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    target_wb.save(tmp_path)
+    os.replace(tmp_path, output_path)
+    return rows
+
+
+def scaled_workbook_path(source_path: str, factor: int,
+                         cache_dir: Optional[str] = None) -> str:
+    """
+    获取放大 factor 倍的工作簿路径（不存在时生成），factor 为 1 时直接返回源文件
+
+    Args:
+        source_path: 真实工作簿路径
+        factor: 放大倍数
+        cache_dir: 生成结果的缓存目录（默认 DEFAULT_SCALED_DIR）
+    """
+    if factor == 1:
+        return source_path
+
+    with open(source_path, 'rb') as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    output_path = os.path.join(cache_dir or DEFAULT_SCALED_DIR, f"{stem[:40]}-{digest}-x{factor}.xlsx")
+    if not os.path.exists(output_path):
+        scale_workbook(source_path, output_path, factor)
+    return output_path
+
+
+def count_rows(xlsx_path: str) -> List[int]:
+    """各工作表的行数（只读模式，不加载样式）"""
+    wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+    try:
+        return [ws.max_row or 0 for ws in wb.worksheets]
+    finally:
+        wb.close()
+
+
+__all__ = ['DEFAULT_SCALED_DIR', 'count_rows', 'scale_workbook', 'scaled_workbook_path']
@@ -0,0 +1,282 @@
+"""
+合成盘查清册工作簿生成
+
+以一个真实的 DY-GHG 盘查清册工作簿为结构样板，生成任意规模的合成工作簿，用于压力测试和回归基准：
+- 保留每个工作表的表头、标题、单位行和合计行（基本信息、附表2-EF 多子表、
+  表1温室气体盘查表、活动数据汇总表的固定排放列、减排措施表等布局不变）
+- 每个数据块（连续的数据行，如 EF 的一个子表）生成指定行数：按样板行循环取样，
+  浮点数随机扰动，名称列追加序号区分
+- 可配置范围三类别数量（超出的类别行不再生成）、纵向合并单元格密度和盘查清册版本数
+
+生成的工作簿可直接交给 ExcelDataReaderRefactored 读取。
+
+用法（在项目根目录运行）：
+    python -m benchmarks.synthetic_workbook synthetic.xlsx --rows 1000 --categories 8 \\
+        --merge-density 0.2 --revisions 3
+"""
+import argparse
+import os
+import random
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 默认结构样板
+DEFAULT_SOURCE = os.path.join(
+    ROOT_DIR, 'DY-GHG-2026-01 大冶特殊钢-温室气体盘查清册-Update 20260317Protocol-tr-0408.xlsx'
+)
+
+# 原样复制的工作表（按名称包含关系匹配）
+_FIXED_SHEETS = ('基本信息', '修改日志')
+
+# 含这些关键词的行视为汇总行，不作为数据行
+_SUMMARY_KEYWORDS = ('合计', '总计', '小计', '总排放量')
+
+_INVENTORY_SHEET = '温室气体盘查清册'
+
+# 编号（如 1.1、3.4.2）
+_CODE_RE = re.compile(r'^\s*\d+(\.\d+)*\.?\s*$')
+# 范围三类别：“类别N”或编号 3.N
+_CATEGORY_RE = re.compile(r'类别\s*(\d+)')
+_SCOPE3_CODE_RE = re.compile(r'^\s*3\.(\d+)')
+
+
+@dataclass
+class SyntheticSpec:
+    """合成工作簿的规模参数"""
+    rows: int = 100                 # 每个数据块生成的数据行数
+    scope3_categories: int = 15     # 范围三类别数量（1~15）
+    merge_density: float = 0.0      # 数据行起始纵向合并段的概率（0~1）
+    inventory_revisions: int = 2    # 盘查清册工作表的版本数
+    seed: int = 0                   # 随机种子（相同参数生成相同的工作簿）
+
+
+def _is_data_row(values: Sequence) -> bool:
+    """数据行：至少一个数值单元格，且没有汇总关键词"""
+    has_number = False
+    for value in values:
+        if isinstance(value, str):
+            if any(keyword in value for keyword in _SUMMARY_KEYWORDS):
+                return False
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            has_number = True
+    return has_number
+
+
+def _scope3_category(values: Sequence) -> Optional[int]:
+    """数据行所属的范围三类别（不属于范围三时为 None）"""
+    for value in values:
+        if not isinstance(value, str):
+            continue
+        match = _SCOPE3_CODE_RE.match(value) or _CATEGORY_RE.search(value)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _name_column(prototypes: List[tuple]) -> Optional[int]:
+    """名称列：样板行中第一个始终为普通文本（非编号、非模板标签）的列"""
+    width = max(len(row) for row in prototypes)
+    for col_idx in range(width):
+        cells = [row[col_idx] if col_idx < len(row) else None for row in prototypes]
+        if all(isinstance(c, str) and len(c.strip()) >= 2 and not _CODE_RE.match(c) and '{' not in c
+               for c in cells):
+            return col_idx
+    return None
+
+
+def _merge_column(prototypes: List[tuple]) -> Optional[int]:
+    """纵向合并的列：第一个始终有文本的列"""
+    width = max(len(row) for row in prototypes)
+    for col_idx in range(width):
+        if all(col_idx < len(row) and isinstance(row[col_idx], str) and '{' not in row[col_idx]
+               for row in prototypes):
+            return col_idx
+    return None
+
+
+class _SheetWriter:
+    """按行写入目标工作表，记录原行号到新行号的映射"""
+
+    def __init__(self, target):
+        self.target = target
+        self.next_row = 1
+        self.row_map: Dict[int, int] = {}
+
+    def write(self, values: Sequence, source_row: Optional[int] = None) -> int:
+        row = self.next_row
+        for col_idx, value in enumerate(values, start=1):
+            if value is not None:
+                self.target.cell(row=row, column=col_idx, value=value)
+        if source_row is not None:
+            self.row_map[source_row] = row
+        self.next_row += 1
+        return row
+
+
+def _synthesize_block(writer: _SheetWriter, prototypes: List[tuple], spec: SyntheticSpec,
+                      rng: random.Random):
+    """按样板行生成一个数据块"""
+    if not prototypes or spec.rows <= 0:
+        return
+    name_col = _name_column(prototypes)
+    merge_col = _merge_column(prototypes)
+
+    first_row = writer.next_row
+    for i in range(spec.rows):
+        values = list(prototypes[i % len(prototypes)])
+        for col_idx, value in enumerate(values):
+            if isinstance(value, float):
+                values[col_idx] = value * rng.uniform(0.5, 1.5)
+        cycle = i // len(prototypes)
+        if cycle and name_col is not None:
+            values[name_col] = f"{values[name_col]}-{cycle + 1}"
+        writer.write(values)
+
+    if merge_col is None or spec.merge_density <= 0:
+        return
+    row = first_row
+    last_row = writer.next_row - 1
+    column = merge_col + 1
+    while row < last_row:
+        if rng.random() < spec.merge_density:
+            end = min(row + rng.randint(1, 3), last_row)
+            anchor = writer.target.cell(row=row, column=column).value
+            for r in range(row + 1, end + 1):
+                writer.target.cell(row=r, column=column).value = None
+            letter = get_column_letter(column)
+            writer.target.merge_cells(f"{letter}{row}:{letter}{end}")
+            writer.target.cell(row=row, column=column).value = anchor
+            row = end + 1
+        else:
+            row += 1
+
+
+def _synthesize_sheet(source, target, spec: SyntheticSpec, rng: random.Random) -> int:
+    """
+    以 source 为样板生成 target 工作表
+
+    Returns:
+        写入的行数
+    """
+    writer = _SheetWriter(target)
+    data_rows = set()
+    block: List[tuple] = []
+
+    for row_idx, values in enumerate(source.iter_rows(values_only=True), start=1):
+        if _is_data_row(values):
+            data_rows.add(row_idx)
+            category = _scope3_category(values)
+            if category is None or category <= spec.scope3_categories:
+                block.append(values)
+            continue
+        if block:
+            _synthesize_block(writer, block, spec, rng)
+            block = []
+        writer.write(values, row_idx)
+    if block:
+        _synthesize_block(writer, block, spec, rng)
+
+    # 只保留完全位于非数据行（表头、标题等）内的原有合并单元格
+    for merged in source.merged_cells.ranges:
+        rows = range(merged.min_row, merged.max_row + 1)
+        if any(r in data_rows or r not in writer.row_map for r in rows):
+            continue
+        start, end = writer.row_map[merged.min_row], writer.row_map[merged.max_row]
+        if end - start != merged.max_row - merged.min_row:
+            continue
+        target.merge_cells(f"{get_column_letter(merged.min_col)}{start}:"
+                           f"{get_column_letter(merged.max_col)}{end}")
+    return writer.next_row - 1
+
+
+def _copy_sheet(source, target) -> int:
+    """原样复制工作表的值和合并单元格"""
+    rows = 0
+    for rows, values in enumerate(source.iter_rows(values_only=True), start=1):
+        for col_idx, value in enumerate(values, start=1):
+            if value is not None:
+                target.cell(row=rows, column=col_idx, value=value)
+    for merged in source.merged_cells.ranges:
+        target.merge_cells(merged.coord)
+    return rows
+
+
+def _revision_title(revision: int) -> str:
+    return _INVENTORY_SHEET if revision == 1 else f"{_INVENTORY_SHEET} ({revision})"
+
+
+def generate_workbook(output_path: str, spec: Optional[SyntheticSpec] = None,
+                      source_path: str = DEFAULT_SOURCE) -> Dict[str, int]:
+    """
+    生成合成工作簿
+
+    Args:
+        output_path: 输出路径
+        spec: 规模参数（默认 SyntheticSpec()）
+        source_path: 结构样板工作簿
+
+    Returns:
+        工作表名称 -> 写入的行数
+    """
+    spec = spec or SyntheticSpec()
+    rng = random.Random(spec.seed)
+    source_wb = openpyxl.load_workbook(source_path, data_only=True)
+    target_wb = openpyxl.Workbook()
+    target_wb.remove(target_wb.active)
+
+    inventory_sheets = [ws for ws in source_wb.worksheets if '清册' in ws.title]
+    inventory_source = next((ws for ws in inventory_sheets if ws.title == _INVENTORY_SHEET),
+                            inventory_sheets[0] if inventory_sheets else None)
+
+    rows = {}
+    for source in source_wb.worksheets:
+        if source in inventory_sheets:
+            # 所有清册版本都放在第一个清册工作表的位置，按同一样板分别生成
+            if source is not inventory_sheets[0]:
+                continue
+            for revision in range(1, spec.inventory_revisions + 1):
+                title = _revision_title(revision)
+                rows[title] = _synthesize_sheet(inventory_source, target_wb.create_sheet(title),
+                                                spec, rng)
+            continue
+        target = target_wb.create_sheet(source.title)
+        if any(name in source.title for name in _FIXED_SHEETS):
+            rows[source.title] = _copy_sheet(source, target)
+        else:
+            rows[source.title] = _synthesize_sheet(source, target, spec, rng)
+    source_wb.close()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    target_wb.save(tmp_path)
+    os.replace(tmp_path, output_path)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="生成合成盘查清册工作簿")
+    parser.add_argument('output', help="输出 xlsx 路径")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="结构样板工作簿")
+    parser.add_argument('--rows', type=int, default=100, help="每个数据块的数据行数（默认 100）")
+    parser.add_argument('--categories', type=int, default=15, help="范围三类别数量（默认 15）")
+    parser.add_argument('--merge-density', type=float, default=0.0,
+                        help="纵向合并单元格密度 0~1（默认 0）")
+    parser.add_argument('--revisions', type=int, default=2, help="盘查清册版本数（默认 2）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    spec = SyntheticSpec(rows=args.rows, scope3_categories=args.categories,
+                         merge_density=args.merge_density,
+                         inventory_revisions=args.revisions, seed=args.seed)
+    rows = generate_workbook(args.output, spec, args.source)
+    print(f"[合成] 已生成 {args.output}：{len(rows)} 个工作表，共 {sum(rows.values())} 行")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,10 +9,17 @@ data_reader 包 - 协议驱动型数据提取器
 
 架构层次：
 - protocols: 协议配置层（定义所有表格类型的识别规则和处理逻辑）
+- workbook_index: 工作簿索引（每个文件扫描一次，供所有读取器共享）
+- xlsx_parts: xlsx 部件读取（只读模式下直接读取合并单元格信息，计算各工作表的内容摘要）
 - fingerprint: 表格指纹识别器（负责识别表格类型）
 - extractor: 协议提取器（负责根据协议提取数据）
+- convert: 单元格值转换（按原始类型分派的 to_float/to_str，Excel 错误值判断，整列批量转换）
+- records: 紧凑数据记录（带 __slots__ 的映射类型，代替每行一个 dict）
+- inventory: 盘查清册解析（每个清册扫描一次，按范围编号前缀分区，供范围一/二/三读取器共享）
 - readers: 专项读取器（负责提取特定类型的数据）
 - main: 高层接口（提供统一的数据获取接口）
+- cache: 提取结果的磁盘缓存（按 xlsx 内容哈希、版本和协议指纹命中；增量提取时按读取器依赖的工作表摘要缓存各读取器输出）
+- profiling: 阶段级耗时/内存剖析（--profile 时导出 JSON）
 
 使用示例（方式1 - 推荐）：
     >>> from data_reader import ExcelDataReaderRefactored
@@ -20,11 +27,25 @@ data_reader 包 - 协议驱动型数据提取器
     >>> context = reader.get_all_context()
     >>> reader.close()
 
+大文件（只读流式加载，结果与完整模式一致）：
+    >>> reader = ExcelDataReaderRefactored("test_data.xlsx", read_only=True)
+
+增量提取（只重新运行输入工作表发生变化的读取器）：
+    >>> from data_reader.cache import ContextCache
+    >>> reader = ExcelDataReaderRefactored("test_data.xlsx", read_only=True, cache=ContextCache())
+
+日志：各模块使用 logging.getLogger(__name__)（如 data_reader.readers.scope1），
+逐行明细为 DEBUG 级别；包本身只添加 NullHandler，输出方式由调用方配置。
+
 子模块导入（高级用法）：
     >>> from data_reader.protocols import TABLE_PROTOCOLS
     >>> from data_reader.readers import Scope1Reader
 """
 
+import logging
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 # 主要导出
 from .main import ExcelDataReaderRefactored
 
@@ -32,10 +53,17 @@ from .main import ExcelDataReaderRefactored
 from . import config
 from . import protocols
 from . import utils
+from . import convert
 from . import post_processors
 from . import fingerprint
 from . import extractor
+from . import records
+from . import inventory
 from . import readers
+from . import workbook_index
+from . import xlsx_parts
+from . import cache
+from . import profiling
 
 __version__ = '2.0.0'
 
@@ -45,8 +73,15 @@ __all__ = [
     'config',
     'protocols',
     'utils',
+    'convert',
     'post_processors',
     'fingerprint',
     'extractor',
+    'records',
+    'inventory',
     'readers',
+    'workbook_index',
+    'xlsx_parts',
+    'cache',
+    'profiling',
 ]
@@ -0,0 +1,313 @@
+"""
+上下文缓存模块
+=====================
+
+将 extract_context() 的提取结果以二进制（pickle）形式缓存到磁盘。
+
+缓存键由四部分组成：
+- xlsx 文件内容的 SHA-256（文件内容不变即命中，与路径和修改时间无关）
+- data_reader.__version__
+- TABLE_PROTOCOLS 的指纹（协议配置变化时自动失效）
+- 提取代码（data_reader 下所有 .py 及 report_config.py）的源码摘要（修改代码后自动失效）
+
+缓存的是 extract_context() 的结果，不含由 report_config 生成的量化方法说明。
+
+增量提取时，每个读取器（以及每个工作表的识别提取）的输出也单独缓存，
+键由任务名称、版本、协议指纹、任务所运行代码（读取器模块及其在包内依赖的模块）
+的源码摘要和所依赖工作表的内容摘要组成（见 make_task_key），只修改了部分工作表
+或部分读取器的代码时，未受影响的读取器直接复用缓存结果。
+
+缓存目录总大小超过上限时，按最近使用时间淘汰最旧的条目（store 写入后或由调用方
+在批量写入后调用 evict）。
+"""
+
+import functools
+import logging
+import hashlib
+import os
+import pickle
+import sys
+import types
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .protocols import TABLE_PROTOCOLS, _PROTOCOL_ORDER
+
+logger = logging.getLogger(__name__)
+
+
+# 默认缓存目录（项目根目录下），可通过环境变量 DATA_READER_CACHE_DIR 覆盖
+DEFAULT_CACHE_DIR = os.environ.get(
+    'DATA_READER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.context_cache'),
+)
+
+# 默认缓存总大小上限：256MB
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_CACHE_SUFFIX = '.pkl'
+_HASH_CHUNK_SIZE = 1 << 20
+
+# 参与源码摘要的代码：data_reader 包及项目根目录下的 report_config.py
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_DIR = os.path.dirname(_PACKAGE_DIR)
+_EXTRA_SOURCES = ('report_config.py',)
+
+
+def file_sha256(file_path: str) -> str:
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def source_digest(*paths: str) -> str:
+    """
+    计算源码文件的摘要（每个进程按参数缓存一次）
+
+    Args:
+        paths: 相对项目根目录的文件路径；不存在的文件按空内容计入
+
+    Returns:
+        按路径排序后逐个计入路径和文件内容的 SHA-256
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.encode('utf-8') + b'\0')
+        try:
+            with open(os.path.join(_PROJECT_DIR, path), 'rb') as fh:
+                digest.update(fh.read())
+        except OSError:
+            pass
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def extraction_sources() -> Tuple[str, ...]:
+    """参与提取的源码文件（相对项目根目录）：data_reader 下所有 .py 及 report_config.py"""
+    sources = list(_EXTRA_SOURCES)
+    for dir_path, dir_names, file_names in os.walk(_PACKAGE_DIR):
+        dir_names[:] = [name for name in dir_names if name != '__pycache__']
+        for name in file_names:
+            if name.endswith('.py'):
+                sources.append(os.path.relpath(os.path.join(dir_path, name), _PROJECT_DIR))
+    return tuple(sorted(sources))
+
+
+@functools.lru_cache(maxsize=None)
+def module_sources(*module_names: str) -> Tuple[str, ...]:
+    """
+    模块及其在 data_reader 包内（传递）依赖的模块的源码文件（相对项目根目录）
+
+    依赖按模块全局变量判断：导入的子模块，以及导入的类/函数所在的模块。
+    包（__init__.py）只通过子模块导入，不计入；调度模块 data_reader.main 的源码
+    计入，但不沿它的导入展开（它导入了所有读取器，各任务自己声明所运行的模块）。
+    """
+    package = __name__.rpartition('.')[0]
+    orchestrator = package + '.main'
+    pending = list(module_names)
+    seen = set()
+    sources = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        module = sys.modules.get(name)
+        if module is None or hasattr(module, '__path__') or not getattr(module, '__file__', None):
+            continue
+        sources.add(os.path.relpath(module.__file__, _PROJECT_DIR))
+        if name == orchestrator:
+            continue
+        for value in vars(module).values():
+            dependency = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+            if isinstance(dependency, str) and dependency.startswith(package + '.'):
+                pending.append(dependency)
+    return tuple(sorted(sources))
+
+
+def _canonical(value: Any) -> Any:
+    """将协议配置转换为与运行环境无关的稳定结构（集合排序、函数取限定名）"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if isinstance(value, dict):
+        return [(str(k), _canonical(v)) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))]
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    if hasattr(value, '__dataclass_fields__'):
+        return [(name, _canonical(getattr(value, name))) for name in value.__dataclass_fields__]
+    return value
+
+
+def protocol_fingerprint(protocols: Dict[str, Any] = None) -> str:
+    """
+    计算协议配置的指纹
+
+    Args:
+        protocols: 协议配置字典（默认 TABLE_PROTOCOLS）
+
+    Returns:
+        协议配置及优先级顺序的 SHA-256
+    """
+    protocols = TABLE_PROTOCOLS if protocols is None else protocols
+    payload = repr((_canonical(protocols), list(_PROTOCOL_ORDER)))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ContextCache:
+    """提取结果的磁盘缓存"""
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 缓存目录（默认 DEFAULT_CACHE_DIR）
+            max_bytes: 缓存目录总大小上限（字节）
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._fingerprint: Optional[str] = None
+
+    def _code_version(self) -> str:
+        """读取器版本、协议指纹和提取代码的源码摘要（协议指纹每个实例只计算一次）"""
+        from . import __version__
+        if self._fingerprint is None:
+            self._fingerprint = protocol_fingerprint()
+        return f"{__version__}|{self._fingerprint}|{source_digest(*extraction_sources())}"
+
+    def make_key(self, xlsx_path: str) -> str:
+        """根据文件内容、读取器版本、协议指纹和源码摘要生成缓存键"""
+        payload = '|'.join((file_sha256(xlsx_path), self._code_version()))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def make_task_key(self, task_name: str, inputs: Iterable[Tuple[str, str]],
+                      modules: Iterable[str] = ()) -> str:
+        """
+        生成单个提取任务输出的缓存键
+
+        Args:
+            task_name: 任务名称（如 'scope1'、'sheet:附表2-EF'）
+            inputs: 任务所依赖工作表的 (名称, 内容摘要)，按依赖顺序排列
+            modules: 任务运行的代码所在模块（如 'data_reader.readers.scope1'），
+                这些模块及其在包内依赖的模块的源码参与缓存键
+        """
+        from . import __version__
+        if self._fingerprint is None:
+            self._fingerprint = protocol_fingerprint()
+        code = source_digest(*module_sources(*modules))
+        payload = repr(('task', task_name, __version__, self._fingerprint, code, list(inputs)))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _CACHE_SUFFIX)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存
+
+        Returns:
+            缓存的上下文，未命中或缓存文件损坏时返回None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                context = pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("[缓存] 缓存文件无法读取，已丢弃: %s", e)
+            self._remove(path)
+            return None
+
+        # 更新访问时间，用于按最近使用淘汰
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return context
+
+    def store(self, key: str, context: Dict[str, Any], evict: bool = True):
+        """
+        写入缓存（先写临时文件再替换，避免并发读到半个文件）
+
+        Args:
+            evict: 写入后按需淘汰旧条目；连续写入多个条目时传 False，最后调用一次 evict()
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as fh:
+                pickle.dump(context, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("[缓存] 写入缓存失败: %s", e)
+            self._remove(tmp_path)
+            return
+        if evict:
+            self.evict(keep=path)
+
+    def evict(self, keep: Optional[str] = None):
+        """缓存目录超过大小上限时，按最近使用时间从旧到新删除条目"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(_CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+
+    def clear(self) -> int:
+        """
+        清空缓存目录
+
+        Returns:
+            删除的缓存条目数
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_CACHE_SUFFIX) or name.endswith('.tmp'):
+                self._remove(os.path.join(self.cache_dir, name))
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+__all__ = [
+    'ContextCache',
+    'DEFAULT_CACHE_DIR',
+    'DEFAULT_MAX_BYTES',
+    'file_sha256',
+    'protocol_fingerprint',
+    'source_digest',
+    'extraction_sources',
+    'module_sources',
+]
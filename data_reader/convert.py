@@ -0,0 +1,87 @@
+"""
+单元格值转换模块
+=====================
+
+提取过程中调用最频繁的操作：把 openpyxl 读出的原始单元格值转换为浮点数或字符串。
+按原始值的类型分派：
+- float 直接返回，int 转为 float，None 为默认值
+- 字符串去除千分位逗号后解析，无法解析（含 Excel 错误值 #REF! 等）为默认值
+- Excel 错误值通过 frozenset 判断，只对以 '#' 开头的字符串做大写比较
+
+另外提供整列（整段行）的批量转换。
+"""
+
+from typing import Iterable, List
+
+# Excel 错误值
+EXCEL_ERRORS = frozenset(['#REF!', '#VALUE!', '#DIV/0!', '#NAME?', '#N/A', '#NULL!', '#NUM!'])
+
+
+def to_float(value, default: float = 0.0) -> float:
+    """
+    转换为浮点数，处理 Excel 错误值和千分位逗号
+
+    Args:
+        value: 原始单元格值
+        default: None、空字符串、错误值或无法解析时的返回值
+
+    Returns:
+        浮点数
+    """
+    cls = type(value)
+    if cls is float:
+        return value
+    if cls is int:
+        return float(value)
+    if value is None:
+        return default
+    if cls is str or isinstance(value, str):
+        # Excel 错误值不可能解析为数字，直接落到默认值
+        try:
+            return float(value.replace(',', ''))
+        except ValueError:
+            return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def to_floats(values: Iterable, default: float = 0.0) -> List[float]:
+    """批量转换一列（或一段行）单元格值，数值单元格不经过函数调用"""
+    result = []
+    append = result.append
+    for value in values:
+        cls = type(value)
+        if cls is float:
+            append(value)
+        elif cls is int:
+            append(float(value))
+        else:
+            append(to_float(value, default))
+    return result
+
+
+def is_error(value) -> bool:
+    """是否为 Excel 错误值（如 #REF!、#N/A）"""
+    if value is None:
+        return False
+    cls = type(value)
+    if cls is float or cls is int:
+        return False
+    text = (value if cls is str else str(value)).strip()
+    return text[:1] == '#' and text.upper() in EXCEL_ERRORS
+
+
+def to_str(value) -> str:
+    """转换为去除首尾空白的字符串，None 和 Excel 错误值为空字符串"""
+    if value is None:
+        return ''
+    cls = type(value)
+    text = (value if cls is str else str(value)).strip()
+    if text[:1] == '#' and text.upper() in EXCEL_ERRORS:
+        return ''
+    return text
+
+
+__all__ = ['EXCEL_ERRORS', 'is_error', 'to_float', 'to_floats', 'to_str']
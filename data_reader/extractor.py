@@ -5,12 +5,16 @@
 根据协议配置从工作表中提取数据。
 """
 
-import openpyxl
+import logging
 from typing import Dict, List, Any
 
 from .protocols import TABLE_PROTOCOLS
 from .config import TableProtocol, FieldMapping
-from .utils import safe_float
+from .records import protocol_record_type
+from .workbook_index import SheetIndex
+from .profiling import profiled
+
+logger = logging.getLogger(__name__)
 
 
 class ProtocolExtractor:
@@ -19,20 +23,21 @@ class ProtocolExtractor:
     def __init__(self):
         pass
 
-    def extract_from_sheet(self, sheet: openpyxl.worksheet.Worksheet,
+    @profiled()
+    def extract_from_sheet(self, sheet: SheetIndex,
                           protocol_name: str) -> List[Dict[str, Any]]:
         """
         根据协议从工作表提取数据
 
         Args:
-            sheet: openpyxl工作表对象
+            sheet: 工作表索引
             protocol_name: 协议名称
 
         Returns:
             提取的数据列表
         """
         if protocol_name not in TABLE_PROTOCOLS:
-            print(f"[数据提取] 未知协议: {protocol_name}")
+            logger.warning("[数据提取] 未知协议: %s", protocol_name)
             return []
 
         protocol = TABLE_PROTOCOLS[protocol_name]
@@ -40,41 +45,37 @@ class ProtocolExtractor:
         # 查找表头行
         header_row = self._find_header_row(sheet, protocol)
         if not header_row:
-            print(f"[数据提取] 未找到表头行")
+            logger.warning("[数据提取] 未找到表头行")
             return []
 
         # 获取列映射
         column_map = self._build_column_map(sheet, header_row, protocol)
         if not column_map:
-            print(f"[数据提取] 无法创建列映射")
+            logger.warning("[数据提取] 无法创建列映射")
             return []
 
-        # 提取数据
+        # 提取数据（包含前向填充）
         data_items = self._extract_data_rows(sheet, header_row, column_map, protocol)
 
-        # 应用前向填充
-        if protocol.ffill_fields:
-            data_items = self._apply_ffill(data_items, protocol.ffill_fields)
-
         # 应用后处理
         if protocol.post_process:
             processed = protocol.post_process(data_items)
             if processed is not None:
                 data_items = processed
 
-        print(f"[数据提取] 提取到 {len(data_items)} 行数据")
+        logger.debug("[数据提取] 提取到 %s 行数据", len(data_items))
         return data_items
 
-    def _find_header_row(self, sheet: openpyxl.worksheet.Worksheet,
+    def _find_header_row(self, sheet: SheetIndex,
                         protocol: TableProtocol, max_row: int = 20) -> int:
         """查找表头行"""
         all_keywords = protocol.required_keywords | protocol.optional_keywords
 
-        for row_idx in range(1, min(max_row + 1, sheet.max_row + 1)):
+        for row_idx, row in enumerate(sheet.iter_values(1, max_row), start=1):
             row_values = set()
-            for cell in sheet[row_idx]:
-                if cell.value and isinstance(cell.value, str):
-                    row_values.add(str(cell.value).strip())
+            for value in row:
+                if value and isinstance(value, str):
+                    row_values.add(value.strip())
 
             # 至少匹配2个关键词
             matched = len(all_keywords & row_values)
@@ -83,7 +84,7 @@ class ProtocolExtractor:
 
         return None
 
-    def _build_column_map(self, sheet: openpyxl.worksheet.Worksheet,
+    def _build_column_map(self, sheet: SheetIndex,
                          header_row: int,
                          protocol: TableProtocol) -> Dict[str, int]:
         """构建列名到列索引的映射"""
@@ -91,15 +92,12 @@ class ProtocolExtractor:
         header_cells = {}
 
         # 收集表头单元格（支持多行表头）
-        rows_to_check = list(range(header_row, min(header_row + protocol.header_rows_to_check, sheet.max_row + 1)))
-        for row_idx in rows_to_check:
-            if row_idx > sheet.max_row:
-                continue
-            for cell in sheet[row_idx]:
-                if cell.value and isinstance(cell.value, str):
-                    value = str(cell.value).strip()
+        for row in sheet.iter_values(header_row, header_row + protocol.header_rows_to_check - 1):
+            for col_idx, value in enumerate(row):
+                if value and isinstance(value, str):
+                    value = value.strip()
                     if value and value not in header_cells:
-                        header_cells[value] = cell.column - 1
+                        header_cells[value] = col_idx
 
         # 活动数据汇总表的排放量字段特殊处理：使用固定列位置
         is_activity_summary = protocol.name in ['活动数据汇总表', '活动数据汇总表（市场法）']
@@ -158,97 +156,124 @@ class ProtocolExtractor:
 
         return column_map
 
-    def _extract_data_rows(self, sheet: openpyxl.worksheet.Worksheet,
+    def _extract_data_rows(self, sheet: SheetIndex,
                           header_row: int,
                           column_map: Dict[str, int],
                           protocol: TableProtocol) -> List[Dict[str, Any]]:
-        """提取数据行"""
-        data_items = []
+        """
+        提取数据行（按列批量转换，每行生成一个紧凑记录）
+
+        一次遍历收集数据区域的所有行，再按字段逐列做类型转换、有效行判断和
+        前向填充，最后按行组装记录。
+        """
+        rows = self._collect_data_rows(sheet, header_row, column_map, protocol)
+        if not rows:
+            return []
+
+        # 按字段逐列转换（数据区域每行宽度相同，列索引越界时整列为默认值）
+        width = len(rows[0])
+        columns = []
+        for field_name, field_mapping in protocol.field_mappings.items():
+            col_idx = column_map.get(field_name)
+            if col_idx is None or col_idx >= width:
+                columns.append([field_mapping.default] * len(rows))
+            else:
+                columns.append(self._convert_column([row[col_idx] for row in rows], field_mapping))
+
+        # 检查是否有效数据行：任一字段有值且不等于默认值
+        valid = [False] * len(rows)
+        for column, field_mapping in zip(columns, protocol.field_mappings.values()):
+            default = field_mapping.default
+            for i, value in enumerate(column):
+                if not valid[i] and value and value != default:
+                    valid[i] = True
+        if not all(valid):
+            columns = [[value for value, keep in zip(column, valid) if keep] for column in columns]
+
+        # 前向填充按列进行
+        if protocol.ffill_fields:
+            field_names = list(protocol.field_mappings)
+            for field in protocol.ffill_fields:
+                if field in protocol.field_mappings:
+                    self._ffill_column(columns[field_names.index(field)])
+
+        record_cls = protocol_record_type(protocol)
+        return [record_cls(values) for values in zip(*columns)]
+
+    def _collect_data_rows(self, sheet: SheetIndex,
+                           header_row: int,
+                           column_map: Dict[str, int],
+                           protocol: TableProtocol) -> List[tuple]:
+        """收集表头之后的非空数据行"""
+        rows = []
 
         # 活动数据汇总表的特殊处理：跳过子表头行
         is_activity_summary = protocol.name in ['活动数据汇总表', '活动数据汇总表（市场法）']
+        check_number = is_activity_summary and 'number' in protocol.field_mappings
+        number_col_idx = column_map.get('number', 0)
 
-        for row_idx in range(header_row + 1, sheet.max_row + 1):
-            row = sheet[row_idx]
-
+        for row in sheet.iter_values(header_row + 1):
             # 检查空行
-            if not any(cell.value is not None for cell in row):
+            if not any(value is not None for value in row):
                 continue
 
             # 活动数据汇总表：跳过序号列非数字的行（子表头行）
-            if is_activity_summary and 'number' in protocol.field_mappings:
-                number_col_idx = column_map.get('number', 0)
-                if number_col_idx < len(row):
-                    number_cell = row[number_col_idx]
-                    # 如果序号列不是数字，跳过该行
-                    if number_cell.value is None or not isinstance(number_cell.value, (int, float)):
-                        try:
-                            float(number_cell.value)
-                        except (ValueError, TypeError):
-                            continue
-
-            # 提取字段值
-            item = {}
-            for field_name, field_mapping in protocol.field_mappings.items():
-                if field_name in column_map:
-                    col_idx = column_map[field_name]
-                    cell = row[col_idx] if col_idx < len(row) else None
-
-                    value = self._convert_cell_value(cell, field_mapping)
-                    item[field_name] = value
-                else:
-                    item[field_name] = field_mapping.default
+            if check_number and number_col_idx < len(row):
+                number_value = row[number_col_idx]
+                # 如果序号列不是数字，跳过该行
+                if number_value is None or not isinstance(number_value, (int, float)):
+                    try:
+                        float(number_value)
+                    except (ValueError, TypeError):
+                        continue
 
-            # 检查是否有效数据行
-            if self._is_valid_row(item, protocol):
-                data_items.append(item)
+            rows.append(row)
 
-        return data_items
+        return rows
 
-    def _convert_cell_value(self, cell, field_mapping: FieldMapping) -> Any:
+    def _convert_column(self, values: list, field_mapping: FieldMapping) -> list:
+        """
+        按字段类型批量转换一整列
+
+        先对整列直接转换，遇到无法转换的值时再逐个处理（结果与
+        _convert_cell_value 逐个转换一致）。
+        """
+        default = field_mapping.default
+        if field_mapping.dtype == 'float':
+            convert = float
+        elif field_mapping.dtype == 'int':
+            convert = int
+        else:
+            return [default if value is None else str(value).strip() for value in values]
+
+        try:
+            return [default if value is None else convert(value) for value in values]
+        except (ValueError, TypeError):
+            return [self._convert_cell_value(value, field_mapping) for value in values]
+
+    def _ffill_column(self, column: list):
+        """对单列原地前向填充（空值沿用上一个非空值）"""
+        last_value = None
+        for i, value in enumerate(column):
+            if value and str(value).strip():
+                last_value = value
+            elif last_value:
+                column[i] = last_value
+
+    def _convert_cell_value(self, value, field_mapping: FieldMapping) -> Any:
         """转换单元格值"""
-        if cell is None or cell.value is None:
+        if value is None:
             return field_mapping.default
 
         try:
             if field_mapping.dtype == 'float':
-                return float(cell.value)
+                return float(value)
             elif field_mapping.dtype == 'int':
-                return int(cell.value)
+                return int(value)
             else:
-                return str(cell.value).strip()
+                return str(value).strip()
         except (ValueError, TypeError):
             return field_mapping.default
 
-    def _is_valid_row(self, item: Dict[str, Any], protocol: TableProtocol) -> bool:
-        """检查是否为有效数据行"""
-        for field_name, field_mapping in protocol.field_mappings.items():
-            value = item.get(field_name)
-            if value and value != field_mapping.default:
-                return True
-        return False
-
-    def _apply_ffill(self, data_items: List[Dict[str, Any]],
-                    field_names: List[str]) -> List[Dict[str, Any]]:
-        """应用前向填充"""
-        if not data_items:
-            return data_items
-
-        result = []
-        last_values = {field: None for field in field_names}
-
-        for item in data_items:
-            new_item = item.copy()
-            for field in field_names:
-                value = item.get(field)
-                if value and str(value).strip():
-                    last_values[field] = value
-                    new_item[field] = value
-                elif last_values[field]:
-                    new_item[field] = last_values[field]
-            result.append(new_item)
-
-        return result
-
 
 __all__ = ['ProtocolExtractor']
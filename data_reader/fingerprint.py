@@ -5,11 +5,98 @@
 负责识别Excel工作表的表格类型。
 """
 
-import openpyxl
-from typing import Optional, Dict
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Tuple
 
 from .protocols import TABLE_PROTOCOLS, _PROTOCOL_ORDER
 from .config import TableProtocol
+from .workbook_index import SheetIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FingerprintResult:
+    """单个工作表的识别结果（缓存条目，同时用于诊断）"""
+    protocol_name: Optional[str]              # 匹配的协议名称，未匹配为None
+    matched_by: Optional[str] = None          # 'name'（名称匹配）/ 'keywords'（关键词匹配）
+    scores: Dict[str, float] = field(default_factory=dict)  # 已评估协议的可选关键词匹配度
+
+
+class ProtocolKeywordIndex:
+    """
+    协议关键词倒排索引
+
+    从协议配置一次性编译：关键词 -> 使用该关键词的协议列表。
+    识别时只需遍历一次工作表的唯一字符串即可统计所有协议的命中数，
+    耗时与工作表内容成正比，而不是与（协议数 × 关键词数）成正比。
+    """
+
+    def __init__(self, protocols: Dict[str, TableProtocol], order: List[str] = None):
+        """
+        Args:
+            protocols: 协议配置字典
+            order: 协议优先级顺序（只有在其中的协议参与识别）
+        """
+        order = _PROTOCOL_ORDER if order is None else order
+        ranked = [name for name in order if name in protocols]
+
+        # 有工作表名称模式的协议只按名称匹配
+        self.name_protocols: List[str] = [
+            name for name in ranked if protocols[name].sheet_name_patterns
+        ]
+        keyword_protocols = [
+            name for name in ranked if not protocols[name].sheet_name_patterns
+        ]
+
+        self.rank: Dict[str, int] = {name: i for i, name in enumerate(ranked)}
+        self.required_count: Dict[str, int] = {}
+        self.optional_total: Dict[str, int] = {}
+        # 没有必需关键词的协议对任何工作表都是候选
+        self.always_candidates: List[str] = []
+        # 关键词 -> [(协议名称, 是否为必需关键词)]
+        self.keywords: Dict[str, List[Tuple[str, bool]]] = {}
+
+        for name in keyword_protocols:
+            protocol = protocols[name]
+            self.required_count[name] = len(protocol.required_keywords)
+            self.optional_total[name] = len(protocol.optional_keywords) if protocol.optional_keywords else 1
+            if not protocol.required_keywords:
+                self.always_candidates.append(name)
+            for keyword in protocol.required_keywords:
+                self.keywords.setdefault(keyword, []).append((name, True))
+            for keyword in protocol.optional_keywords:
+                self.keywords.setdefault(keyword, []).append((name, False))
+
+    def match(self, unique_strings: set) -> Tuple[List[str], Dict[str, int]]:
+        """
+        一次遍历统计所有协议的关键词命中数
+
+        Args:
+            unique_strings: 工作表的唯一字符串集合
+
+        Returns:
+            (必需关键词全部命中的候选协议（按优先级排序）, 协议 -> 可选关键词命中数)
+        """
+        required_hits: Dict[str, int] = {}
+        optional_hits: Dict[str, int] = {}
+        keywords = self.keywords
+        for value in unique_strings:
+            entries = keywords.get(value)
+            if not entries:
+                continue
+            for name, required in entries:
+                if required:
+                    required_hits[name] = required_hits.get(name, 0) + 1
+                else:
+                    optional_hits[name] = optional_hits.get(name, 0) + 1
+
+        candidates = [name for name, hits in required_hits.items()
+                      if hits == self.required_count[name]]
+        candidates.extend(self.always_candidates)
+        candidates.sort(key=self.rank.__getitem__)
+        return candidates, optional_hits
 
 
 class TableFingerprint:
@@ -17,82 +104,100 @@ class TableFingerprint:
 
     def __init__(self, protocols: Dict[str, TableProtocol] = None):
         self.protocols = protocols or TABLE_PROTOCOLS
+        # 关键词倒排索引，每个识别器只编译一次
+        self.keyword_index = ProtocolKeywordIndex(self.protocols)
+        # 识别结果缓存：(id(sheet), 工作表名称, 检查行数) -> (sheet, 标题, 结果)
+        # 同一个识别器在所有读取器间共享时，每个工作表只识别一次
+        self._cache: Dict[tuple, Tuple[SheetIndex, str, FingerprintResult]] = {}
 
-    def identify(self, sheet: openpyxl.worksheet.Worksheet,
+    def identify(self, sheet: SheetIndex,
                  sheet_name: str = None,
                  check_rows: int = 20) -> Optional[str]:
         """
         识别工作表的表格类型
 
-        按照协议优先级顺序进行匹配，找到第一个匹配的协议就返回
+        按照协议优先级顺序进行匹配，找到第一个匹配的协议就返回。
+        结果按工作表缓存（SheetIndex 不可变），工作表对象或标题变化时重新识别。
 
         Args:
-            sheet: openpyxl工作表对象
+            sheet: 工作表索引
             sheet_name: 工作表名称
             check_rows: 检查前N行
 
         Returns:
             匹配的协议名称，未匹配返回None
         """
-        # 收集表格的唯一字符串值
-        unique_strings = self._extract_unique_strings(sheet, check_rows)
-
+        return self.identify_result(sheet, sheet_name, check_rows).protocol_name
+
+    def identify_result(self, sheet: SheetIndex,
+                        sheet_name: str = None,
+                        check_rows: int = 20) -> FingerprintResult:
+        """识别工作表的表格类型，返回包含匹配方式和匹配度的完整结果"""
+        key = (id(sheet), sheet_name, check_rows)
+        # 不读取尺寸：按需构建的工作表在识别时只读取前 check_rows 行
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] is sheet and cached[1] == sheet.title:
+            return cached[2]
+
+        result = self._identify(sheet, sheet_name, check_rows)
+        self._cache[key] = (sheet, sheet.title, result)
+        return result
+
+    def clear_cache(self):
+        """清空识别结果缓存"""
+        self._cache.clear()
+
+    def _identify(self, sheet: SheetIndex,
+                  sheet_name: Optional[str],
+                  check_rows: int) -> FingerprintResult:
+        """执行实际的识别逻辑（不经过缓存）"""
         actual_sheet_name = sheet_name or sheet.title
 
         # 先尝试精确的工作表名称匹配（优先级最高）
-        for protocol_name in _PROTOCOL_ORDER:
-            if protocol_name not in self.protocols:
-                continue
-
+        for protocol_name in self.keyword_index.name_protocols:
             protocol = self.protocols[protocol_name]
-
-            # 检查工作表名称模式
-            if protocol.sheet_name_patterns:
-                # 检查所有模式是否都匹配
-                all_patterns_match = all(pattern and pattern in actual_sheet_name for pattern in protocol.sheet_name_patterns)
-                if all_patterns_match:
-                    print(f"[表格识别] '{actual_sheet_name}' 通过名称匹配到 {protocol.name} (patterns: {protocol.sheet_name_patterns})")
-                    return protocol_name
+            # 检查所有模式是否都匹配
+            all_patterns_match = all(pattern and pattern in actual_sheet_name for pattern in protocol.sheet_name_patterns)
+            if all_patterns_match:
+                logger.debug("[表格识别] '%s' 通过名称匹配到 %s (patterns: %s)",
+                             actual_sheet_name, protocol.name, protocol.sheet_name_patterns)
+                return FingerprintResult(protocol_name, 'name')
 
         # 如果没有名称匹配，则按关键词匹配
-        for protocol_name in _PROTOCOL_ORDER:
-            if protocol_name not in self.protocols:
-                continue
+        # 收集表格的唯一字符串值，通过倒排索引一次统计所有协议的命中数
+        unique_strings = self._extract_unique_strings(sheet, check_rows)
+        candidates, optional_hits = self.keyword_index.match(unique_strings)
 
+        scores = {}
+        for protocol_name in candidates:
             protocol = self.protocols[protocol_name]
 
-            # 跳过有名称模式但未匹配的协议（因为它们在前面已经检查过了）
-            if protocol.sheet_name_patterns:
-                continue
-
-            # 检查必需关键词是否全部匹配
-            if not protocol.required_keywords.issubset(unique_strings):
-                continue
-
             # 计算可选关键词匹配度
-            optional_matched = len(protocol.optional_keywords & unique_strings)
-            optional_total = len(protocol.optional_keywords) if protocol.optional_keywords else 1
-            match_score = optional_matched / optional_total if optional_total > 0 else 1.0
+            optional_matched = optional_hits.get(protocol_name, 0)
+            optional_total = self.keyword_index.optional_total[protocol_name]
+            match_score = optional_matched / optional_total
+            scores[protocol_name] = match_score
 
             # 检查是否达到最小匹配度
             if match_score >= protocol.min_match_ratio:
-                print(f"[表格识别] {sheet_name or sheet.title} 匹配到 {protocol.name} "
-                      f"(必需关键词: {len(protocol.required_keywords)}/{len(protocol.required_keywords)}, "
-                      f"可选关键词: {optional_matched}/{optional_total})")
-                return protocol_name
+                logger.debug("[表格识别] %s 匹配到 %s (必需关键词: %s/%s, 可选关键词: %s/%s)",
+                             sheet_name or sheet.title, protocol.name,
+                             len(protocol.required_keywords), len(protocol.required_keywords),
+                             optional_matched, optional_total)
+                return FingerprintResult(protocol_name, 'keywords', scores)
 
         if sheet_name:
-            print(f"[表格识别] {sheet_name} 未匹配到已知协议类型")
-        return None
+            logger.debug("[表格识别] %s 未匹配到已知协议类型", sheet_name)
+        return FingerprintResult(None, scores=scores)
 
-    def _extract_unique_strings(self, sheet: openpyxl.worksheet.Worksheet,
+    def _extract_unique_strings(self, sheet: SheetIndex,
                                check_rows: int) -> set:
         """提取表格中的唯一字符串"""
         unique_strings = set()
-        for row_idx in range(1, min(check_rows + 1, sheet.max_row + 1)):
-            for cell in sheet[row_idx]:
-                if cell.value and isinstance(cell.value, str):
-                    cleaned = str(cell.value).strip()
+        for row in sheet.head_values(check_rows):
+            for value in row:
+                if value and isinstance(value, str):
+                    cleaned = value.strip()
                     if cleaned:
                         unique_strings.add(cleaned)
         return unique_strings
@@ -112,4 +217,4 @@ class TableFingerprint:
         return match_ratio
 
 
-__all__ = ['TableFingerprint']
+__all__ = ['TableFingerprint', 'FingerprintResult', 'ProtocolKeywordIndex']
@@ -0,0 +1,111 @@
+"""
+盘查清册解析模块
+=====================
+
+温室气体盘查清册是工作簿中最大的工作表，范围一、二、三的明细都来自这里，
+且使用相同的列布局：
+- B 列：编号（如 1.1.2、2.1、3.4.1）或类别名
+- C 列：排放源，D 列：排放设施，E 列：备注
+- F~M 列：总排放量、CO2、CH4、N2O、HFCs、PFCs、SF6、NF3
+
+每个清册工作表只扫描一次，按编号前缀（1. / 2. / 3.）分区，气体列预先转换为浮点数；
+解析结果按工作表缓存，所有读取器共享。
+"""
+
+import weakref
+from typing import Dict, List, Tuple
+
+from .convert import to_floats
+from .workbook_index import SheetIndex, WorkbookIndex
+
+# 数据从第14行开始（第12行是标题，第13行是单位）
+INVENTORY_START_ROW = 14
+
+# 至少包含到 M 列
+_MIN_WIDTH = 13
+
+# 分区的编号前缀
+SCOPE_PREFIXES = ('1.', '2.', '3.')
+
+
+class InventoryRow:
+    """盘查清册中带编号的一行"""
+
+    __slots__ = ('row_idx', 'number', 'category', 'values', 'gases')
+
+    def __init__(self, row_idx: int, number: str, category: str, values: tuple):
+        self.row_idx = row_idx          # Excel 行号
+        self.number = number            # B 列编号（已去除首尾空白）
+        self.category = category        # 所在类别（上方最近的非编号 B 列文本）
+        self.values = values            # 原始单元格值
+        # F~M 列的浮点数：总排放量、CO2、CH4、N2O、HFCs、PFCs、SF6、NF3
+        self.gases: Tuple[float, ...] = tuple(to_floats(values[5:13]))
+
+
+class InventorySheet:
+    """单个盘查清册工作表的解析结果"""
+
+    __slots__ = ('title', 'scopes')
+
+    def __init__(self, title: str, scopes: Dict[str, List[InventoryRow]]):
+        self.title = title
+        self.scopes = scopes
+
+    def scope(self, prefix: str) -> List[InventoryRow]:
+        """编号以 prefix（'1.' / '2.' / '3.'）开头的行，按工作表中的顺序排列"""
+        return self.scopes.get(prefix, [])
+
+
+def parse_inventory_sheet(sheet: SheetIndex) -> InventorySheet:
+    """
+    扫描一次盘查清册工作表，按编号前缀分区
+
+    B 列以数字开头的行是编号行，其余非空 B 列文本更新当前类别；
+    B 列为空的行不属于任何分区。
+    """
+    scopes: Dict[str, List[InventoryRow]] = {prefix: [] for prefix in SCOPE_PREFIXES}
+    if sheet.max_column < _MIN_WIDTH:
+        return InventorySheet(sheet.title, scopes)
+
+    current_category = ""
+    for row_idx, row in enumerate(sheet.iter_values(INVENTORY_START_ROW), start=INVENTORY_START_ROW):
+        col_b = row[1]
+        if not col_b:
+            continue
+        number = str(col_b).strip()
+        if not (number and number[0].isdigit()):
+            current_category = number
+            continue
+        partition = scopes.get(number[:2])
+        if partition is not None:
+            partition.append(InventoryRow(row_idx, number, current_category, row))
+    return InventorySheet(sheet.title, scopes)
+
+
+# SheetIndex -> 解析结果，工作表索引被回收时自动移除
+_PARSED = weakref.WeakKeyDictionary()
+
+
+def inventory_rows(sheet: SheetIndex) -> InventorySheet:
+    """获取盘查清册工作表的解析结果（按工作表缓存）"""
+    parsed = _PARSED.get(sheet)
+    if parsed is None:
+        parsed = parse_inventory_sheet(sheet)
+        _PARSED[sheet] = parsed
+    return parsed
+
+
+def find_inventory_sheets(index: WorkbookIndex) -> List[SheetIndex]:
+    """所有名称包含“清册”的工作表（按工作簿顺序）"""
+    return [sheet for sheet in index.worksheets if '清册' in sheet.title]
+
+
+__all__ = [
+    'INVENTORY_START_ROW',
+    'SCOPE_PREFIXES',
+    'InventoryRow',
+    'InventorySheet',
+    'find_inventory_sheets',
+    'inventory_rows',
+    'parse_inventory_sheet',
+]
@@ -7,8 +7,11 @@ ExcelDataReaderRefactored - 重构后的Excel数据读取器主类
 这是唯一的高层接口，自动识别所有表格并提取数据。
 """
 
+import functools
+import logging
+import zipfile
 import openpyxl
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # 尝试导入 ReportConfig 以支持 quantification_methods
 try:
@@ -21,6 +24,11 @@ from .protocols import TABLE_PROTOCOLS
 from .fingerprint import TableFingerprint
 from .extractor import ProtocolExtractor
 from .post_processors import group_by_emission_category, group_scope1_emissions
+from .workbook_index import SheetIndex, WorkbookIndex
+from .xlsx_parts import sheet_digests
+from .cache import ContextCache
+from .convert import to_float
+from .profiling import stage
 from .readers import (
     BaseReader,
     BasicInfoReader,
@@ -32,6 +40,14 @@ from .readers import (
     ReductionActionReader,
 )
 
+logger = logging.getLogger(__name__)
+
+# 提取任务：(名称, 无参调用, 所依赖的工作表, 所运行代码的模块)
+ExtractTask = Tuple[str, Callable[[], Any], List[SheetIndex], Tuple[str, ...]]
+
+# 任务输出尚未得到（未命中缓存，需要提取）
+_PENDING = object()
+
 
 class ExcelDataReaderRefactored(BaseReader):
     """
@@ -40,26 +56,47 @@ class ExcelDataReaderRefactored(BaseReader):
     这是唯一的高层接口，自动识别所有表格并提取数据
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, read_only: bool = False,
+                 cache: Optional[ContextCache] = None):
         """
         初始化数据读取器
 
         Args:
             file_path: Excel文件路径
+            read_only: 是否以只读（流式）模式加载工作簿。只读模式不构建样式和
+                单元格对象，工作表索引按需构建（没有读取器使用的工作表不扫描），
+                内存占用和加载时间显著降低；文件句柄保持打开到 close()。
+                提取结果与完整模式一致。
+            cache: 提供时启用增量提取：按工作表 XML 部件计算内容摘要，各读取器
+                （以及各工作表的识别提取）的输出按其依赖工作表的摘要缓存，
+                只重新运行输入工作表发生变化的任务。
         """
         self.file_path = file_path
-        self.workbook = openpyxl.load_workbook(file_path, data_only=True)
+        self.read_only = read_only
+        self.cache = cache
+        # 只读模式下按需构建索引：只有识别或提取实际用到的工作表才扫描，
+        # 启用增量提取时命中缓存的任务所依赖的工作表也不需要扫描
+        self.deferred_index = read_only
+        with stage('openpyxl.load_workbook'):
+            self.workbook = openpyxl.load_workbook(file_path, read_only=read_only, data_only=True)
+        # 每个文件只扫描一次工作簿，所有读取器共享同一个索引
+        with stage('WorkbookIndex.from_workbook') as record:
+            self.index = WorkbookIndex.from_workbook(self.workbook, file_path,
+                                                     deferred=self.deferred_index)
+            if not self.deferred_index:
+                record.rows = sum(sheet.max_row for sheet in self.index.worksheets)
         self.extractor = ProtocolExtractor()
+        # 所有读取器共享同一个识别器，识别结果按工作表缓存
         self.fingerprint = TableFingerprint()
 
         # 初始化专项读取器
-        self.basic_info_reader = BasicInfoReader(self.workbook)
-        self.scope1_reader = Scope1Reader(self.workbook)
-        self.scope2_reader = Scope2Reader(self.workbook)
-        self.scope3_reader = Scope3Reader(self.workbook)
-        self.emission_factor_reader = EmissionFactorReader(self.workbook)
-        self.activity_summary_reader = ActivitySummaryReader(self.workbook)
-        self.reduction_action_reader = ReductionActionReader(self.workbook)
+        self.basic_info_reader = BasicInfoReader(self.workbook, self.index, self.fingerprint)
+        self.scope1_reader = Scope1Reader(self.workbook, self.index, self.fingerprint)
+        self.scope2_reader = Scope2Reader(self.workbook, self.index, self.fingerprint)
+        self.scope3_reader = Scope3Reader(self.workbook, self.index, self.fingerprint)
+        self.emission_factor_reader = EmissionFactorReader(self.workbook, self.index, self.fingerprint)
+        self.activity_summary_reader = ActivitySummaryReader(self.workbook, self.index, self.fingerprint)
+        self.reduction_action_reader = ReductionActionReader(self.workbook, self.index, self.fingerprint)
 
     def get_all_context(self) -> Dict[str, Any]:
         """
@@ -70,69 +107,37 @@ class ExcelDataReaderRefactored(BaseReader):
         Returns:
             包含所有提取数据的字典
         """
-        result = {}
-
-        print(f"[数据读取] 开始处理工作簿，共 {len(self.workbook.sheetnames)} 个工作表")
-
-        # ========== 首先提取基本信息 ==========
-        basic_info = self.basic_info_reader.extract()
-        result.update(basic_info)
-
-        # ========== 提取范围三类别数据 ==========
-        scope3_data = self.scope3_reader.extract_all()
-        result.update(scope3_data)
+        return self.add_quantification_methods(self.extract_context())
 
-        # ========== 提取范围二数据 ==========
-        scope2_data = self.scope2_reader.extract_all()
-        result.update(scope2_data)
-
-        # ========== 提取减排措施数据 ==========
-        reduction_action_data = self.reduction_action_reader.extract()
-        result.update(reduction_action_data)
-
-        # ========== 添加 quantification_methods ==========
-        if HAS_REPORT_CONFIG and result.get('company_name'):
-            report_config = ReportConfig(
-                company_name=result['company_name'],
-                reporting_period=result.get('reporting_period', '2024年')
-            )
-            result['quantification_methods'] = report_config.get_quantification_methods()
-        else:
-            result['quantification_methods'] = {}
-
-        # ========== 提取范围三详细数据（从温室气体盘查清册）==========
-        scope3_detail_data = self._extract_scope3_detail_data()
-        result.update(scope3_detail_data)
-
-        # ========== 提取表1和表2的数据（从表1温室气体盘查表）==========
-        table1_table2_data = self.activity_summary_reader.extract_table1_table2_data()
-        result.update(table1_table2_data)
+    def extract_context(self) -> Dict[str, Any]:
+        """
+        从工作簿提取数据（不含量化方法说明）
 
-        # ========== 提取范围一详细数据（从温室气体盘查清册表）==========
-        scope1_detail_data = self.scope1_reader.extract_all()
-        result.update(scope1_detail_data)
+        结果只取决于工作簿内容和 data_reader 的代码，可以直接缓存；量化方法说明
+        来自 report_config，由 add_quantification_methods 在提取或读取缓存之后补充。
 
-        # ========== 遍历所有工作表，识别并提取表格数据 ==========
-        for sheet in self.workbook.worksheets:
-            sheet_name = sheet.title
+        Returns:
+            提取数据的字典
+        """
+        result = {}
 
-            # 识别表格类型
-            protocol_name = self.fingerprint.identify(sheet, sheet_name)
+        logger.info("[数据读取] 开始处理工作簿，共 %s 个工作表", len(self.index.sheetnames))
 
-            if protocol_name:
-                protocol = TABLE_PROTOCOLS[protocol_name]
-                output_var = protocol.output_var
+        reader_tasks = self._reader_tasks()
+        sheet_tasks = self._sheet_tasks()
+        outputs = self._run_tasks(reader_tasks + sheet_tasks)
+        reader_outputs = outputs[:len(reader_tasks)]
+        sheet_outputs = outputs[len(reader_tasks):]
 
-                # 排放因子表特殊处理：多子表提取
-                if protocol_name == 'EmissionFactorProtocol' and '附表2-EF' in sheet_name:
-                    data_items = self.emission_factor_reader.extract_all()
-                else:
-                    # 提取数据
-                    data_items = self.extractor.extract_from_sheet(sheet, protocol_name)
+        # ========== 按固定顺序合并各读取器的结果 ==========
+        for output in reader_outputs:
+            result.update(output)
 
-                # 存储结果
+        # ========== 合并按工作表识别提取的表格数据 ==========
+        for sheet_output in sheet_outputs:
+            if sheet_output is not None:
+                output_var, data_items = sheet_output
                 result[output_var] = data_items
-                print(f"[数据读取] {sheet_name} -> {output_var}: {len(data_items)} 行")
 
         # 确保所有输出变量都被初始化
         for protocol in TABLE_PROTOCOLS.values():
@@ -140,13 +145,27 @@ class ExcelDataReaderRefactored(BaseReader):
                 result[protocol.output_var] = []
 
         # ========== 后处理：类别分组 ==========
-        result = self._post_process_emission_factors(result)
-        result = self._post_process_scope1_emissions(result)
-        result = self._post_process_activity_summaries(result)
-        result = self._post_process_scope3_ef_items(result)
+        with stage('post_process'):
+            result = self._post_process_emission_factors(result)
+            result = self._post_process_scope1_emissions(result)
+            result = self._post_process_activity_summaries(result)
+            result = self._post_process_scope3_ef_items(result)
 
-        # ========== 后处理：更新 Flags 标记 ==========
-        result = self._update_flags(result)
+            # ========== 后处理：更新 Flags 标记 ==========
+            result = self._update_flags(result)
+
+        return result
+
+    @classmethod
+    def add_quantification_methods(cls, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        根据提取结果生成量化方法说明（quantification_methods），写入并返回 result
+
+        量化方法的模板来自 report_config，不进入提取结果缓存：每次生成报告时
+        （包括命中缓存时）都重新计算，修改 report_config 后立即生效。
+        """
+        # quantification_methods 依赖基本信息中的 company_name
+        result['quantification_methods'] = cls._quantification_methods(result)
 
         # ================= V18 最终整合版：含高压开关与耗氧池修正 ================= 
         
@@ -289,6 +308,123 @@ class ExcelDataReaderRefactored(BaseReader):
 
         return result
 
+    def _reader_tasks(self) -> List[ExtractTask]:
+        """
+        各专项读取器的提取任务（名称, 无参调用, 依赖的工作表, 代码模块），按串行模式合并结果的顺序排列
+
+        各任务之间没有数据依赖（quantification_methods 对 company_name 的依赖
+        在提取之后由 add_quantification_methods 处理）。
+        """
+        def reader_task(name, reader, method):
+            return name, method, reader.input_sheets(), (type(reader).__module__,)
+
+        return [
+            reader_task('basic_info', self.basic_info_reader,                       # 基本信息
+                        self.basic_info_reader.extract),
+            reader_task('scope3', self.scope3_reader,                               # 范围三类别数据
+                        self.scope3_reader.extract_all),
+            reader_task('scope2', self.scope2_reader,                               # 范围二数据
+                        self.scope2_reader.extract_all),
+            reader_task('reduction_action', self.reduction_action_reader,           # 减排措施数据
+                        self.reduction_action_reader.extract),
+            ('scope3_detail', self._extract_scope3_detail_data, [], (__name__,)),   # 范围三详细数据（盘查清册）
+            reader_task('table1_table2', self.activity_summary_reader,              # 表1和表2
+                        self.activity_summary_reader.extract_table1_table2_data),
+            reader_task('scope1', self.scope1_reader,                               # 范围一详细数据（盘查清册）
+                        self.scope1_reader.extract_all),
+        ]
+
+    def _sheet_tasks(self) -> List[ExtractTask]:
+        """每个工作表的识别提取任务（按工作簿顺序）"""
+        tasks = []
+        base_modules = (__name__, type(self.fingerprint).__module__, type(self.extractor).__module__)
+        for sheet in self.index.worksheets:
+            inputs = [sheet]
+            modules = base_modules
+            if '附表2-EF' in sheet.title:
+                # 排放因子表由 EmissionFactorReader 查找并提取
+                inputs += self.emission_factor_reader.input_sheets()
+                modules += (type(self.emission_factor_reader).__module__,)
+            tasks.append((f'sheet:{sheet.title}', functools.partial(self._extract_sheet, sheet),
+                          BaseReader._present_sheets(*inputs), modules))
+        return tasks
+
+    def _run_tasks(self, tasks: List[ExtractTask]) -> List[Any]:
+        """
+        运行提取任务，返回与 tasks 顺序一致的输出
+
+        启用缓存时先按依赖工作表的内容摘要和所运行代码的源码摘要查找缓存，
+        只运行未命中的任务，并把新结果写回缓存（写完后统一淘汰一次旧条目）。
+        """
+        outputs = [_PENDING] * len(tasks)
+        keys = [None] * len(tasks)
+        if self.cache is not None:
+            with stage('sheet_digests'):
+                with zipfile.ZipFile(self.file_path) as archive:
+                    digests = sheet_digests(archive)
+            for i, (name, _, inputs, modules) in enumerate(tasks):
+                keys[i] = self.cache.make_task_key(
+                    name, [(sheet.title, digests.get(sheet.title, '')) for sheet in inputs], modules)
+                entry = self.cache.load(keys[i])
+                # 缓存条目记录任务名称，防止误用其他任务的输出
+                if isinstance(entry, dict) and entry.get('task') == name:
+                    outputs[i] = entry['output']
+
+        pending = [i for i, output in enumerate(outputs) if output is _PENDING]
+        if self.cache is not None:
+            logger.info("[缓存] 复用 %s/%s 个提取任务的缓存结果，重新提取: %s",
+                        len(tasks) - len(pending), len(tasks),
+                        ', '.join(tasks[i][0] for i in pending) or '无')
+
+        for i in pending:
+            outputs[i] = tasks[i][1]()
+
+        if self.cache is not None:
+            # 在合并和后处理修改输出之前写入缓存
+            for i in pending:
+                self.cache.store(keys[i], {'task': tasks[i][0], 'output': outputs[i]}, evict=False)
+            if pending:
+                self.cache.evict()
+        return outputs
+
+    @staticmethod
+    def _quantification_methods(result: Dict[str, Any]) -> Dict[str, Any]:
+        """根据已提取的公司名称生成量化方法说明（缺少 ReportConfig 或公司名称时为空）"""
+        if HAS_REPORT_CONFIG and result.get('company_name'):
+            report_config = ReportConfig(
+                company_name=result['company_name'],
+                reporting_period=result.get('reporting_period', '2024年')
+            )
+            return report_config.get_quantification_methods()
+        return {}
+
+    def _extract_sheet(self, sheet) -> Optional[Tuple[str, list]]:
+        """
+        识别单个工作表的表格类型并提取数据
+
+        Returns:
+            (输出变量名, 数据行列表)，未识别的工作表返回 None
+        """
+        sheet_name = sheet.title
+
+        # 识别表格类型
+        protocol_name = self.fingerprint.identify(sheet, sheet_name)
+        if not protocol_name:
+            return None
+
+        protocol = TABLE_PROTOCOLS[protocol_name]
+        output_var = protocol.output_var
+
+        # 排放因子表特殊处理：多子表提取
+        if protocol_name == 'EmissionFactorProtocol' and '附表2-EF' in sheet_name:
+            data_items = self.emission_factor_reader.extract_all()
+        else:
+            # 提取数据
+            data_items = self.extractor.extract_from_sheet(sheet, protocol_name)
+
+        logger.debug("[数据读取] %s -> %s: %s 行", sheet_name, output_var, len(data_items))
+        return output_var, data_items
+
     def _post_process_emission_factors(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """后处理排放因子表数据"""
         if 'pro_ef_items' not in result or not result['pro_ef_items']:
@@ -336,11 +472,11 @@ class ExcelDataReaderRefactored(BaseReader):
         result['emission_factor_fugitive_items'] = fugitive_items
         result['emission_factor_items'] = combustion_items + process_items + fugitive_items
 
-        print("[后处理] 排放因子表数据分组:")
-        print(f"  emission_factor_combustion_items (表格22-燃烧): {len(combustion_items)} 条")
-        print(f"  emission_factor_process_items (表格23-制程): {len(process_items)} 条")
-        print(f"  emission_factor_fugitive_items (表格24-逸散): {len(fugitive_items)} 条")
-        print(f"  emission_factor_items (总计): {len(result['emission_factor_items'])} 条")
+        logger.info("[后处理] 排放因子表数据分组:")
+        logger.info("  emission_factor_combustion_items (表格22-燃烧): %s 条", len(combustion_items))
+        logger.info("  emission_factor_process_items (表格23-制程): %s 条", len(process_items))
+        logger.info("  emission_factor_fugitive_items (表格24-逸散): %s 条", len(fugitive_items))
+        logger.info("  emission_factor_items (总计): %s 条", len(result['emission_factor_items']))
 
         # 处理外购能源间接排放因子（范围二排放因子）
         scope2_ef_raw_items = [
@@ -362,7 +498,7 @@ class ExcelDataReaderRefactored(BaseReader):
             indir_ef_items.append(mapped_item)
 
         result['indir_ef_items'] = indir_ef_items
-        print(f"  indir_ef_items (外购能源间接排放因子): {len(indir_ef_items)} 条")
+        logger.debug("  indir_ef_items (外购能源间接排放因子): %s 条", len(indir_ef_items))
 
         return result
 
@@ -371,10 +507,10 @@ class ExcelDataReaderRefactored(BaseReader):
         if 'scope1_emissions_items' in result and result['scope1_emissions_items']:
             grouped_data = group_scope1_emissions(result['scope1_emissions_items'])
             result.update(grouped_data)
-            print("[后处理] 范围一排放按类别分组:")
+            logger.info("[后处理] 范围一排放按类别分组:")
             for group_name, items in grouped_data.items():
                 if items:
-                    print(f"  {group_name}: {len(items)} 条")
+                    logger.debug("  %s: %s 条", group_name, len(items))
 
         return result
 
@@ -406,7 +542,7 @@ class ExcelDataReaderRefactored(BaseReader):
 
             result['act_summary_loc'] = location_items
             result['activity_summary_location_items'] = location_items
-            print(f"[后处理] act_summary_loc (基于位置): {len(location_items)} 行")
+            logger.info("[后处理] act_summary_loc (基于位置): %s 行", len(location_items))
 
         # 处理基于市场的活动数据汇总表
         if 'activity_summary_market_items' in result:
@@ -433,7 +569,7 @@ class ExcelDataReaderRefactored(BaseReader):
                 market_items.append(mapped_item)
 
             result['act_summary_mar'] = market_items
-            print(f"[后处理] act_summary_mar (基于市场): {len(market_items)} 行")
+            logger.info("[后处理] act_summary_mar (基于市场): %s 行", len(market_items))
 
         return result
 
@@ -521,9 +657,9 @@ class ExcelDataReaderRefactored(BaseReader):
             result[f'{cat_prefix}_ef_items'] = cat_ef_items
             if items:
                 category_name = items[0].get('category', '')[:40]
-                print(f"  {cat_prefix}_ef_items (类别{cat_num}): {len(cat_ef_items)} 条")
+                logger.debug("  %s_ef_items (类别%s): %s 条", cat_prefix, cat_num, len(cat_ef_items))
             else:
-                print(f"  {cat_prefix}_ef_items (类别{cat_num}): 0 条 - 无数据")
+                logger.debug("  %s_ef_items (类别%s): 0 条 - 无数据", cat_prefix, cat_num)
 
         return result
 
@@ -538,21 +674,15 @@ class ExcelDataReaderRefactored(BaseReader):
         if 'flags' not in data:
             data['flags'] = {}
 
-        def safe_float(value):
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                return 0.0
-
-        data['flags']['has_scope_1'] = safe_float(data.get('scope_1_emissions', 0)) > 0
-        data['flags']['has_scope_2_location'] = safe_float(data.get('scope_2_location_based_emissions', 0)) > 0
-        data['flags']['has_scope_2_market'] = safe_float(data.get('scope_2_market_based_emissions', 0)) > 0
-        data['flags']['has_scope_3'] = safe_float(data.get('scope_3_emissions', 0)) > 0
+        data['flags']['has_scope_1'] = to_float(data.get('scope_1_emissions', 0)) > 0
+        data['flags']['has_scope_2_location'] = to_float(data.get('scope_2_location_based_emissions', 0)) > 0
+        data['flags']['has_scope_2_market'] = to_float(data.get('scope_2_market_based_emissions', 0)) > 0
+        data['flags']['has_scope_3'] = to_float(data.get('scope_3_emissions', 0)) > 0
 
         for i in range(1, 16):
             key = f'scope_3_category_{i}_emissions'
             flag_key = f'has_scope_3_category_{i}'
-            data['flags'][flag_key] = safe_float(data.get(key, 0)) > 0
+            data['flags'][flag_key] = to_float(data.get(key, 0)) > 0
 
         return data
 
@@ -0,0 +1,259 @@
+"""
+性能剖析模块
+=====================
+
+为报告生成流程提供阶段级的耗时和内存统计：
+- 每个阶段记录墙钟时间、CPU 时间、tracemalloc 峰值内存和处理行数
+- 阶段可以嵌套（如 步骤1 -> Scope1Reader.extract_all），结果是一棵阶段树
+- 结果可导出为 JSON，供脚本分析
+
+没有激活的剖析器时，stage() / step() / @profiled 都是空操作，不影响正常运行。
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+class StageRecord:
+    """单个阶段的统计信息"""
+
+    __slots__ = ('name', 'wall', 'cpu', 'peak_bytes', 'rows', 'children',
+                 '_wall_start', '_cpu_start', '_child_peak')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_bytes: Optional[int] = None
+        self.rows: Optional[int] = None
+        self.children: List['StageRecord'] = []
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+        self._child_peak = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'name': self.name,
+            'wall_seconds': round(self.wall, 6),
+            'cpu_seconds': round(self.cpu, 6),
+            'peak_bytes': self.peak_bytes,
+            'rows': self.rows,
+        }
+        if self.children:
+            result['children'] = [child.to_dict() for child in self.children]
+        return result
+
+
+class _NullRecord:
+    """没有激活剖析器时 stage() 返回的占位记录，写入的属性直接丢弃"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+
+
+class Profiler:
+    """阶段剖析器"""
+
+    def __init__(self, trace_memory: bool = True):
+        """
+        Args:
+            trace_memory: 是否使用 tracemalloc 统计各阶段的峰值内存（会明显拖慢运行速度）
+        """
+        self.trace_memory = trace_memory
+        self.root = StageRecord('total')
+        self._stack: List[StageRecord] = []
+        self._step: Optional[StageRecord] = None
+        self._started_tracemalloc = False
+
+    # ------------------------------------------------------------------
+    # 开始 / 结束
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """开始剖析"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._begin(self.root)
+        self._stack = [self.root]
+
+    def stop(self):
+        """结束剖析，关闭所有未结束的阶段"""
+        while self._stack:
+            self._end(self._stack.pop())
+        self._step = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _begin(self, record: StageRecord):
+        if self.trace_memory and tracemalloc.is_tracing():
+            # 把外层阶段到目前为止的峰值记到外层，再为本阶段重新计峰值
+            if self._stack:
+                parent = self._stack[-1]
+                parent._child_peak = max(parent._child_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        record._wall_start = time.perf_counter()
+        record._cpu_start = time.process_time()
+
+    def _end(self, record: StageRecord):
+        record.wall += time.perf_counter() - record._wall_start
+        record.cpu += time.process_time() - record._cpu_start
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], record._child_peak)
+            record.peak_bytes = max(record.peak_bytes or 0, peak)
+            # 外层阶段的峰值至少是本阶段的峰值
+            if self._stack:
+                parent = self._stack[-1]
+                parent._child_peak = max(parent._child_peak, peak)
+
+    # ------------------------------------------------------------------
+    # 阶段
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def stage(self, name: str):
+        """统计一个嵌套阶段，返回的记录可以设置 rows"""
+        record = StageRecord(name)
+        parent = self._stack[-1] if self._stack else self.root
+        parent.children.append(record)
+        self._begin(record)
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            self._stack.pop()
+            self._end(record)
+
+    def step(self, name: str) -> StageRecord:
+        """
+        顺序步骤：结束上一个 step() 开启的步骤并开始新步骤，
+        适合按编号顺序执行、不便用 with 包裹的长流程
+        """
+        self.end_step()
+        record = StageRecord(name)
+        self._stack[-1].children.append(record)
+        self._begin(record)
+        self._stack.append(record)
+        self._step = record
+        return record
+
+    def end_step(self):
+        """结束当前步骤（没有进行中的步骤时不做任何事）"""
+        if self._step is None:
+            return
+        # 步骤内未正常结束的嵌套阶段一并结束
+        while self._stack and self._stack[-1] is not self._step:
+            self._end(self._stack.pop())
+        if self._stack:
+            self._end(self._stack.pop())
+        self._step = None
+
+    # ------------------------------------------------------------------
+    # 导出
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_memory': self.trace_memory,
+            'profile': self.root.to_dict(),
+        }
+
+    def write_json(self, path: str):
+        """将剖析结果写入 JSON 文件"""
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(self.to_dict(), fh, ensure_ascii=False, indent=2)
+
+
+# 当前激活的剖析器
+_ACTIVE: Optional[Profiler] = None
+
+
+def active_profiler() -> Optional[Profiler]:
+    """获取当前激活的剖析器（未激活时为 None）"""
+    return _ACTIVE
+
+
+@contextmanager
+def profiling(profiler: Profiler):
+    """在 with 块内激活剖析器"""
+    global _ACTIVE
+    previous = _ACTIVE
+    _ACTIVE = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _ACTIVE = previous
+
+
+@contextmanager
+def stage(name: str):
+    """在当前激活的剖析器中统计一个阶段（未激活时为空操作）"""
+    if _ACTIVE is None:
+        yield _NULL_RECORD
+        return
+    with _ACTIVE.stage(name) as record:
+        yield record
+
+
+def step(name: str):
+    """在当前激活的剖析器中开始一个顺序步骤（未激活时为空操作），返回步骤记录"""
+    if _ACTIVE is None:
+        return _NULL_RECORD
+    return _ACTIVE.step(name)
+
+
+def count_rows(result: Any) -> Optional[int]:
+    """统计提取结果的行数：列表取长度，字典累加其中列表的长度"""
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values() if isinstance(v, (list, tuple)))
+    return None
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """
+    装饰器：把函数调用作为一个阶段统计，行数由 count_rows(返回值) 得到
+
+    Args:
+        name: 阶段名称（默认为函数的限定名，如 Scope1Reader.extract_all）
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE is None:
+                return func(*args, **kwargs)
+            with _ACTIVE.stage(stage_name) as record:
+                result = func(*args, **kwargs)
+                record.rows = count_rows(result)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    'Profiler',
+    'StageRecord',
+    'active_profiler',
+    'count_rows',
+    'profiled',
+    'profiling',
+    'stage',
+    'step',
+]
@@ -5,6 +5,8 @@
 定义所有表格类型的识别规则和字段映射。
 """
 
+from typing import Dict
+
 from .config import TableProtocol, FieldMapping, _PROTOCOL_ORDER
 
 
@@ -5,14 +5,24 @@
 从Excel中提取活动数据汇总表数据。
 """
 
+import logging
 from typing import Dict, List, Any
 
 from .base import BaseReader
+from ..profiling import profiled
+from ..workbook_index import SheetIndex
+
+logger = logging.getLogger(__name__)
 
 
 class ActivitySummaryReader(BaseReader):
     """活动数据汇总表读取器"""
 
+    def input_sheets(self) -> List[SheetIndex]:
+        """表1温室气体盘查表"""
+        return self._present_sheets(self.find_sheet_by_name('表1', '温室气体盘查表'))
+
+    @profiled()
     def extract_table1_table2_data(self) -> Dict[str, Any]:
         """
         从表1温室气体盘查表中提取表1和表2的数据
@@ -26,22 +36,22 @@ class ActivitySummaryReader(BaseReader):
 
         current_category = "" 
         # 提取数据（从第5行开始） 
-        for row in table1_data.iter_rows(min_row=5): 
+        for row in table1_data.iter_values(5): 
             # 确保至少有8列（包含H列，索引为7） 
             if len(row) < 8: continue 
 
-            ghg_category = row[1].value 
+            ghg_category = row[1] 
             if ghg_category: current_category = str(ghg_category).strip() 
 
-            boundary_str = str(row[4].value).strip() if row[4].value else '' 
+            boundary_str = str(row[4]).strip() if row[4] else '' 
             
             # 封装数据项，增加 data_source (H列) 
             item = { 
                 'name': current_category, 
-                'number': str(row[0].value).strip() if row[0].value else '', 
-                'emission_source': str(row[2].value).strip() if row[2].value else '', 
-                'facility': str(row[3].value).strip() if row[3].value else '', 
-                'data_source': str(row[7].value).strip() if row[7].value else '' # 核心修改 
+                'number': str(row[0]).strip() if row[0] else '', 
+                'emission_source': str(row[2]).strip() if row[2] else '', 
+                'facility': str(row[3]).strip() if row[3] else '', 
+                'data_source': str(row[7]).strip() if row[7] else '' # 核心修改 
             } 
 
             if '范围一' in boundary_str: 
@@ -49,8 +59,8 @@ class ActivitySummaryReader(BaseReader):
             elif '范围二' in boundary_str or '范围三' in boundary_str: 
                 result['scope2_3_items'].append(item) 
         
-        print(f"[表1表2] scope1_items: {len(result['scope1_items'])} 行")
-        print(f"[表1表2] scope2_3_items: {len(result['scope2_3_items'])} 行")
+        logger.info("[表1表2] scope1_items: %s 行", len(result['scope1_items']))
+        logger.info("[表1表2] scope2_3_items: %s 行", len(result['scope2_3_items']))
 
         return result
 
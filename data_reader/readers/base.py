@@ -6,26 +6,32 @@
 """
 
 import openpyxl
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
+from ..convert import is_error, to_float, to_str
 from ..protocols import TABLE_PROTOCOLS
 from ..fingerprint import TableFingerprint
 from ..extractor import ProtocolExtractor
+from ..workbook_index import SheetIndex, SheetRow, WorkbookIndex, worksheet_merged_anchors
 
 
 class BaseReader:
     """数据读取器基类"""
 
-    def __init__(self, workbook: openpyxl.Workbook):
+    def __init__(self, workbook: openpyxl.Workbook, index: Optional[WorkbookIndex] = None,
+                 fingerprint: Optional[TableFingerprint] = None):
         """
         初始化读取器
 
         Args:
             workbook: openpyxl工作簿对象
+            index: 共享的工作簿索引（未提供时从 workbook 构建）
+            fingerprint: 共享的表格识别器（未提供时新建），共享后每个工作表只识别一次
         """
         self.workbook = workbook
+        self.index = index if index is not None else WorkbookIndex.from_workbook(workbook)
         self.extractor = ProtocolExtractor()
-        self.fingerprint = TableFingerprint()
+        self.fingerprint = fingerprint if fingerprint is not None else TableFingerprint()
 
     def get_protocol_data(self, protocol_name: str) -> list:
         """
@@ -38,12 +44,12 @@ class BaseReader:
             提取的数据列表
         """
         # 查找匹配该协议的工作表
-        for sheet in self.workbook.worksheets:
+        for sheet in self.index.worksheets:
             if self.fingerprint.identify(sheet, sheet.title) == protocol_name:
                 return self.extractor.extract_from_sheet(sheet, protocol_name)
         return []
 
-    def find_sheet_by_name(self, *name_patterns: str) -> Optional[openpyxl.worksheet.Worksheet]:
+    def find_sheet_by_name(self, *name_patterns: str) -> Optional[SheetIndex]:
         """
         根据名称模式查找工作表
 
@@ -51,20 +57,34 @@ class BaseReader:
             *name_patterns: 名称模式，所有模式都匹配才返回
 
         Returns:
-            匹配的工作表，未找到返回None
+            匹配工作表的索引，未找到返回None
         """
-        for sheet in self.workbook.worksheets:
-            sheet_name = sheet.title
-            if all(pattern and pattern in sheet_name for pattern in name_patterns):
-                return sheet
-        return None
-
-    def is_error_value(self, value) -> bool:
-        """检查是否为 Excel 错误值"""
-        if value is None:
-            return False
-        v_str = str(value).strip().upper()
-        return v_str in ['#REF!', '#VALUE!', '#DIV/0!', '#NAME?', '#N/A', '#NULL!', '#NUM!']
+        return self.index.find_sheet(*name_patterns)
+
+    def input_sheets(self) -> List[SheetIndex]:
+        """
+        提取结果所依赖的工作表（增量提取时据此判断是否需要重新提取）
+
+        默认保守地依赖所有工作表，子类按实际查找工作表的方式覆盖。
+        """
+        return list(self.index.worksheets)
+
+    @staticmethod
+    def _present_sheets(*sheets: Optional[SheetIndex]) -> List[SheetIndex]:
+        """去掉未找到（None）和重复的工作表，保持原有顺序"""
+        result = []
+        for sheet in sheets:
+            if sheet is not None and sheet not in result:
+                result.append(sheet)
+        return result
+
+    # 单元格值转换统一使用 data_reader.convert（按原始值类型分派，数值单元格直接返回）
+    # 检查是否为 Excel 错误值
+    is_error_value = staticmethod(is_error)
+    # 安全地转换为浮点数，处理 Excel 错误值和千分位逗号
+    safe_float = staticmethod(to_float)
+    # 安全地转换为字符串，处理 Excel 错误值
+    safe_str = staticmethod(to_str)
 
     def natural_sort_key(self, s: str):
         """用于编号（如 1.1, 1.10, 3.2.3）的自然排序键"""
@@ -75,41 +95,10 @@ class BaseReader:
         return [int(text) if text.isdigit() else text.lower()
                 for text in re.split('([0-9]+)', str(s))]
 
-    def safe_float(self, value) -> float:
-        """安全地转换为浮点数，处理 Excel 错误值"""
-        try:
-            if value is None:
-                return 0.0
-            
-            # 处理常见的 Excel 错误字符串
-            if isinstance(value, str):
-                v_str = value.strip().upper()
-                if v_str in ['#REF!', '#VALUE!', '#DIV/0!', '#NAME?', '#N/A', '#NULL!', '#NUM!']:
-                    return 0.0
-                # 去除逗号
-                v_str = v_str.replace(',', '')
-                if not v_str:
-                    return 0.0
-                return float(v_str)
-                
-            return float(value)
-        except (ValueError, TypeError):
-            return 0.0
-
-    def safe_str(self, value) -> str:
-        """安全地转换为字符串，处理 Excel 错误值"""
-        if value is None:
-            return ''
-        
-        v_str = str(value).strip()
-        # 处理常见的 Excel 错误字符串
-        if v_str.upper() in ['#REF!', '#VALUE!', '#DIV/0!', '#NAME?', '#N/A', '#NULL!', '#NUM!']:
-            return ''
-            
-        return v_str
-
     def safe_get_cell(self, row, col_idx):
         """安全获取单元格值"""
+        if isinstance(row, SheetRow):
+            return row.get(col_idx)
         try:
             if col_idx < len(row):
                 cell = row[col_idx]
@@ -117,13 +106,12 @@ class BaseReader:
                     return cell.value
                 try:
                     ws = getattr(cell, 'parent', None)
-                    coord = getattr(cell, 'coordinate', None)
-                    merged_ranges = getattr(getattr(ws, 'merged_cells', None), 'ranges', None)
-                    if ws is not None and coord and merged_ranges:
-                        for merged_range in merged_ranges:
-                            if coord in merged_range:
-                                top_left = ws.cell(merged_range.min_row, merged_range.min_col)
-                                return top_left.value if top_left.value is not None else ''
+                    if ws is not None:
+                        # 按工作表缓存的锚点表，避免逐个遍历合并区域
+                        anchor = worksheet_merged_anchors(ws).get((cell.row, cell.column))
+                        if anchor:
+                            top_left = ws.cell(*anchor)
+                            return top_left.value if top_left.value is not None else ''
                 except Exception:
                     pass
                 return ''
@@ -5,16 +5,27 @@
 从Excel中提取基本信息数据。
 """
 
+import logging
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from .base import BaseReader
 from ..utils import excel_date_to_string, clean_multiline_text
+from ..profiling import profiled
+from ..workbook_index import SheetIndex
+
+logger = logging.getLogger(__name__)
 
 
 class BasicInfoReader(BaseReader):
     """基本信息读取器"""
 
+    def input_sheets(self) -> List[SheetIndex]:
+        """基本信息表，以及缺少基本信息表时备用的盘查清册"""
+        return self._present_sheets(self.find_sheet_by_name('基本信息'),
+                                    self.find_sheet_by_name('盘查清册', '清册'))
+
+    @profiled()
     def extract(self) -> Dict[str, Any]:
         """
         提取基本信息
@@ -51,9 +62,9 @@ class BasicInfoReader(BaseReader):
         basic_info_sheet = self.find_sheet_by_name('基本信息')
 
         if basic_info_sheet:
-            print(f"[基本信息] 找到基本信息表: {basic_info_sheet.title}")
+            logger.info("[基本信息] 找到基本信息表: %s", basic_info_sheet.title)
             # 读取基本信息：第2列是属性代码(key)，第3列是值(value)
-            for row in basic_info_sheet.iter_rows(min_row=2, max_row=50, values_only=True):
+            for row in basic_info_sheet.iter_values(2, 50):
                 if len(row) >= 3 and row[1] and row[2]:
                     key = str(row[1]).strip()  # 第2列：属性代码
                     value = row[2]  # 第3列：值
@@ -96,13 +107,13 @@ class BasicInfoReader(BaseReader):
                     elif key in result:
                         result[key] = value
 
-            print(f"[基本信息] 公司名称: {result.get('company_name')}")
+            logger.info("[基本信息] 公司名称: %s", result.get('company_name'))
         else:
-            print("[基本信息] 未找到基本信息表，尝试从温室气体盘查清册提取...")
+            logger.info("[基本信息] 未找到基本信息表，尝试从温室气体盘查清册提取...")
             # 尝试从温室气体盘查清册提取
             inventory_sheet = self.find_sheet_by_name('盘查清册', '清册')
             if inventory_sheet:
-                for row in inventory_sheet.iter_rows(max_row=20, values_only=True):
+                for row in inventory_sheet.iter_values(1, 20):
                     if len(row) >= 3:
                         if row[1] == '组织名称：' and row[2]:
                             result['company_name'] = row[2]
@@ -5,16 +5,207 @@
 从Excel中提取排放因子表数据（包含多个子表）。
 """
 
+import functools
+import logging
 import re
-import openpyxl
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional
 
 from .base import BaseReader
+from ..utils import KeywordMatcher
+from ..workbook_index import SheetIndex, SheetRow
+from ..profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# 子表类型识别
+# ---------------------------------------------------------------------------
+
+# 显式的范围三类别标识："范围三 类别N" / "范围三类别N" / "范围3 类别N"
+_SCOPE3_CATEGORY_RE = re.compile(r'(?:范围三 ?|范围3 )类别([0-9]+)')
+_SCOPE3_CATEGORY_NUMBERS = frozenset(str(n) for n in range(1, 16))
+
+# 旧格式的范围三类别关键词（按优先级排列）
+_SCOPE3_KEYWORDS = {
+    '外购商品和服务': 'scope3_cat1',
+    '铁矿石': 'scope3_cat1',
+    '资本货物': 'scope3_cat2',
+    '燃料和能源相关': 'scope3_cat3',
+    '上下游运输配送': 'scope3_cat4',
+    '运营中产生的废物': 'scope3_cat5',
+    '商务旅行': 'scope3_cat6',
+    '员工通勤': 'scope3_cat7',
+    '上游租赁资产': 'scope3_cat8',
+    '下游运输配送': 'scope3_cat9',
+    '外销产品加工': 'scope3_cat10',
+    '外销产品使用': 'scope3_cat11',
+    '外售产品报废': 'scope3_cat12',
+}
+
+# 类型识别用到的所有关键词，一次扫描得到表头文本中出现的全部关键词
+_TYPE_KEYWORDS = KeywordMatcher((
+    '范围二', '范围2', '范围一', '范围1',
+    '低位发热量', '氧化率', '制程排放', '工艺排放', '逸散排放', 'HFCs/PFCs',
+    'CO2排放因子', 'MCF', 'Bo', '外购能源间接排放',
+) + tuple(_SCOPE3_KEYWORDS))
+
+
+def classify_subtable(header_text: str) -> str:
+    """
+    根据表头文本识别子表类型
+
+    支持显式类别标识：
+    - "范围一 XXX" -> combustion/process/fugitive/scope1_combustion
+    - "范围二 XXX" -> scope2
+    - "范围三 类别N XXX" -> scope3_catN (N为1-15)
+
+    Args:
+        header_text: 子表表头行（及第一行数据）的文本
+
+    Returns:
+        子表类型，无法识别时为 'unknown'
+    """
+    # 优先级1：识别范围三 "范围三 类别N"，取编号最大的类别
+    # （子串语义："类别15" 同时包含 "类别1"）
+    categories = [
+        int(digits[:length])
+        for digits in _SCOPE3_CATEGORY_RE.findall(header_text)
+        for length in range(1, len(digits) + 1)
+        if digits[:length] in _SCOPE3_CATEGORY_NUMBERS
+    ]
+    if categories:
+        return f'scope3_cat{max(categories)}'
+
+    found = _TYPE_KEYWORDS.find_all(header_text)
+
+    # 优先级2：识别范围二 "范围二"
+    if '范围二' in found or '范围2' in found:
+        return 'scope2'
+
+    is_combustion = '低位发热量' in found and '氧化率' in found
+
+    # 优先级3：识别范围一排放因子类型
+    if '范围一' in found or '范围1' in found:
+        if is_combustion:
+            return 'combustion'
+        elif '制程排放' in found or '工艺排放' in found:
+            return 'process'
+        elif '逸散排放' in found or 'HFCs/PFCs' in found:
+            return 'fugitive'
+        return 'scope1_combustion'
+
+    # 优先级4：旧格式关键词匹配（向后兼容）
+    if is_combustion:
+        return 'combustion'
+    elif 'CO2排放因子' in found and '制程排放' in found:
+        return 'process'
+    elif 'HFCs/PFCs' in found or 'MCF' in found or 'Bo' in found:
+        return 'fugitive'
+    elif '外购能源间接排放' in found:
+        return 'scope2'
+
+    # 优先级5：范围三类别关键词匹配（旧格式）
+    for keyword, subtable_type in _SCOPE3_KEYWORDS.items():
+        if keyword in found:
+            return subtable_type
+
+    return 'unknown'
+
+
+# ---------------------------------------------------------------------------
+# 子表切分
+# ---------------------------------------------------------------------------
+
+def _cell_text(value) -> str:
+    return '' if value is None else str(value).strip()
+
+
+def _is_number(value) -> bool:
+    """编号列是否为数字（数据行的标志）"""
+    try:
+        float(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _is_subtable_start(row: tuple) -> bool:
+    return any(isinstance(value, str) and value.strip() == '编号' for value in row)
+
+
+class Subtable:
+    """附表2-EF 中的一个子表"""
+
+    __slots__ = ('start', 'end', 'header_text', 'type', 'data_start', 'has_combustion_format')
+
+    def __init__(self, start: int, end: int, header_text: str, subtable_type: str,
+                 data_start: int, has_combustion_format: bool):
+        self.start = start                  # "编号" 所在行
+        self.end = end                      # 下一个子表的开始行（不含），最后一个子表为 max_row + 1
+        self.header_text = header_text      # 表头行及第一行数据的文本，用于类型识别
+        self.type = subtable_type
+        self.data_start = data_start        # 第一行数据（编号列为数字的行）
+        self.has_combustion_format = has_combustion_format  # 表头含"低位发热量"
+
+    def __repr__(self) -> str:
+        return f"Subtable({self.start}-{self.end - 1}, {self.type!r})"
+
+
+def segment_subtables(sheet: SheetIndex) -> List[Subtable]:
+    """
+    切分排放因子表中的所有子表
+
+    每个子表以含"编号"的行开始，到下一个子表开始前结束。一次扫描找出所有开始行，
+    表头（前5行）、第一行数据和数据开始行都直接从已加载的行网格中按行号读取。
+    """
+    rows = sheet.rows
+    starts = [row_idx for row_idx, row in enumerate(rows, start=1) if _is_subtable_start(row)]
+
+    subtables = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else sheet.max_row + 1
+
+        # 前5行作为表头
+        header_texts = [' '.join(_cell_text(value) for value in row)
+                        for row in rows[start - 1:min(start + 4, end - 1)]]
+        has_combustion_format = '低位发热量' in ' '.join(header_texts)
+
+        # 第一行数据（编号列为数字）的类别信息也参与识别
+        for row in rows[start + 1:min(start + 9, end - 1)]:
+            if len(row) > 1 and _is_number(row[1]):
+                header_texts.append(' '.join(_cell_text(value) for value in row[:8]))
+                break
+        header_text = ' '.join(header_texts)
+
+        # 动态确定数据开始行
+        data_start = start + 1
+        for row_idx in range(start + 1, min(start + 6, end)):
+            row = rows[row_idx - 1]
+            if len(row) > 1 and _is_number(row[1]):
+                data_start = row_idx
+                break
+
+        subtables.append(Subtable(start, end, header_text, classify_subtable(header_text),
+                                  data_start, has_combustion_format))
+    return subtables
+
+
+_SCOPE3_LEGACY_TYPES = frozenset([
+    'scope3_general', 'scope3_capital', 'scope3_fuel',
+    'scope3_transport', 'scope3_waste', 'scope3_business',
+    'scope3_commuting', 'scope3_processing', 'scope3_disposal',
+])
 
 
 class EmissionFactorReader(BaseReader):
     """排放因子表读取器"""
 
+    def input_sheets(self) -> List[SheetIndex]:
+        """附表2-EF"""
+        return self._present_sheets(self.find_sheet_by_name('附表2-EF'))
+
+    @profiled()
     def extract_all(self) -> List[Dict[str, Any]]:
         """
         提取排放因子表的所有子表数据
@@ -26,12 +217,12 @@ class EmissionFactorReader(BaseReader):
         sheet = self.find_sheet_by_name('附表2-EF')
 
         if not sheet:
-            print("[排放因子表] 未找到附表2-EF工作表")
+            logger.warning("[排放因子表] 未找到附表2-EF工作表")
             return []
 
         return self._extract_subtables(sheet)
 
-    def _extract_subtables(self, sheet: openpyxl.worksheet.Worksheet) -> List[Dict[str, Any]]:
+    def _extract_subtables(self, sheet: SheetIndex) -> List[Dict[str, Any]]:
         """
         从排放因子表中提取所有子表的数据
 
@@ -41,203 +232,66 @@ class EmissionFactorReader(BaseReader):
         Returns:
             包含所有子表数据的字典列表
         """
-        print(f"[排放因子表] 开始识别子表...")
+        logger.debug("[排放因子表] 开始识别子表...")
 
-        # 第一步：找到所有"编号"出现的行（子表开始位置）
-        subtable_starts = []
-        for row_idx in range(1, sheet.max_row + 1):
-            for cell in sheet[row_idx]:
-                if cell.value and str(cell.value).strip() == '编号':
-                    subtable_starts.append(row_idx)
-                    break
-
-        print(f"[排放因子表] 找到 {len(subtable_starts)} 个子表")
+        subtables = segment_subtables(sheet)
+        logger.info("[排放因子表] 找到 %s 个子表", len(subtables))
 
         all_data = []
-
-        # 第二步：处理每个子表
-        for i, start_row in enumerate(subtable_starts):
-            end_row = subtable_starts[i + 1] if i + 1 < len(subtable_starts) else sheet.max_row + 1
-
-            # 读取子表的前几行来识别表头结构
-            subtable_data = self._extract_single_subtable(sheet, start_row, end_row)
+        for i, subtable in enumerate(subtables):
+            subtable_data = self._extract_subtable_data(sheet, subtable)
 
             if subtable_data:
                 all_data.extend(subtable_data)
-                print(f"[排放因子表] 子表 {i + 1}: 提取到 {len(subtable_data)} 行数据")
+                logger.debug("[排放因子表] 子表 %s (%s): 提取到 %s 行数据",
+                             i + 1, subtable.type, len(subtable_data))
 
-        print(f"[排放因子表] 总共提取到 {len(all_data)} 行数据")
+        logger.info("[排放因子表] 总共提取到 %s 行数据", len(all_data))
         return all_data
 
-    def _extract_single_subtable(self, sheet: openpyxl.worksheet.Worksheet,
-                                 start_row: int, end_row: int) -> List[Dict[str, Any]]:
-        """
-        从单个排放因子子表中提取数据
-
-        Args:
-            sheet: 工作表对象
-            start_row: 子表开始行
-            end_row: 子表结束行
-
-        Returns:
-            该子表的数据列表
-        """
-        # 读取前5行来识别表头结构
-        header_rows = []
-        for row_idx in range(start_row, min(start_row + 5, end_row)):
-            row = sheet[row_idx]
-            row_data = []
-            for cell in row:
-                value = cell.value if cell.value is not None else ''
-                row_data.append(str(value).strip())
-            header_rows.append(row_data)
-
-        # 查找第一行数据以获取类别信息
-        first_data_row = None
-        for row_idx in range(start_row + 2, min(start_row + 10, end_row)):
-            row = sheet[row_idx]
-            # 检查Col2是否有数字编号
-            if len(row) > 1:
-                col2_value = row[1].value if row[1].value is not None else ''
-                try:
-                    float(col2_value)  # 如果是数字，说明这是数据行
-                    first_data_row = row
-                    break
-                except (ValueError, TypeError):
-                    continue
-
-        # 如果找到数据行，将其信息也添加到header_rows用于识别
-        if first_data_row:
-            data_row_data = []
-            for cell in first_data_row[:8]:
-                value = cell.value if cell.value is not None else ''
-                data_row_data.append(str(value).strip())
-            header_rows.append(data_row_data)
-
-        # 识别子表类型（通过分析表头结构和数据行）
-        subtable_type = self._identify_subtable_type(header_rows)
-
-        # 根据子表类型提取数据
-        return self._extract_subtable_data_by_type(sheet, start_row, end_row, subtable_type)
-
-    def _identify_subtable_type(self, header_rows: List[List[str]]) -> str:
-        """
-        根据表头行识别子表类型
-
-        支持显式类别标识：
-        - "范围一 XXX" -> scope1_combustion/scope1_process/scope1_fugitive
-        - "范围二 XXX" -> scope2
-        - "范围三 类别N XXX" -> scope3_catN (N为1-15)
-
-        Returns:
-            子表类型
-        """
-        # 合并所有表头行进行分析
-        all_text = ' '.join([' '.join(row) for row in header_rows])
-
-        # 优先级1：识别范围三 "范围三 类别N" (简单字符串匹配)
-        for cat_num in range(15, 0, -1):
-            if f'范围三 类别{cat_num}' in all_text or f'范围三类别{cat_num}' in all_text or f'范围3 类别{cat_num}' in all_text:
-                return f'scope3_cat{cat_num}'
-
-        # 优先级2：识别范围二 "范围二"
-        if '范围二' in all_text or '范围2' in all_text:
-            return 'scope2'
-
-        # 优先级3：识别范围一排放因子类型
-        if '范围一' in all_text or '范围1' in all_text:
-            if '低位发热量' in all_text and '氧化率' in all_text:
-                return 'combustion'
-            elif '制程排放' in all_text or '工艺排放' in all_text:
-                return 'process'
-            elif '逸散排放' in all_text or 'HFCs/PFCs' in all_text:
-                return 'fugitive'
-            return 'scope1_combustion'
-
-        # 优先级4：旧格式关键词匹配（向后兼容）
-        if '低位发热量' in all_text and '氧化率' in all_text:
-            return 'combustion'
-        elif 'CO2排放因子' in all_text and '制程排放' in all_text:
-            return 'process'
-        elif 'HFCs/PFCs' in all_text or 'MCF' in all_text or 'Bo' in all_text:
-            return 'fugitive'
-        elif '外购能源间接排放' in all_text:
-            return 'scope2'
-
-        # 优先级5：范围三类别关键词匹配（旧格式）
-        scope3_keywords = {
-            '外购商品和服务': 'scope3_cat1',
-            '铁矿石': 'scope3_cat1',
-            '资本货物': 'scope3_cat2',
-            '燃料和能源相关': 'scope3_cat3',
-            '上下游运输配送': 'scope3_cat4',
-            '运营中产生的废物': 'scope3_cat5',
-            '商务旅行': 'scope3_cat6',
-            '员工通勤': 'scope3_cat7',
-            '上游租赁资产': 'scope3_cat8',
-            '下游运输配送': 'scope3_cat9',
-            '外销产品加工': 'scope3_cat10',
-            '外销产品使用': 'scope3_cat11',
-            '外售产品报废': 'scope3_cat12',
-        }
-
-        for keyword, subtable_type in scope3_keywords.items():
-            if keyword in all_text:
-                return subtable_type
-
-        return 'unknown'
-
-    def _extract_subtable_data_by_type(self, sheet: openpyxl.worksheet.Worksheet,
-                                       start_row: int, end_row: int,
-                                       subtable_type: str) -> List[Dict[str, Any]]:
+    def _row_extractor(self, subtable: Subtable) -> Optional[Callable[[SheetRow], Dict[str, Any]]]:
+        """根据子表类型选择行提取函数（未知类型返回 None）"""
+        subtable_type = subtable.type
+        if subtable_type == 'combustion':
+            return self._extract_combustion_row
+        elif subtable_type == 'process':
+            return self._extract_process_row
+        elif subtable_type == 'fugitive':
+            return self._extract_fugitive_row
+        elif subtable_type == 'scope2':
+            return self._extract_scope2_row
+        elif subtable_type.startswith('scope3_cat'):
+            if subtable.has_combustion_format:
+                return self._extract_combustion_row
+            return functools.partial(self._extract_scope3_row, subtable_type=subtable_type)
+        elif subtable_type in _SCOPE3_LEGACY_TYPES:
+            return functools.partial(self._extract_scope3_row, subtable_type=subtable_type)
+        return None
+
+    def _extract_subtable_data(self, sheet: SheetIndex, subtable: Subtable) -> List[Dict[str, Any]]:
         """
         根据子表类型提取数据
 
         Args:
-            sheet: 工作表对象
-            start_row: 子表开始行
-            end_row: 子表结束行
-            subtable_type: 子表类型
+            sheet: 工作表索引
+            subtable: segment_subtables 切分出的子表
 
         Returns:
             该子表的数据列表
         """
-        data_items = []
-
-        # 检查子表是否有燃烧表格式
-        has_combustion_format = False
-        for row_idx in range(start_row, min(start_row + 5, end_row)):
-            row = sheet[row_idx]
-            for cell in row:
-                if cell.value and isinstance(cell.value, str) and '低位发热量' in cell.value:
-                    has_combustion_format = True
-                    break
-            if has_combustion_format:
-                break
-
-        # 动态确定数据开始行
-        data_start_row = start_row + 1
-        for row_idx in range(start_row + 1, min(start_row + 6, end_row)):
-            row = sheet[row_idx]
-            if len(row) > 1:
-                col2_value = row[1].value if row[1].value is not None else ''
-                try:
-                    float(col2_value)
-                    data_start_row = row_idx
-                    break
-                except (ValueError, TypeError):
-                    continue
-
-        for row_idx in range(data_start_row, end_row):
-            row = sheet[row_idx]
+        extract_row = self._row_extractor(subtable)
+        if extract_row is None:
+            return []
 
+        data_items = []
+        for row in sheet.iter_rows(subtable.data_start, subtable.end - 1):
             # 检查是否是空行
-            if not any(cell.value is not None for cell in row):
+            if not any(value is not None for value in row):
                 continue
 
             # 检查第一列(编号)是否是数字，或者包含特定的前缀。如果不是，可能是标题或备注，跳过。
             # 这可以防止"类别11"这种标题被当作数据行提取到"类别9"中。
-            number_val = row[1].value # 编号在第二列
+            number_val = row[1] # 编号在第二列
             if number_val:
                 number_str = str(number_val).strip()
                 # 如果是"类别X"格式，跳过
@@ -247,27 +301,7 @@ class EmissionFactorReader(BaseReader):
                 if number_str and not number_str[0].isdigit():
                     continue
 
-            # 根据子表类型提取数据
-            if subtable_type == 'combustion':
-                item = self._extract_combustion_row(row)
-            elif subtable_type == 'process':
-                item = self._extract_process_row(row)
-            elif subtable_type == 'fugitive':
-                item = self._extract_fugitive_row(row)
-            elif subtable_type == 'scope2':
-                item = self._extract_scope2_row(row)
-            elif subtable_type.startswith('scope3_cat'):
-                if has_combustion_format:
-                    item = self._extract_combustion_row(row)
-                else:
-                    item = self._extract_scope3_row(row, subtable_type)
-            elif subtable_type in ['scope3_general', 'scope3_capital', 'scope3_fuel',
-                                   'scope3_transport', 'scope3_waste', 'scope3_business',
-                                   'scope3_commuting', 'scope3_processing', 'scope3_disposal']:
-                item = self._extract_scope3_row(row, subtable_type)
-            else:
-                continue
-
+            item = extract_row(row)
             if item and item.get('category'):
                 data_items.append(item)
 
@@ -673,4 +707,4 @@ class EmissionFactorReader(BaseReader):
             return {}
 
 
-__all__ = ['EmissionFactorReader']
+__all__ = ['EmissionFactorReader', 'Subtable', 'classify_subtable', 'segment_subtables']
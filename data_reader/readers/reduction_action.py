@@ -5,14 +5,24 @@
 从Excel中提取今年已实施和明年计划的减排措施数据。
 """
 
+import logging
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base import BaseReader
+from ..profiling import profiled
+from ..utils import KeywordMatcher
+from ..workbook_index import SheetIndex
+
+logger = logging.getLogger(__name__)
+
+# 减排措施表的工作表名称关键词（包含任一即可）
+_SHEET_KEYWORDS = KeywordMatcher(['减排', '措施', '节能', '统计'])
 
 
 class ReductionActionReader(BaseReader):
     """减排措施读取器"""
 
+    @profiled()
     def extract(self) -> Dict[str, Any]:
         """
         提取减排措施数据，区分今年已实施和明年计划
@@ -25,24 +35,27 @@ class ReductionActionReader(BaseReader):
             'planned_reduction_items': [],       # 明年计划
         }
 
-        # 查找减排措施统计表（遍历所有Sheet）
-        reduction_sheet = None
-        for sheet in self.workbook.worksheets:
-            sheet_name = sheet.title
-            # 检查是否包含相关关键词
-            if any(keyword in sheet_name for keyword in ['减排', '措施', '节能', '统计']):
-                reduction_sheet = sheet
-                print(f"[减排措施] 找到表: {sheet_name}")
-                break
-
+        reduction_sheet = self._find_reduction_sheet()
         if not reduction_sheet:
-            print("[减排措施] 未找到减排措施表")
+            logger.warning("[减排措施] 未找到减排措施表")
             return result
 
+        logger.info("[减排措施] 找到表: %s", reduction_sheet.title)
         self._parse_reduction_sheet(reduction_sheet, result)
 
         return result
 
+    def _find_reduction_sheet(self) -> Optional[SheetIndex]:
+        """查找减排措施统计表：第一个名称包含相关关键词的工作表"""
+        for sheet in self.index.worksheets:
+            if _SHEET_KEYWORDS.search(sheet.title):
+                return sheet
+        return None
+
+    def input_sheets(self) -> List[SheetIndex]:
+        """减排措施统计表"""
+        return self._present_sheets(self._find_reduction_sheet())
+
     def _parse_reduction_sheet(self, ws, result: Dict[str, Any]):
         """解析减排措施表"""
         current_section = None
@@ -70,7 +83,7 @@ class ReductionActionReader(BaseReader):
         }
 
         # 遍历所有行
-        for row_idx, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        for row_idx, row in enumerate(ws.iter_values(), start=1):
             # 跳过完全空的行
             if not any(row):
                 continue
@@ -104,10 +117,10 @@ class ReductionActionReader(BaseReader):
 
                 if '已实施' in status:
                     current_section = 'implemented'
-                    print(f"[减排措施] 发现{current_year}年已实施部分 (行{row_idx})")
+                    logger.debug("[减排措施] 发现%s年已实施部分 (行%s)", current_year, row_idx)
                 elif '拟实施' in status or '计划实施' in status:
                     current_section = 'planned'
-                    print(f"[减排措施] 发现{current_year}年计划实施部分 (行{row_idx})")
+                    logger.debug("[减排措施] 发现%s年计划实施部分 (行%s)", current_year, row_idx)
                 continue
 
             # 检查是否是表头行
@@ -116,7 +129,7 @@ class ReductionActionReader(BaseReader):
 
             # 如果没有确定section，输出调试信息
             if not current_section:
-                print(f"[减排措施] 跳过行{row_idx} (未确定section): {first_cell_value[:30]}")
+                logger.debug("[减排措施] 跳过行%s (未确定section): %s", row_idx, first_cell_value[:30])
                 continue
 
             # 解析减排措施条目
@@ -124,15 +137,15 @@ class ReductionActionReader(BaseReader):
             if item:
                 if current_section == 'implemented':
                     result['implemented_reduction_items'].append(item)
-                    print(f"[减排措施] 添加已实施条目: {item.get('plan_name', '')[:30]}")
+                    logger.debug("[减排措施] 添加已实施条目: %s", item.get('plan_name', '')[:30])
                 elif current_section == 'planned':
                     result['planned_reduction_items'].append(item)
-                    print(f"[减排措施] 添加计划条目: {item.get('plan_name', '')[:30]}")
+                    logger.debug("[减排措施] 添加计划条目: %s", item.get('plan_name', '')[:30])
             else:
-                print(f"[减排措施] 行{row_idx}解析失败: {first_cell_value[:30]}")
+                logger.debug("[减排措施] 行%s解析失败: %s", row_idx, first_cell_value[:30])
 
-        print(f"[减排措施] 今年已实施: {len(result['implemented_reduction_items'])} 条")
-        print(f"[减排措施] 明年计划: {len(result['planned_reduction_items'])} 条")
+        logger.info("[减排措施] 今年已实施: %s 条", len(result['implemented_reduction_items']))
+        logger.info("[减排措施] 明年计划: %s 条", len(result['planned_reduction_items']))
 
     def _extract_header_mapping(self, header_row, mapping: Dict[str, int]):
         """提取表头列名映射"""
@@ -5,16 +5,106 @@
 从Excel中提取范围一直接排放源数据。
 """
 
-import openpyxl
+import logging
 from typing import Dict, List, Any
 
 from .base import BaseReader
 from ..post_processors import group_by_emission_category
+from ..inventory import find_inventory_sheets, inventory_rows
+from ..records import Record, record_type
+from ..profiling import profiled
+from ..workbook_index import SheetIndex
+
+logger = logging.getLogger(__name__)
+
+
+_SUB_CATEGORY_PREFIXES = (
+    ('1.1.', '固定源燃烧'),
+    ('1.2.', '移动源燃烧'),
+    ('1.3.', '遗散源'),
+    ('1.4.', '工艺排放'),
+)
+
+# 清册第6~13列（F~M）对应的排放量字段
+_EMISSION_KEYS = (
+    'total_green_house_gas_emissions',
+    'CO2_emissions',
+    'CH4_emissions',
+    'N2O_emissions',
+    'HFCs_emissions',
+    'PFCs_emissions',
+    'SFs_emissions',
+    'NF3_emissions',
+)
+
+
+# format_emission 结果中表示零的文本（空单元格为 ''）
+_ZERO_TEXTS = frozenset(['', '0.00', '-0.00'])
+
+
+_ItemRecord = record_type(
+    ('name', 'number', 'category', 'emission_source', 'facility', 'note') + _EMISSION_KEYS
+)
+
+
+class _InventoryRecord:
+    """
+    盘查清册中的一条范围一候选记录
+
+    每行只格式化、解析一次排放量，评分和空行判断都基于解析结果；
+    只有最终入选的记录才展开为模板使用的数据项。
+    """
+
+    __slots__ = ('number', 'category', 'emission_source', 'facility', 'note',
+                 'emissions', 'score', 'is_blank', 'preferred')
+
+    def __init__(self, reader: BaseReader, number: str, category: str, row: tuple):
+        self.number = number
+        self.category = category
+        self.emission_source = reader.safe_str(row[2])
+        self.facility = reader.safe_str(row[3])
+        self.note = reader.safe_str(row[4])
+        self.emissions = tuple(reader.format_emission(v) for v in row[5:13])
+        self.preferred = False
+
+        # 按格式化后的文本判断非零（与解析格式化文本的结果一致，不再逐个转换回浮点数）
+        nonzero = [v not in _ZERO_TEXTS for v in self.emissions]
+        has_error = reader.is_error_value(row[2]) or reader.is_error_value(row[5])
+
+        score = -1000 if has_error else 100
+        if self.emission_source:
+            score += 20
+        if self.facility:
+            score += 10
+        if nonzero[0]:
+            score += 5
+        if any(nonzero[1:]):
+            score += 3
+        if category:
+            score += 1
+        self.score = score
+        self.is_blank = not (self.emission_source or self.facility or any(nonzero))
+
+    def to_item(self) -> Record:
+        """展开为模板使用的数据项记录"""
+        sub_cat = ""
+        for prefix, name in _SUB_CATEGORY_PREFIXES:
+            if self.number.startswith(prefix):
+                sub_cat = name
+                break
+        return _ItemRecord((sub_cat or self.number, self.number, self.category,
+                            self.emission_source, self.facility, self.note) + self.emissions)
 
 
 class Scope1Reader(BaseReader):
     """范围一数据读取器"""
 
+    def input_sheets(self) -> List[SheetIndex]:
+        """附表1-温室气体盘查表和所有盘查清册"""
+        return self._present_sheets(self.find_sheet_by_name('附表1', '温室', '盘查', '1'),
+                                    *find_inventory_sheets(self.index))
+
+    @profiled()
     def extract_all(self) -> Dict[str, Any]:
         """
         提取所有范围一相关数据
@@ -56,34 +146,32 @@ class Scope1Reader(BaseReader):
         if not target_sheet:
             return result
 
-        print(f"[范围一排放] 找到工作表: {target_sheet.title}")
+        logger.info("[范围一排放] 找到工作表: %s", target_sheet.title)
 
         # 数据从第5行开始
         data_start_row = 5
 
-        for row_idx in range(data_start_row, target_sheet.max_row + 1):
+        for row in target_sheet.iter_values(data_start_row):
             try:
-                row = target_sheet[row_idx]
-
                 # 读取各列数据
-                number = self.safe_str(row[0].value)
-                category = self.safe_str(row[1].value)
-                emission_source = self.safe_str(row[2].value)
-                facility = self.safe_str(row[3].value)
+                number = self.safe_str(row[0])
+                category = self.safe_str(row[1])
+                emission_source = self.safe_str(row[2])
+                facility = self.safe_str(row[3])
 
                 # 如果编号为空，跳过
                 if not number or number.strip() == '':
                     continue
 
                 # 读取排放量数据（Columns 30-37）
-                co2_emissions = self.safe_float(row[30].value) if len(row) > 30 else 0
-                ch4_emissions = self.safe_float(row[31].value) if len(row) > 31 else 0
-                n2o_emissions = self.safe_float(row[32].value) if len(row) > 32 else 0
-                hfcs_emissions = self.safe_float(row[33].value) if len(row) > 33 else 0
-                pfcs_emissions = self.safe_float(row[34].value) if len(row) > 34 else 0
-                sf6_emissions = self.safe_float(row[35].value) if len(row) > 35 else 0
-                nf3_emissions = self.safe_float(row[36].value) if len(row) > 36 else 0
-                total_emissions = self.safe_float(row[37].value) if len(row) > 37 else 0
+                co2_emissions = self.safe_float(row[30]) if len(row) > 30 else 0
+                ch4_emissions = self.safe_float(row[31]) if len(row) > 31 else 0
+                n2o_emissions = self.safe_float(row[32]) if len(row) > 32 else 0
+                hfcs_emissions = self.safe_float(row[33]) if len(row) > 33 else 0
+                pfcs_emissions = self.safe_float(row[34]) if len(row) > 34 else 0
+                sf6_emissions = self.safe_float(row[35]) if len(row) > 35 else 0
+                nf3_emissions = self.safe_float(row[36]) if len(row) > 36 else 0
+                total_emissions = self.safe_float(row[37]) if len(row) > 37 else 0
 
                 # 创建数据项
                 item = {
@@ -114,9 +202,9 @@ class Scope1Reader(BaseReader):
             except Exception:
                 continue
 
-        print(f"[范围一排放] 提取完成:")
+        logger.info("[范围一排放] 提取完成:")
         for group_name, items in result.items():
-            print(f"  {group_name}: {len(items)} 条")
+            logger.info("  %s: %s 条", group_name, len(items))
 
         return result
 
@@ -132,156 +220,50 @@ class Scope1Reader(BaseReader):
         }
 
         # 查找所有可能的盘查清册表
-        inventory_sheets = []
-        for sheet_name in self.workbook.sheetnames:
-            if '盘查清册' in sheet_name or '清册' in sheet_name:
-                inventory_sheets.append(self.workbook[sheet_name])
+        inventory_sheets = find_inventory_sheets(self.index)
 
         if not inventory_sheets:
-            print("[范围一详细] 未找到任何温室气体盘查清册表")
+            logger.warning("[范围一详细] 未找到任何温室气体盘查清册表")
             return result
 
         sheet_by_title = {s.title: s for s in inventory_sheets}
         preferred_sheet = sheet_by_title.get('温室气体盘查清册') or inventory_sheets[0]
         preferred_title = preferred_sheet.title
 
+        # 编号顺序（来自首选清册）与数据池在同一次遍历中构建
         preferred_number_order: List[str] = []
-        current_category = ""
-        for row in preferred_sheet.iter_rows(min_row=14):
-            if len(row) < 13:
-                continue
-
-            col_b = row[1].value
-            col_c = row[2].value
-            if not col_b and not col_c:
-                continue
-
-            number_str = ""
-            if col_b:
-                col_b_str = str(col_b).strip()
-                if col_b_str and col_b_str[0].isdigit():
-                    number_str = col_b_str
-                else:
-                    current_category = col_b_str
-                    continue
-
-            if not number_str or number_str == '编号':
-                continue
-
-            if number_str.startswith('1.') and number_str not in preferred_number_order:
-                preferred_number_order.append(number_str)
-
-        def score_item(item: Dict[str, Any], has_error: bool) -> int:
-            score = 0
-            score += -1000 if has_error else 100
-            if item.get('emission_source'):
-                score += 20
-            if item.get('facility'):
-                score += 10
-            total_val = self.safe_float(item.get('total_green_house_gas_emissions'))
-            if total_val != 0:
-                score += 5
-            gas_keys = ['CO2_emissions', 'CH4_emissions', 'N2O_emissions', 'HFCs_emissions', 'PFCs_emissions', 'SFs_emissions', 'NF3_emissions']
-            if any(self.safe_float(item.get(k)) != 0 for k in gas_keys):
-                score += 3
-            if item.get('category'):
-                score += 1
-            return score
-
-        def is_effectively_blank_item(item: Dict[str, Any]) -> bool:
-            if item.get('emission_source') or item.get('facility'):
-                return False
-            keys = ['total_green_house_gas_emissions', 'CO2_emissions', 'CH4_emissions', 'N2O_emissions', 'HFCs_emissions', 'PFCs_emissions', 'SFs_emissions', 'NF3_emissions']
-            return all(self.safe_float(item.get(k)) == 0 for k in keys)
-
-        data_pool: Dict[str, Dict[str, Any]] = {}
-        data_meta: Dict[str, Dict[str, Any]] = {}
+        preferred_numbers = set()
+        data_pool: Dict[str, _InventoryRecord] = {}
 
         for inventory_sheet in inventory_sheets:
-            print(f"[范围一详细] 正在从 {inventory_sheet.title} 汇总数据...")
-            
-            # 从第14行开始（第12行是标题，第13行是单位）
-            current_category = ""
+            logger.info("[范围一详细] 正在从 %s 汇总数据...", inventory_sheet.title)
+            is_preferred = inventory_sheet.title == preferred_title
 
-            for row in inventory_sheet.iter_rows(min_row=14):
-                if len(row) < 13:
-                    continue
+            # 共享的清册解析结果中编号以 "1." 开头的行（含所在类别）
+            for inventory_row in inventory_rows(inventory_sheet).scope('1.'):
+                number_str = inventory_row.number
 
-                col_b = row[1].value        # 编号或类别名
-                col_c = row[2].value        # 排放源
-                
-                if not col_b and not col_c:
-                    continue
+                if is_preferred and number_str not in preferred_numbers:
+                    preferred_numbers.add(number_str)
+                    preferred_number_order.append(number_str)
 
-                number_str = ''
-                if col_b:
-                    col_b_str = str(col_b).strip()
-                    if col_b_str and col_b_str[0].isdigit():
-                        number_str = col_b_str
-                    else:
-                        current_category = col_b_str
-                        continue
+                # 每行只解析一次，得到紧凑记录及其评分
+                record = _InventoryRecord(self, number_str, inventory_row.category, inventory_row.values)
 
-                if not number_str or number_str == '编号':
-                    continue
-
-                # 提取数据项
-                if number_str.startswith('1.'):
-                    # 确定子类别
-                    sub_cat = ""
-                    if number_str.startswith('1.1.'): sub_cat = '固定源燃烧'
-                    elif number_str.startswith('1.2.'): sub_cat = '移动源燃烧'
-                    elif number_str.startswith('1.3.'): sub_cat = '遗散源'
-                    elif number_str.startswith('1.4.'): sub_cat = '工艺排放'
-
-                    item = {
-                        'name': sub_cat or number_str,
-                        'number': number_str,
-                        'category': current_category,
-                        'emission_source': self.safe_str(col_c),
-                        'facility': self.safe_str(row[3].value),
-                        'note': self.safe_str(row[4].value),
-                        'total_green_house_gas_emissions': self.format_emission(row[5].value),
-                        'CO2_emissions': self.format_emission(row[6].value),
-                        'CH4_emissions': self.format_emission(row[7].value),
-                        'N2O_emissions': self.format_emission(row[8].value),
-                        'HFCs_emissions': self.format_emission(row[9].value),
-                        'PFCs_emissions': self.format_emission(row[10].value),
-                        'SFs_emissions': self.format_emission(row[11].value),
-                        'NF3_emissions': self.format_emission(row[12].value)
-                    }
-
-                    has_error = self.is_error_value(col_c) or self.is_error_value(row[5].value)
-                    new_score = score_item(item, has_error)
-
-                    if number_str not in data_pool:
-                        data_pool[number_str] = item
-                        data_meta[number_str] = {
-                            'score': new_score,
-                            'has_error': has_error,
-                            'sheet_title': inventory_sheet.title,
-                        }
-                    else:
-                        meta = data_meta.get(number_str, {})
-                        old_score = int(meta.get('score', -10**9))
-                        old_title = str(meta.get('sheet_title', ''))
-                        if new_score > old_score or (new_score == old_score and inventory_sheet.title == preferred_title and old_title != preferred_title):
-                            data_pool[number_str] = item
-                            data_meta[number_str] = {
-                                'score': new_score,
-                                'has_error': has_error,
-                                'sheet_title': inventory_sheet.title,
-                            }
+                old = data_pool.get(number_str)
+                if old is None or record.score > old.score or (
+                        record.score == old.score and is_preferred and not old.preferred):
+                    record.preferred = is_preferred
+                    data_pool[number_str] = record
 
         number_order = preferred_number_order if preferred_number_order else sorted(list(data_pool.keys()), key=self.natural_sort_key)
 
         # 3. 按顺序分配到结果
         for num in number_order:
-            if num not in data_pool:
-                continue
-            item = data_pool[num]
-            if is_effectively_blank_item(item):
+            record = data_pool.get(num)
+            if record is None or record.is_blank:
                 continue
+            item = record.to_item()
             if num.startswith('1.1.'):
                 result['scope1_stationary_combustion_emissions_items'].append(item)
             elif num.startswith('1.2.'):
@@ -291,11 +273,11 @@ class Scope1Reader(BaseReader):
             elif num.startswith('1.4.'):
                 result['scope1_process_emissions_items'].append(item)
 
-        print(f"[范围一详细] 提取完成:")
-        print(f"  固定源燃烧: {len(result['scope1_stationary_combustion_emissions_items'])} 行")
-        print(f"  移动源燃烧: {len(result['scope1_mobile_combustion_emissions_items'])} 行")
-        print(f"  逸散源: {len(result['scope1_fugitive_emissions_items'])} 行")
-        print(f"  工艺排放: {len(result['scope1_process_emissions_items'])} 行")
+        logger.info("[范围一详细] 提取完成:")
+        logger.info("  固定源燃烧: %s 行", len(result['scope1_stationary_combustion_emissions_items']))
+        logger.info("  移动源燃烧: %s 行", len(result['scope1_mobile_combustion_emissions_items']))
+        logger.info("  逸散源: %s 行", len(result['scope1_fugitive_emissions_items']))
+        logger.info("  工艺排放: %s 行", len(result['scope1_process_emissions_items']))
 
         # 计算各类别的汇总值
         self._calculate_emission_sums(result)
@@ -353,9 +335,10 @@ class Scope1Reader(BaseReader):
             total = stationary_total + mobile_total + fugitive_total + process_total
             result[f'scope1_emissions_{col}_sum_formatted'] = f"{total:.2f}"
 
-        print(f"[范围一详细] 计算汇总值完成:")
-        print(f"  总排放量: {result.get('scope1_emissions_total_green_house_gas_emissions_sum_formatted', 'N/A')} tCO2e")
-        print(f"  CO2排放量: {result.get('scope1_emissions_CO2_emissions_sum_formatted', 'N/A')} tCO2e")
+        logger.info("[范围一详细] 计算汇总值完成:")
+        logger.info("  总排放量: %s tCO2e",
+                    result.get('scope1_emissions_total_green_house_gas_emissions_sum_formatted', 'N/A'))
+        logger.info("  CO2排放量: %s tCO2e", result.get('scope1_emissions_CO2_emissions_sum_formatted', 'N/A'))
 
 
 __all__ = ['Scope1Reader']
@@ -5,15 +5,38 @@
 从Excel中提取范围三其他间接排放数据。
 """
 
+import logging
 import re
 from typing import Dict, List, Any
 
 from .base import BaseReader
+from ..inventory import InventoryRow, find_inventory_sheets, inventory_rows
+from ..records import Record, record_type
+from ..profiling import profiled
+from ..workbook_index import SheetIndex
+
+logger = logging.getLogger(__name__)
+
+
+_CATEGORY_NUMBER_RE = re.compile(r'类别([0-9]+)')
+
+# 盘查清册范围三明细行（第2~13列）
+_DetailRecord = record_type((
+    'number', 'emission_source', 'facility', 'note',
+    'total_green_house_gas_emissions', 'CO2_emissions', 'CH4_emissions', 'N2O_emissions',
+    'HFCs_emissions', 'PFCs_emissions', 'SFs_emissions', 'SF6_emissions', 'NF3_emissions',
+))
 
 
 class Scope3Reader(BaseReader):
     """范围三数据读取器"""
 
+    def input_sheets(self) -> List[SheetIndex]:
+        """表1温室气体盘查表和所有盘查清册"""
+        return self._present_sheets(self.find_sheet_by_name('表1', '温室气体盘查表'),
+                                    *find_inventory_sheets(self.index))
+
+    @profiled()
     def extract_all(self) -> Dict[str, Any]:
         """
         提取所有范围三相关数据
@@ -85,30 +108,61 @@ class Scope3Reader(BaseReader):
                 '类别15': 'scope_3_category_15_emissions',
             }
 
+            header_rows = self._find_category_header_rows(table_sheet, scope3_mapping)
+
             for category_key, var_name in scope3_mapping.items():
-                for row in table_sheet.iter_rows():
-                    a_val = row[0].value if len(row) > 0 else None
-                    if a_val and isinstance(a_val, str) and '范围三' in a_val and category_key in a_val:
-                        current_row_num = row[0].row
-                        if current_row_num + 2 <= table_sheet.max_row:
-                            emission_row = table_sheet[current_row_num + 2]
-                            # 尝试获取该行的总排放量。通常在最后一列(J列或I列)
-                            # 根据 debug_market_emissions，类别11的汇总行在第9列(Column I)是总计
-                            # 我们优先寻找最后一个数值
-                            row_vals = [self.safe_float(c.value) for c in emission_row]
-                            # 过滤掉 None 和 0，找最后一个非零值
-                            valid_vals = [v for v in row_vals if v is not None and v > 0]
-                            if valid_vals:
-                                result[var_name] = valid_vals[-1]
-                                print(f"  [范围三汇总] {category_key} 提取到排放量: {result[var_name]}")
-                            else:
-                                b_val = emission_row[1].value if len(emission_row) > 1 else None
-                                if b_val and isinstance(b_val, (int, float)):
-                                    result[var_name] = float(b_val)
-                        break
+                current_row_num = header_rows.get(category_key)
+                if current_row_num is None:
+                    continue
+                if current_row_num + 2 <= table_sheet.max_row:
+                    emission_row = table_sheet.rows[current_row_num + 1]
+                    # 尝试获取该行的总排放量。通常在最后一列(J列或I列)
+                    # 根据 debug_market_emissions，类别11的汇总行在第9列(Column I)是总计
+                    # 我们优先寻找最后一个数值
+                    row_vals = [self.safe_float(v) for v in emission_row]
+                    # 过滤掉 None 和 0，找最后一个非零值
+                    valid_vals = [v for v in row_vals if v is not None and v > 0]
+                    if valid_vals:
+                        result[var_name] = valid_vals[-1]
+                        logger.debug("  [范围三汇总] %s 提取到排放量: %s", category_key, result[var_name])
+                    else:
+                        b_val = emission_row[1] if len(emission_row) > 1 else None
+                        if b_val and isinstance(b_val, (int, float)):
+                            result[var_name] = float(b_val)
 
         return result
 
+    def _find_category_header_rows(self, table_sheet, category_keys) -> Dict[str, int]:
+        """
+        单次扫描工作表，找出每个类别第一次出现的"范围三/类别N"标题行
+
+        与逐类别查找的结果一致：A列包含"范围三"且包含"类别N"子串的第一行
+        （子串语义下"类别1"也会命中"类别10"~"类别15"的标题）。
+
+        Args:
+            table_sheet: 表1温室气体盘查表
+            category_keys: 需要查找的类别键（如 '类别1'）
+
+        Returns:
+            类别键 -> 标题行号（从1开始）
+        """
+        pending = set(category_keys)
+        header_rows = {}
+        for current_row_num, row in enumerate(table_sheet.iter_values(), start=1):
+            a_val = row[0] if len(row) > 0 else None
+            if not (a_val and isinstance(a_val, str) and '范围三' in a_val):
+                continue
+            for digits in _CATEGORY_NUMBER_RE.findall(a_val):
+                # "类别N" 是 "类别<digits>" 的前缀即视为命中
+                for length in range(1, len(digits) + 1):
+                    category_key = '类别' + digits[:length]
+                    if category_key in pending:
+                        pending.discard(category_key)
+                        header_rows[category_key] = current_row_num
+            if not pending:
+                break
+        return header_rows
+
     def _extract_detail_data(self) -> Dict[str, Any]:
         """
         从温室气体盘查清册中提取范围三详细数据，确保排序与工作表一致
@@ -118,42 +172,32 @@ class Scope3Reader(BaseReader):
             result[f'scope3_category{i}'] = []
 
         # 查找所有可能的盘查清册表
-        inventory_sheets = []
-        for sheet_name in self.workbook.sheetnames:
-            if '盘查清册' in sheet_name or '清册' in sheet_name:
-                inventory_sheets.append(self.workbook[sheet_name])
-        
+        inventory_sheets = find_inventory_sheets(self.index)
+
         if not inventory_sheets:
-            print("[范围三详细] 未找到任何温室气体盘查清册表")
+            logger.warning("[范围三详细] 未找到任何温室气体盘查清册表")
             return result
 
         sheet_by_title = {s.title: s for s in inventory_sheets}
         preferred_sheet = sheet_by_title.get('温室气体盘查清册') or inventory_sheets[0]
         preferred_title = preferred_sheet.title
 
-        preferred_number_order: List[str] = []
-        for row in preferred_sheet.iter_rows(min_row=14):
-            if len(row) < 13:
-                continue
-            col_b = row[1].value
-            if not col_b:
-                continue
-            col_b_str = str(col_b).strip()
-            if col_b_str.startswith('3.') and col_b_str not in preferred_number_order:
-                preferred_number_order.append(col_b_str)
+        # 编号顺序来自首选清册（去重，保持工作表中的顺序）
+        preferred_number_order: List[str] = list(dict.fromkeys(
+            inventory_row.number for inventory_row in inventory_rows(preferred_sheet).scope('3.')
+        ))
 
-        def score_item(item: Dict[str, Any], has_error: bool) -> int:
+        def score_item(item: Dict[str, Any], gases: tuple, has_error: bool) -> int:
+            # gases 为解析时已转换的 F~M 列浮点数（总排放量 + 7 种气体），不再重复转换
             score = 0
             score += -1000 if has_error else 100
             if item.get('emission_source'):
                 score += 20
             if item.get('facility'):
                 score += 10
-            total_val = self.safe_float(item.get('total_green_house_gas_emissions'))
-            if total_val != 0:
+            if gases[0] != 0:
                 score += 5
-            gas_keys = ['CO2_emissions', 'CH4_emissions', 'N2O_emissions', 'HFCs_emissions', 'PFCs_emissions', 'SFs_emissions', 'NF3_emissions']
-            if any(self.safe_float(item.get(k)) != 0 for k in gas_keys):
+            if any(v != 0 for v in gases[1:]):
                 score += 3
             return score
 
@@ -161,38 +205,34 @@ class Scope3Reader(BaseReader):
         data_meta: Dict[str, Dict[str, Any]] = {}
         
         for inventory_sheet in inventory_sheets:
-            print(f"[范围三详细] 正在从 {inventory_sheet.title} 汇总数据...")
-            for row in inventory_sheet.iter_rows(min_row=14):
-                if len(row) < 13:
-                    continue
-                col_b = row[1].value
-                if not col_b: continue
-                col_b_str = str(col_b).strip()
-                
-                if col_b_str.startswith('3.'):
-                    # 提取该行数据
-                    item = self._create_item_from_row(row)
-                    has_error = self.is_error_value(row[2].value) or self.is_error_value(row[5].value)
-                    new_score = score_item(item, has_error)
-                    
-                    if col_b_str not in data_pool:
+            logger.info("[范围三详细] 正在从 %s 汇总数据...", inventory_sheet.title)
+            for inventory_row in inventory_rows(inventory_sheet).scope('3.'):
+                col_b_str = inventory_row.number
+                row = inventory_row.values
+
+                # 提取该行数据
+                item = self._create_item_from_row(inventory_row)
+                has_error = self.is_error_value(row[2]) or self.is_error_value(row[5])
+                new_score = score_item(item, inventory_row.gases, has_error)
+
+                if col_b_str not in data_pool:
+                    data_pool[col_b_str] = item
+                    data_meta[col_b_str] = {
+                        'score': new_score,
+                        'has_error': has_error,
+                        'sheet_title': inventory_sheet.title,
+                    }
+                else:
+                    meta = data_meta.get(col_b_str, {})
+                    old_score = int(meta.get('score', -10**9))
+                    old_title = str(meta.get('sheet_title', ''))
+                    if new_score > old_score or (new_score == old_score and inventory_sheet.title == preferred_title and old_title != preferred_title):
                         data_pool[col_b_str] = item
                         data_meta[col_b_str] = {
                             'score': new_score,
                             'has_error': has_error,
                             'sheet_title': inventory_sheet.title,
                         }
-                    else:
-                        meta = data_meta.get(col_b_str, {})
-                        old_score = int(meta.get('score', -10**9))
-                        old_title = str(meta.get('sheet_title', ''))
-                        if new_score > old_score or (new_score == old_score and inventory_sheet.title == preferred_title and old_title != preferred_title):
-                            data_pool[col_b_str] = item
-                            data_meta[col_b_str] = {
-                                'score': new_score,
-                                'has_error': has_error,
-                                'sheet_title': inventory_sheet.title,
-                            }
 
         number_order = preferred_number_order if preferred_number_order else sorted(list(data_pool.keys()), key=self.natural_sort_key)
 
@@ -217,13 +257,13 @@ class Scope3Reader(BaseReader):
         
         # 3. 特殊处理：如果类别11还是没有明细，但表1有汇总数据，造一个明细项
         if not result['scope3_category11'] and table1_sheet:
-            for row in table1_sheet.iter_rows(min_row=100): # 类别11通常在后面
-                col_a = str(row[0].value) if row[0].value else ""
+            for row in table1_sheet.iter_values(100): # 类别11通常在后面
+                col_a = str(row[0]) if row[0] else ""
                 if '范围三 类别11' in col_a or '3.11' in col_a:
                     # 找到汇总行（通常在标题行下两行）
                     # 我们直接寻找包含"汇总"且在类别11范围内的行
-                    for sub_row in table1_sheet.iter_rows(min_row=table1_sheet.max_row-100):
-                        if sub_row[0].value == '汇总' and '3.11' in str(sub_row[1].value if len(sub_row)>1 else ''):
+                    for sub_row in table1_sheet.iter_values(table1_sheet.max_row-100):
+                        if sub_row[0] == '汇总' and '3.11' in str(sub_row[1] if len(sub_row)>1 else ''):
                              # 这就是我们要找的
                              pass
                     
@@ -231,31 +271,28 @@ class Scope3Reader(BaseReader):
                     # 之前的 debug_market_emissions 发现 Row 156 是汇总
                     pass
 
-        print(f"[范围三详细] 提取完成:")
+        logger.info("[范围三详细] 提取完成:")
         for i in range(1, 16):
             items = result[f'scope3_category{i}']
             if items:
-                print(f"  scope3_category{i}: {len(items)} 条")
+                logger.debug("  scope3_category%s: %s 条", i, len(items))
 
         return result
 
-    def _create_item_from_row(self, row) -> Dict[str, Any]:
-        """从盘查清册行创建数据项"""
-        return {
-            'number': str(row[1].value).strip(),
-            'emission_source': self.safe_str(row[2].value),
-            'facility': self.safe_str(row[3].value),
-            'note': self.safe_str(row[4].value),
-            'total_green_house_gas_emissions': self.safe_float(row[5].value),
-            'CO2_emissions': self.safe_float(row[6].value),
-            'CH4_emissions': self.safe_float(row[7].value),
-            'N2O_emissions': self.safe_float(row[8].value),
-            'HFCs_emissions': self.safe_float(row[9].value),
-            'PFCs_emissions': self.safe_float(row[10].value),
-            'SFs_emissions': self.safe_float(row[11].value),
-            'SF6_emissions': self.safe_float(row[11].value),
-            'NF3_emissions': self.safe_float(row[12].value),
-        }
+    def _create_item_from_row(self, inventory_row: InventoryRow) -> Record:
+        """从盘查清册行创建数据项（气体列使用解析时已转换的浮点数）"""
+        row = inventory_row.values
+        total, co2, ch4, n2o, hfcs, pfcs, sf6, nf3 = inventory_row.gases
+        return _DetailRecord((
+            inventory_row.number,
+            self.safe_str(row[2]),
+            self.safe_str(row[3]),
+            self.safe_str(row[4]),
+            total, co2, ch4, n2o, hfcs, pfcs,
+            sf6,
+            sf6,
+            nf3,
+        ))
 
 
 __all__ = ['Scope3Reader']
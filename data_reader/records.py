@@ -0,0 +1,140 @@
+"""
+数据记录模块
+=====================
+
+为提取出的数据行提供紧凑的记录类型。
+
+每种字段组合生成一个带 __slots__ 的记录类（按字段元组缓存），
+每行只保存字段值本身，不再为每行创建完整的 dict：
+- 支持映射接口（item['field']、item.get('field')、遍历、len），可直接用于 Jinja2 模板
+- 支持属性访问（item.field），模板中的 {{ item.field }} 直接命中 slot
+- copy() 返回普通 dict，供下游添加新字段
+- 写入未声明的字段时存入附加字典，行为与 dict 保持一致
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .config import TableProtocol
+
+
+class Record(MutableMapping):
+    """紧凑数据记录基类（具体字段由 record_type 生成的子类定义）"""
+
+    __slots__ = ('_extra',)
+
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+
+    def __init__(self, values: Iterable[Any] = (), extra: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            values: 按字段顺序排列的字段值（必须覆盖所有字段）
+            extra: 未声明字段的附加值
+        """
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+        self._extra = dict(extra) if extra else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        extra = self._extra
+        if extra is not None:
+            return extra.get(key, default)
+        return default
+
+    def __contains__(self, key) -> bool:
+        if key in self._field_set:
+            return True
+        extra = self._extra
+        return extra is not None and key in extra
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._field_set:
+            raise TypeError(f"记录字段不可删除: {key}")
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from self._fields
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(self._fields) + (len(self._extra) if self._extra else 0)
+
+    def copy(self) -> Dict[str, Any]:
+        """复制为普通 dict"""
+        result = {name: getattr(self, name) for name in self._fields}
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.copy()!r})"
+
+    def __reduce__(self):
+        # 记录类是动态生成的，按字段元组重建以支持 pickle
+        values = tuple(getattr(self, name) for name in self._fields)
+        return (_rebuild_record, (self._fields, values, self._extra))
+
+
+# 字段元组 -> 记录类
+_RECORD_TYPES: Dict[Tuple[str, ...], type] = {}
+
+
+def record_type(fields: Iterable[str]) -> type:
+    """
+    获取（或生成）指定字段组合的记录类
+
+    Args:
+        fields: 字段名称（按顺序）
+
+    Returns:
+        Record 的子类，字段存储在 __slots__ 中
+    """
+    fields = tuple(fields)
+    cls = _RECORD_TYPES.get(fields)
+    if cls is None:
+        for name in fields:
+            if not name.isidentifier() or hasattr(Record, name):
+                raise ValueError(f"字段名不能用作记录属性: {name}")
+        cls = type('Record', (Record,), {
+            '__slots__': fields,
+            '_fields': fields,
+            '_field_set': frozenset(fields),
+        })
+        _RECORD_TYPES[fields] = cls
+    return cls
+
+
+def protocol_record_type(protocol: TableProtocol) -> type:
+    """获取协议对应的记录类（字段为 field_mappings 的键）"""
+    return record_type(protocol.field_mappings)
+
+
+def _rebuild_record(fields: Tuple[str, ...], values: tuple,
+                    extra: Optional[Dict[str, Any]]) -> Record:
+    """pickle 反序列化时重建记录"""
+    return record_type(fields)(values, extra)
+
+
+__all__ = ['Record', 'record_type', 'protocol_record_type']
@@ -6,8 +6,9 @@
 """
 
 import re
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, Iterable, List, Set
 
 
 def excel_date_to_string(date_value):
@@ -62,10 +63,81 @@ def clean_multiline_text(value: str) -> str:
     return value
 
 
+class KeywordMatcher:
+    """
+    多关键词匹配器（Aho–Corasick 自动机）
+
+    一次性编译所有关键词，对每个字符串只线性扫描一遍即可得到全部命中的关键词
+    （包括互相重叠、互为前缀的关键词），结果与逐个 `keyword in text` 完全一致。
+
+    - 自动机的失败转移预先展开为完整的状态转移表，扫描时每个字符只查一次字典
+    - 另外编译一个关键词交替的正则作为预筛：多数文本不含任何关键词，
+      由 C 实现的 re.search 直接排除，不进入逐字符扫描
+
+    空关键词会被忽略。
+    """
+
+    __slots__ = ('keywords', '_transitions', '_outputs', '_trigger')
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+
+        # 1. 关键词字典树
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[str]] = [set()]
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(keyword)
+
+        # 2. 按层次计算失败转移，同时展开为完整转移表（子状态继承失败状态的转移）
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque((child, 0) for child in goto[0].values())
+        while queue:
+            state, fail = queue.popleft()
+            outputs[state] |= outputs[fail]
+            table = dict(transitions[fail])
+            table.update(goto[state])
+            transitions[state] = table
+            for ch, child in goto[state].items():
+                queue.append((child, transitions[fail].get(ch, 0)))
+
+        self._transitions = transitions
+        self._outputs: List[FrozenSet[str]] = [frozenset(o) for o in outputs]
+        self._trigger = (re.compile('|'.join(map(re.escape, self.keywords)))
+                         if self.keywords else None)
+
+    def search(self, text: str) -> bool:
+        """文本中是否包含任一关键词"""
+        return self._trigger is not None and self._trigger.search(text) is not None
+
+    def find_all(self, text: str) -> Set[str]:
+        """文本中出现的所有关键词"""
+        if not self.search(text):
+            return set()
+        found: Set[str] = set()
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for ch in text:
+            state = transitions[state].get(ch, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+
 __all__ = [
     'excel_date_to_string',
     'safe_str',
     'safe_float',
     'safe_get_cell',
     'clean_multiline_text',
+    'KeywordMatcher',
 ]
@@ -0,0 +1,357 @@
+"""
+工作簿索引模块
+=====================
+
+每个文件只扫描一次工作簿，构建所有读取器共享的只读索引：
+- 每个工作表的单元格值（按行存储的不可变网格）
+- 合并单元格查找表（被合并覆盖的单元格 -> 左上角单元格的值）
+- 工作表标题查找
+
+读取器通过索引查询单元格，不再反复经过 openpyxl 的对象模型读取。
+只读模式下按需构建：工作表在第一次访问单元格数据时才扫描（表格识别只流式读取
+前几行，没有读取器使用的工作表和增量提取时未变化的工作表都不需要扫描），
+每行只保存到最后一个非空单元格，读取时再补齐到统一列数。
+"""
+
+import functools
+import weakref
+import zipfile
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .xlsx_parts import read_merged_ranges, sheet_part_paths
+
+
+class SheetRow:
+    """工作表中的一行（只读视图，列索引从0开始）"""
+
+    __slots__ = ('sheet', 'row_idx', 'values')
+
+    def __init__(self, sheet: 'SheetIndex', row_idx: int, values: tuple):
+        self.sheet = sheet
+        self.row_idx = row_idx      # Excel 行号（从1开始）
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, col_idx):
+        return self.values[col_idx]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def get(self, col_idx: int):
+        """获取单元格值，空单元格按合并区域解析为左上角的值，越界返回空字符串"""
+        if col_idx >= len(self.values):
+            return ''
+        value = self.values[col_idx]
+        if value is not None:
+            return value
+        return self.sheet.merged_values.get((self.row_idx, col_idx + 1), '')
+
+
+class CompactRows(Sequence):
+    """
+    紧凑存储的行序列
+
+    每行只保存到最后一个非空单元格，下标、切片和遍历时再补齐到统一列数，
+    对外与按最大列数补齐的行元组一致，但不为每行保存补齐用的 None。
+    """
+
+    __slots__ = ('_rows', '_width')
+
+    def __init__(self, rows: List[tuple], width: int):
+        self._rows = rows
+        self._width = width
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(map(self._pad, self._rows[index]))
+        return self._pad(self._rows[index])
+
+    def __iter__(self):
+        return map(self._pad, self._rows)
+
+    def _pad(self, row: tuple) -> tuple:
+        missing = self._width - len(row)
+        return row + (None,) * missing if missing else row
+
+
+class SheetIndex:
+    """单个工作表的只读单元格网格"""
+
+    __slots__ = ('title', 'rows', 'max_row', 'max_column', 'merged_values', '__weakref__')
+
+    def __init__(self, title: str, rows: Tuple[tuple, ...],
+                 merged_values: Optional[Dict[Tuple[int, int], object]] = None):
+        """
+        Args:
+            title: 工作表名称
+            rows: 按行存储的单元格值，每行长度相同（已按最大列数补齐，或为读取时补齐的 CompactRows）
+            merged_values: (行号, 列号) -> 左上角单元格值，行列均从1开始
+        """
+        self.title = title
+        self.rows = rows
+        self.max_row = len(rows)
+        self.max_column = len(rows[0]) if rows else 0
+        self.merged_values = merged_values or {}
+
+    @classmethod
+    def from_worksheet(cls, ws) -> 'SheetIndex':
+        """从 openpyxl 工作表一次性构建索引"""
+        rows = tuple(ws.iter_rows(values_only=True))
+        merged_values = build_merged_lookup(
+            rows, (r.bounds for r in ws.merged_cells.ranges)
+        )
+        return cls(ws.title, rows, merged_values)
+
+    @classmethod
+    def from_read_only_worksheet(cls, ws, merged_ranges) -> 'SheetIndex':
+        """
+        从只读模式（read_only=True）的工作表流式构建索引
+
+        只读工作表不提供合并单元格信息，需要由调用方从工作表 XML 中读取后传入。
+        这里忽略 XML 中记录的 dimension（可能不准确），按实际单元格确定列数，
+        保证网格形状与完整加载模式一致；各行去掉行尾的空单元格后保存（CompactRows）。
+        """
+        ws.reset_dimensions()
+        rows = []
+        width = 0
+        last_row = 0
+        for row in ws.iter_rows(values_only=True):
+            if row:
+                # 末尾没有任何单元格的行在完整模式下不计入 max_row
+                last_row = len(rows) + 1
+                width = max(width, len(row))
+            end = len(row)
+            while end and row[end - 1] is None:
+                end -= 1
+            rows.append(tuple(row[:end]))
+        del rows[last_row:]
+        return cls(ws.title, CompactRows(rows, width), build_merged_lookup(rows, merged_ranges))
+
+    def row(self, row_idx: int) -> SheetRow:
+        """获取指定行（Excel 行号，从1开始）"""
+        return SheetRow(self, row_idx, self.rows[row_idx - 1])
+
+    def iter_rows(self, min_row: int = 1, max_row: Optional[int] = None) -> Iterator[SheetRow]:
+        """按行遍历，返回可解析合并单元格的行视图"""
+        stop = self.max_row if max_row is None else min(max_row, self.max_row)
+        rows = self.rows
+        for row_idx in range(max(min_row, 1), stop + 1):
+            yield SheetRow(self, row_idx, rows[row_idx - 1])
+
+    def iter_values(self, min_row: int = 1, max_row: Optional[int] = None) -> Iterator[tuple]:
+        """按行遍历原始单元格值（等价于 iter_rows(values_only=True)）"""
+        stop = self.max_row if max_row is None else min(max_row, self.max_row)
+        return map(self.rows.__getitem__, range(max(min_row, 1) - 1, stop))
+
+    def head_values(self, max_row: int) -> Iterator[tuple]:
+        """
+        遍历前 max_row 行的原始单元格值（供表格识别使用）
+
+        行长度不保证一致，末尾可能包含空行，调用方只应读取其中的值。
+        """
+        return self.iter_values(1, max_row)
+
+    def cell(self, row_idx: int, col_idx: int):
+        """获取单元格值（行号从1开始，列索引从0开始），解析合并单元格"""
+        if row_idx < 1 or row_idx > self.max_row:
+            return ''
+        return SheetRow(self, row_idx, self.rows[row_idx - 1]).get(col_idx)
+
+
+class DeferredSheetIndex(SheetIndex):
+    """
+    按需构建的工作表索引
+
+    创建时只记录标题，第一次访问 rows / max_row / max_column / merged_values 时
+    才调用 build 扫描工作表；之后与普通 SheetIndex 完全相同（槽位已赋值，不再经过
+    __getattr__）。构建之前 head_values 通过 head
+    只流式读取前几行，不触发构建。
+    """
+
+    __slots__ = ('_build', '_head')
+
+    def __init__(self, title: str, build: Callable[[], SheetIndex],
+                 head: Optional[Callable[[int], List[tuple]]] = None):
+        self.title = title
+        self._build = build
+        self._head = head
+
+    def head_values(self, max_row: int) -> Iterator[tuple]:
+        if self._build is not None and self._head is not None:
+            return iter(self._head(max_row))
+        return super().head_values(max_row)
+
+    def __getattr__(self, name):
+        # 只有尚未赋值的槽位会走到这里
+        if name not in _DEFERRED_SLOTS:
+            raise AttributeError(name)
+        if self._build is not None:
+            built = self._build()
+            self.rows = built.rows
+            self.max_row = built.max_row
+            self.max_column = built.max_column
+            self.merged_values = built.merged_values
+            self._build = None
+        return object.__getattribute__(self, name)
+
+
+_DEFERRED_SLOTS = frozenset(['rows', 'max_row', 'max_column', 'merged_values'])
+
+
+def _build_read_only_sheet(ws, file_path: str, part_path: Optional[str]) -> SheetIndex:
+    """扫描单个只读工作表（按需构建时调用）"""
+    merged_ranges = []
+    if part_path:
+        with zipfile.ZipFile(file_path) as archive:
+            merged_ranges = read_merged_ranges(archive, part_path)
+    return SheetIndex.from_read_only_worksheet(ws, merged_ranges)
+
+
+def _read_only_head(ws, max_row: int) -> List[tuple]:
+    """流式读取只读工作表的前 max_row 行（不构建整个工作表的网格）"""
+    ws.reset_dimensions()
+    return list(ws.iter_rows(max_row=max_row, values_only=True))
+
+
+def build_merged_anchors(ranges) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    构建合并单元格锚点表
+
+    Args:
+        ranges: 合并区域边界 (min_col, min_row, max_col, max_row) 的可迭代对象
+
+    Returns:
+        被合并覆盖的单元格 (行号, 列号) -> 左上角单元格 (行号, 列号)，不含左上角自身
+    """
+    anchors = {}
+    for min_col, min_row, max_col, max_row in ranges:
+        anchor = (min_row, min_col)
+        for r in range(min_row, max_row + 1):
+            for c in range(min_col, max_col + 1):
+                anchors[(r, c)] = anchor
+        del anchors[anchor]
+    return anchors
+
+
+def build_merged_lookup(rows: Tuple[tuple, ...], ranges) -> Dict[Tuple[int, int], object]:
+    """
+    构建合并单元格查找表
+
+    Args:
+        rows: 按行存储的单元格值
+        ranges: 合并区域边界 (min_col, min_row, max_col, max_row) 的可迭代对象
+
+    Returns:
+        被合并覆盖的单元格 (行号, 列号) -> 左上角单元格的值（为空时为 ''）
+    """
+    lookup = {}
+    for cell, (min_row, min_col) in build_merged_anchors(ranges).items():
+        top_left = None
+        if min_row <= len(rows) and min_col <= len(rows[min_row - 1]):
+            top_left = rows[min_row - 1][min_col - 1]
+        lookup[cell] = '' if top_left is None else top_left
+    return lookup
+
+
+# openpyxl 工作表 -> (合并区域数量, 锚点表)，工作表被回收时自动移除
+_WORKSHEET_ANCHORS = weakref.WeakKeyDictionary()
+
+
+def worksheet_merged_anchors(ws) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """
+    获取 openpyxl 工作表的合并单元格锚点表（按工作表缓存）
+
+    供仍直接使用 openpyxl 行对象的代码解析合并单元格，每个工作表只构建一次；
+    合并区域数量变化时重新构建。只读工作表没有合并信息，返回空表。
+    """
+    merged_cells = getattr(ws, 'merged_cells', None)
+    if merged_cells is None:
+        return {}
+    ranges = merged_cells.ranges
+    cached = _WORKSHEET_ANCHORS.get(ws)
+    if cached is None or cached[0] != len(ranges):
+        cached = (len(ranges), build_merged_anchors(r.bounds for r in ranges))
+        _WORKSHEET_ANCHORS[ws] = cached
+    return cached[1]
+
+
+class WorkbookIndex:
+    """工作簿索引：按原始顺序保存所有工作表的 SheetIndex"""
+
+    def __init__(self, sheets: List[SheetIndex]):
+        self.worksheets = sheets
+        self.sheetnames = [s.title for s in sheets]
+        self._by_title = {s.title: s for s in sheets}
+
+    @classmethod
+    def from_workbook(cls, workbook, file_path: Optional[str] = None,
+                      deferred: bool = False) -> 'WorkbookIndex':
+        """
+        从 openpyxl 工作簿构建索引，每个工作表只扫描一次
+
+        Args:
+            workbook: openpyxl工作簿对象（完整模式或 read_only=True 模式）
+            file_path: xlsx 文件路径，只读模式下用于读取合并单元格信息
+            deferred: 只读模式下按需构建各工作表（DeferredSheetIndex），
+                调用方需要在索引使用完毕之前保持工作簿打开
+        """
+        if not getattr(workbook, 'read_only', False):
+            return cls([SheetIndex.from_worksheet(ws) for ws in workbook.worksheets])
+
+        if file_path is None:
+            raise ValueError("只读模式的工作簿需要提供 file_path 以读取合并单元格信息")
+
+        with zipfile.ZipFile(file_path) as archive:
+            part_paths = sheet_part_paths(archive)
+            if deferred:
+                return cls([
+                    DeferredSheetIndex(ws.title,
+                                       functools.partial(_build_read_only_sheet, ws, file_path,
+                                                         part_paths.get(ws.title)),
+                                       functools.partial(_read_only_head, ws))
+                    for ws in workbook.worksheets
+                ])
+            sheets = []
+            for ws in workbook.worksheets:
+                part_path = part_paths.get(ws.title)
+                merged_ranges = read_merged_ranges(archive, part_path) if part_path else []
+                sheets.append(SheetIndex.from_read_only_worksheet(ws, merged_ranges))
+        return cls(sheets)
+
+    def __getitem__(self, title: str) -> SheetIndex:
+        return self._by_title[title]
+
+    def __contains__(self, title: str) -> bool:
+        return title in self._by_title
+
+    def __iter__(self):
+        return iter(self.worksheets)
+
+    def __len__(self) -> int:
+        return len(self.worksheets)
+
+    def find_sheet(self, *name_patterns: str) -> Optional[SheetIndex]:
+        """根据名称模式查找工作表，所有模式都匹配才返回"""
+        for sheet in self.worksheets:
+            if all(pattern and pattern in sheet.title for pattern in name_patterns):
+                return sheet
+        return None
+
+
+__all__ = [
+    'SheetRow',
+    'CompactRows',
+    'SheetIndex',
+    'DeferredSheetIndex',
+    'WorkbookIndex',
+    'build_merged_anchors',
+    'build_merged_lookup',
+    'worksheet_merged_anchors',
+]
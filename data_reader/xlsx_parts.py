@@ -0,0 +1,169 @@
+"""
+xlsx 部件读取模块
+=====================
+
+直接读取 xlsx 压缩包中的工作簿和工作表 XML 部件，不经过 openpyxl 的完整加载。
+"""
+
+import hashlib
+import posixpath
+import re
+import zipfile
+from typing import Dict, List, Tuple
+from xml.etree import ElementTree as ET
+
+from openpyxl.utils.cell import range_boundaries
+
+
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_DOC_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_OFFICE_DOCUMENT = _NS_DOC_REL + '/officeDocument'
+_SHARED_STRINGS = _NS_DOC_REL + '/sharedStrings'
+_STYLES = _NS_DOC_REL + '/styles'
+
+# <mergeCell ref="A1:B2"/>，兼容带命名空间前缀的写法
+_MERGE_CELL_RE = re.compile(rb'<(?:\w+:)?mergeCell\b[^>]*?\bref="([^"]+)"')
+_MERGE_CELLS_RE = re.compile(rb'<(?:\w+:)?mergeCells\b.*?</(?:\w+:)?mergeCells>', re.S)
+
+# 共享字符串表中的一项 <si>...</si>（含富文本），取原始字节
+_SHARED_STRING_RE = re.compile(rb'<(?:\w+:)?si\b[^>]*?(?:/>|>.*?</(?:\w+:)?si>)', re.S)
+# 共享字符串单元格 <c r="A1" t="s"><v>12</v></c>，取字符串序号
+# （以字面量 t="s" 开头，正则引擎可以直接按字面量定位，大工作表上快一个数量级）
+_SHARED_CELL_RE = re.compile(rb't="s"[^>]*(?<!/)>\s*<(?:\w+:)?v>(\d+)</')
+
+_CHUNK_SIZE = 1 << 20
+
+
+def _resolve_target(base_dir: str, target: str) -> str:
+    """将关系中的 Target 解析为压缩包内的路径"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _read_rels(archive: zipfile.ZipFile, rels_path: str, base_dir: str) -> Dict[str, Tuple[str, str]]:
+    """读取 .rels 文件：关系Id -> (关系类型, 部件路径)"""
+    rels = {}
+    root = ET.fromstring(archive.read(rels_path))
+    for rel in root.iter(f'{{{_NS_PKG_REL}}}Relationship'):
+        rels[rel.get('Id')] = (rel.get('Type'), _resolve_target(base_dir, rel.get('Target', '')))
+    return rels
+
+
+def _workbook_parts(archive: zipfile.ZipFile) -> Tuple[ET.Element, Dict[str, Tuple[str, str]]]:
+    """读取工作簿部件：(workbook.xml 根节点, 工作簿关系)"""
+    workbook_path = 'xl/workbook.xml'
+    for rel_type, path in _read_rels(archive, '_rels/.rels', '').values():
+        if rel_type == _OFFICE_DOCUMENT:
+            workbook_path = path
+            break
+
+    base_dir, name = posixpath.split(workbook_path)
+    rels = _read_rels(archive, posixpath.join(base_dir, '_rels', name + '.rels'), base_dir)
+    return ET.fromstring(archive.read(workbook_path)), rels
+
+
+def _sheet_paths(root: ET.Element, rels: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+    paths = {}
+    for sheet in root.iter(f'{{{_NS_MAIN}}}sheet'):
+        rel = rels.get(sheet.get(f'{{{_NS_DOC_REL}}}id'))
+        if rel:
+            paths[sheet.get('name')] = rel[1]
+    return paths
+
+
+def sheet_part_paths(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    获取工作表名称到 XML 部件路径的映射（按工作簿中的顺序）
+
+    Args:
+        archive: 已打开的 xlsx 压缩包
+
+    Returns:
+        工作表名称 -> 压缩包内路径，如 {'基本信息': 'xl/worksheets/sheet1.xml'}
+    """
+    return _sheet_paths(*_workbook_parts(archive))
+
+
+def _part_of_type(archive: zipfile.ZipFile, rels: Dict[str, Tuple[str, str]], rel_type: str) -> bytes:
+    """工作簿关系中指定类型部件的原始字节（不存在时为空）"""
+    for part_type, path in rels.values():
+        if part_type == rel_type and path in archive.NameToInfo:
+            return archive.read(path)
+    return b''
+
+
+def sheet_digests(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    计算每个工作表内容的摘要（按工作簿中的顺序）
+
+    摘要只取决于读取结果（data_only=True）所依赖的内容：
+    - 工作表 XML 部件的原始字节（单元格值、公式缓存值），合并单元格按区域排序后计入
+      （openpyxl 保存时合并单元格的顺序不固定）
+    - 该工作表引用的共享字符串（按引用顺序取共享字符串表中的原始项，
+      其他工作表新增或修改字符串导致序号不变、内容改变时也能发现）
+    - 样式表和 1904 日期系统标记（影响数值是否读取为日期）
+
+    工作表视图、活动标签页等不影响读取结果的工作簿级变化不改变摘要。
+
+    Returns:
+        工作表名称 -> SHA-256 十六进制摘要
+    """
+    root, rels = _workbook_parts(archive)
+    shared_strings = _SHARED_STRING_RE.findall(_part_of_type(archive, rels, _SHARED_STRINGS))
+
+    workbook_pr = root.find(f'{{{_NS_MAIN}}}workbookPr')
+    date1904 = workbook_pr.get('date1904', '') if workbook_pr is not None else ''
+    common = hashlib.sha256(_part_of_type(archive, rels, _STYLES))
+    common.update(b'date1904=' + date1904.encode('ascii'))
+
+    digests = {}
+    for title, part_path in _sheet_paths(root, rels).items():
+        digest = common.copy()
+        data = archive.read(part_path) if part_path in archive.NameToInfo else b''
+        # mergeCells 位于 sheetData 之后，先按字面量定位再匹配整个元素
+        pos = data.find(b'mergeCells')
+        merge_cells = _MERGE_CELLS_RE.search(data, data.rfind(b'<', 0, pos)) if pos >= 0 else None
+        if merge_cells:
+            digest.update(data[:merge_cells.start()])
+            digest.update(b' '.join(sorted(_MERGE_CELL_RE.findall(merge_cells.group()))))
+            digest.update(data[merge_cells.end():])
+        else:
+            digest.update(data)
+        if shared_strings:
+            for match in _SHARED_CELL_RE.finditer(data):
+                idx = int(match.group(1))
+                digest.update(shared_strings[idx] if idx < len(shared_strings) else b'<missing/>')
+        digests[title] = digest.hexdigest()
+    return digests
+
+
+def read_merged_ranges(archive: zipfile.ZipFile, part_path: str) -> List[Tuple[int, int, int, int]]:
+    """
+    流式扫描工作表 XML，提取所有合并区域
+
+    mergeCells 位于 sheetData 之后，这里按块读取原始字节并用正则匹配，
+    不构建任何 XML 节点，内存占用与工作表大小无关。
+
+    Returns:
+        合并区域边界列表 (min_col, min_row, max_col, max_row)
+    """
+    ranges = []
+    tail = b''
+    with archive.open(part_path) as fh:
+        while True:
+            chunk = fh.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            buf = tail + chunk
+            consumed = 0
+            for match in _MERGE_CELL_RE.finditer(buf):
+                ranges.append(range_boundaries(match.group(1).decode('ascii')))
+                consumed = match.end()
+            # 保留末尾一小段，避免标签被块边界截断
+            tail = buf[max(consumed, len(buf) - 256):]
+    return ranges
+
+
+__all__ = ['sheet_part_paths', 'sheet_digests', 'read_merged_ranges']
@@ -0,0 +1,416 @@
+"""
+文档元素索引模块
+
+渲染完成后对 Word 文档建立一次索引，供后处理步骤共享：
+- 正文段落列表及段落文本
+- 正文表格列表、表格文本（按 w:t 拼接）及逐行单元格文本
+- 关键词 -> 首个包含该关键词的表格索引（多个关键词一次遍历表格文本查找）
+- 范围三类别 -> 库存表/EF表/首个提及该类别的表格（识别一次，随删除/修改同步）
+- 段落 -> 紧随其后的表格（标题段落与表格的相邻关系）
+
+后处理步骤删除/插入段落或表格、修改表格内容时，通过索引提供的方法同步更新，
+不再每次查找都重新遍历整个文档。
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from data_reader.utils import KeywordMatcher
+
+# 范围三类别名称（判断表格是否提及某类别时与"类别N"一起作为关键词）
+SCOPE3_CATEGORY_NAMES = {
+    1: "购买的商品和服务",
+    2: "资本商品",
+    3: "燃料和能源相关活动",
+    4: "上游运输和配送",
+    5: "运营中产生的废弃物",
+    6: "员工商务旅行",
+    7: "员工通勤",
+    8: "上游租赁资产",
+    9: "下游运输和配送",
+    10: "销售产品的加工",
+    11: "销售产品的使用",
+    12: "寿命终结处理",
+    13: "下游租赁资产",
+    14: "特许经营",
+    15: "投资"
+}
+
+# 类别表格识别：只看表格前几行，在 [起始, 结束) 索引范围内的表格中查找
+_CATEGORY_HEADER_ROWS = 6
+_CATEGORY_TABLE_START = 4
+_CATEGORY_TABLE_END = 50
+
+# 表格识别关键词（所有类别编译为一个匹配器，每个单元格只扫描一次）
+_CATEGORY_TABLE_KEYWORDS = KeywordMatcher(
+    keyword
+    for cat_num in SCOPE3_CATEGORY_NAMES
+    for keyword in (f'范围三 类别{cat_num}', f'范围三类别{cat_num}', f'3.{cat_num}.', f'3.{cat_num} ',
+                    f'类别{cat_num}', f'范围{cat_num}')
+)
+_EF_TABLE_KEYWORDS = KeywordMatcher(['排放因子', '缺省', '引用源', 'Activity name', 'Geography'])
+_DETAIL_NUMBER_PATTERN = re.compile(r'3\.\d+\.\d+')
+
+# 表格提及类别的关键词 -> 类别编号集合
+_MENTION_CATEGORIES: Dict[str, set] = {}
+for _cat_num, _name in SCOPE3_CATEGORY_NAMES.items():
+    for _keyword in (_name, f'类别{_cat_num}'):
+        _MENTION_CATEGORIES.setdefault(_keyword, set()).add(_cat_num)
+_MENTION_KEYWORDS = KeywordMatcher(_MENTION_CATEGORIES)
+
+
+class DocumentIndex:
+    """Word 文档正文的段落/表格索引（增量维护）"""
+
+    def __init__(self, doc):
+        """
+        Args:
+            doc: python-docx 的 Document 对象
+        """
+        self.doc = doc
+        self._paragraphs: List[Paragraph] = list(doc.paragraphs)
+        self._tables: List[Table] = list(doc.tables)
+        # 段落元素 -> 段落文本
+        self._paragraph_texts: Dict[object, str] = {}
+        # 表格元素 -> 表格文本（无法读取时为 None）
+        self._table_texts: Dict[object, Optional[str]] = {}
+        # 表格元素 -> (行对象列表, 逐行单元格文本缓存)
+        self._table_rows: Dict[object, tuple] = {}
+        # 关键词 -> 首个包含该关键词的表格索引（未找到为 None）
+        self._keyword_tables: Dict[str, Optional[int]] = {}
+        # 表格元素 -> 表格文本提及的范围三类别编号
+        self._table_mentions: Dict[object, FrozenSet[int]] = {}
+        # 类别编号 -> {'inventory'/'ef': 表格元素}（首次查询时识别一次，未识别为 None）
+        self._category_roles: Optional[Dict[int, Dict[str, object]]] = None
+        # 段落元素 -> 紧随其后的表格元素（首次查询时建立，未建立为 None）
+        self._table_after: Optional[Dict[object, object]] = None
+
+    # ------------------------------------------------------------------
+    # 段落
+    # ------------------------------------------------------------------
+
+    @property
+    def paragraphs(self) -> List[Paragraph]:
+        """正文段落（文档顺序，与 doc.paragraphs 一致，调用方不应修改该列表）"""
+        return self._paragraphs
+
+    def paragraph_text(self, para: Paragraph) -> str:
+        """获取段落文本（缓存）"""
+        element = para._element
+        text = self._paragraph_texts.get(element)
+        if text is None:
+            text = para.text
+            self._paragraph_texts[element] = text
+        return text
+
+    def paragraph_changed(self, para: Paragraph):
+        """段落文本被修改后调用，丢弃缓存的文本"""
+        self._paragraph_texts.pop(para._element, None)
+
+    def insert_paragraph_before(self, para: Paragraph, new_element) -> Paragraph:
+        """在指定段落前插入新的段落元素，返回新段落"""
+        para._element.addprevious(new_element)
+        new_para = Paragraph(new_element, para._parent)
+        self._paragraphs.insert(self._paragraphs.index(para), new_para)
+        return new_para
+
+    def remove_paragraphs(self, paras: Iterable[Paragraph]) -> int:
+        """
+        从文档中删除段落
+
+        Returns:
+            实际删除的段落数
+        """
+        removed = set()
+        for para in paras:
+            element = para._element
+            parent = element.getparent()
+            if parent is None:
+                continue
+            previous, following = element.getprevious(), element.getnext()
+            parent.remove(element)
+            removed.add(element)
+            self._paragraph_texts.pop(element, None)
+            if self._table_after is not None:
+                self._table_after.pop(element, None)
+                self._relink(previous, following)
+        if removed:
+            self._paragraphs = [p for p in self._paragraphs if p._element not in removed]
+        return len(removed)
+
+    def table_after(self, para: Paragraph) -> Optional[Table]:
+        """获取紧随段落之后的表格（段落后面不是表格时返回 None）"""
+        if self._table_after is None:
+            self._table_after = {}
+            previous = None
+            for child in self.doc.element.body.iterchildren():
+                self._relink(previous, child)
+                previous = child
+        tbl_element = self._table_after.get(para._element)
+        if tbl_element is None:
+            return None
+        return next((t for t in self._tables if t._element is tbl_element), None)
+
+    def _relink(self, previous, following):
+        """previous 的下一个兄弟元素变为 following 后，更新段落 -> 表格相邻关系"""
+        if self._table_after is None or previous is None or previous.tag != qn('w:p'):
+            return
+        if following is not None and following.tag == qn('w:tbl'):
+            self._table_after[previous] = following
+        else:
+            self._table_after.pop(previous, None)
+
+    # ------------------------------------------------------------------
+    # 表格
+    # ------------------------------------------------------------------
+
+    @property
+    def tables(self) -> List[Table]:
+        """正文表格（文档顺序，与 doc.tables 一致，调用方不应修改该列表）"""
+        return self._tables
+
+    def table_text(self, table_idx: int) -> Optional[str]:
+        """
+        获取表格文本：按行、单元格、段落、文本运行顺序拼接所有 w:t，每段后加空格
+
+        Returns:
+            表格文本；遍历出错（如存在空 w:t）时返回 None
+        """
+        element = self._tables[table_idx]._element
+        if element in self._table_texts:
+            return self._table_texts[element]
+
+        parts = []
+        try:
+            for tr in element.tr_lst:
+                for tc in tr.tc_lst:
+                    for p in tc.p_lst:
+                        for r in p.r_lst:
+                            for t in r.t_lst:
+                                parts.append(t.text + " ")
+            text = "".join(parts)
+        except Exception:
+            text = None
+        self._table_texts[element] = text
+        return text
+
+    def find_table(self, keywords: Sequence[str]) -> Optional[int]:
+        """
+        查找第一个包含任一关键词的表格
+
+        Args:
+            keywords: 关键词列表
+
+        Returns:
+            表格索引，未找到返回 None
+        """
+        missing = [keyword for keyword in keywords if keyword not in self._keyword_tables]
+        if missing:
+            self._scan_keywords(missing)
+
+        best = None
+        for keyword in keywords:
+            idx = self._keyword_tables[keyword]
+            if idx is not None and (best is None or idx < best):
+                best = idx
+        return best
+
+    def _scan_keywords(self, keywords: Sequence[str]):
+        """一次遍历表格文本，查找每个关键词首次出现的表格（所有关键词共用一个匹配器）"""
+        pending = set(keywords)
+        for keyword in pending:
+            self._keyword_tables[keyword] = None
+        matcher = KeywordMatcher(pending)
+        for idx in range(len(self._tables)):
+            text = self.table_text(idx)
+            if text is None:
+                continue
+            found = matcher.find_all(text) & pending
+            for keyword in found:
+                self._keyword_tables[keyword] = idx
+            pending -= found
+            if not pending:
+                break
+
+    def row_count(self, table_idx: int) -> int:
+        """获取表格行数"""
+        return len(self._rows_entry(table_idx)[0])
+
+    def cell_texts(self, table_idx: int, row_idx: int) -> List[str]:
+        """
+        获取表格某一行所有单元格的文本（与 row.cells 的语义一致，
+        横向合并的单元格重复出现，纵向合并的续接单元格取起始单元格的文本）
+        """
+        rows, texts = self._rows_entry(table_idx)
+        cached = texts[row_idx]
+        if cached is None:
+            cached = [cell.text for cell in rows[row_idx].cells]
+            texts[row_idx] = cached
+        return cached
+
+    def _rows_entry(self, table_idx: int) -> tuple:
+        table = self._tables[table_idx]
+        entry = self._table_rows.get(table._element)
+        if entry is None:
+            rows = list(table.rows)
+            entry = (rows, [None] * len(rows))
+            self._table_rows[table._element] = entry
+        return entry
+
+    def table_changed(self, table: Table):
+        """
+        表格内容被修改（如合并单元格）后调用，丢弃该表格的缓存
+
+        已识别的类别库存表/EF表保持不变（表格本身没有变化），
+        该表格提及的类别在下次查询时重新计算。
+        """
+        element = table._element
+        self._table_texts.pop(element, None)
+        self._table_rows.pop(element, None)
+        self._table_mentions.pop(element, None)
+        self._keyword_tables.clear()
+
+    def remove_table(self, table: Table):
+        """从文档中删除表格"""
+        element = table._element
+        previous, following = element.getprevious(), element.getnext()
+        element.getparent().remove(element)
+        self._tables = [t for t in self._tables if t._element is not element]
+        self._table_texts.pop(element, None)
+        self._table_rows.pop(element, None)
+        self._table_mentions.pop(element, None)
+        self._keyword_tables.clear()
+        if self._category_roles is not None:
+            for roles in self._category_roles.values():
+                for role in [role for role, tbl_element in roles.items() if tbl_element is element]:
+                    del roles[role]
+        self._relink(previous, following)
+
+    def insert_table_after(self, para: Paragraph, tbl_element) -> Table:
+        """在指定段落后插入表格元素，返回新表格"""
+        para_element = para._element
+        parent = para_element.getparent()
+        parent.insert(parent.index(para_element) + 1, tbl_element)
+        # 表格列表按文档顺序重建，已有表格沿用原对象（缓存按元素保存，不受影响）
+        existing = {t._element: t for t in self._tables}
+        self._tables = [existing.get(t._element, t) for t in self.doc.tables]
+        self._keyword_tables.clear()
+        self._relink(para_element, tbl_element)
+        return next(t for t in self._tables if t._element is tbl_element)
+
+
+    # ------------------------------------------------------------------
+    # 范围三类别表格
+    # ------------------------------------------------------------------
+
+    def category_tables(self) -> Dict[int, Dict[str, int]]:
+        """
+        获取范围三各类别对应的表格索引
+
+        Returns:
+            类别编号 -> {'inventory': 库存表索引, 'ef': EF表索引, 'mentioned': 首个提及该类别的表格索引}，
+            只包含找到的项。库存表/EF表在首次调用时识别一次（之后插入的表格不参与识别），
+            删除表格时同步移除；'mentioned' 按当前表格文本计算（每个表格的结果缓存到表格被修改）。
+        """
+        if self._category_roles is None:
+            self._category_roles = self._classify_category_tables()
+
+        positions = {t._element: idx for idx, t in enumerate(self._tables)}
+        result = {}
+        for cat_num, roles in self._category_roles.items():
+            result[cat_num] = {role: positions[tbl_element] for role, tbl_element in roles.items()}
+
+        pending = set(SCOPE3_CATEGORY_NAMES)
+        for idx in range(len(self._tables)):
+            if not pending:
+                break
+            found = self._mentions(idx) & pending
+            for cat_num in found:
+                result[cat_num]['mentioned'] = idx
+            pending -= found
+        return result
+
+    def _mentions(self, table_idx: int) -> FrozenSet[int]:
+        """表格文本提及的范围三类别（类别名称或"类别N"，按子串匹配）"""
+        element = self._tables[table_idx]._element
+        mentions = self._table_mentions.get(element)
+        if mentions is None:
+            text = self.table_text(table_idx)
+            categories = set()
+            if text is not None:
+                for keyword in _MENTION_KEYWORDS.find_all(text):
+                    categories |= _MENTION_CATEGORIES[keyword]
+            mentions = frozenset(categories)
+            self._table_mentions[element] = mentions
+        return mentions
+
+    def _header_hits(self, table_idx: int) -> List[list]:
+        """表格前几行每个单元格的 (命中的类别关键词, 是否含EF关键词, 是否含3.X.Y编号)"""
+        hits = []
+        for row_idx in range(min(_CATEGORY_HEADER_ROWS, self.row_count(table_idx))):
+            texts = [cell_text.strip() for cell_text in self.cell_texts(table_idx, row_idx)]
+            hits.append([(_CATEGORY_TABLE_KEYWORDS.find_all(text), _EF_TABLE_KEYWORDS.search(text),
+                          _DETAIL_NUMBER_PATTERN.search(text) is not None)
+                         for text in texts])
+        return hits
+
+    def _classify_category_tables(self) -> Dict[int, Dict[str, object]]:
+        """
+        识别各类别的库存表（含3.10.1这类编号）和EF表（含排放因子相关列）
+
+        按类别编号依次在表格中查找，已被其他类别占用的表格跳过；同一类别找到
+        多个同类表格时以最后一个为准（被覆盖的表格可再被后续类别占用）。
+        """
+        end = min(_CATEGORY_TABLE_END, len(self._tables))
+        table_hits = {idx: self._header_hits(idx) for idx in range(_CATEGORY_TABLE_START, end)}
+        elements = [t._element for t in self._tables]
+        inventory_tables = {}
+        ef_tables = {}
+
+        for cat_num in SCOPE3_CATEGORY_NAMES:
+            category_keys = (f'范围三 类别{cat_num}', f'范围三类别{cat_num}')
+            inventory_keys = (f'3.{cat_num}.', f'3.{cat_num} ')
+            ef_category_keys = (f'类别{cat_num}', f'范围{cat_num}')
+            for table_idx in range(_CATEGORY_TABLE_START, end):
+                if table_idx in inventory_tables.values() or table_idx in ef_tables.values():
+                    continue
+
+                is_category_table = False
+                is_inventory_table = False
+                is_ef_table = False
+                for row_hits in table_hits[table_idx]:
+                    for found, has_ef_keyword, _ in row_hits:
+                        if found.intersection(category_keys):
+                            is_category_table = True
+                        if found.intersection(inventory_keys):
+                            is_inventory_table = True
+                        # 只有在不是库存表的情况下才判断EF表
+                        if not is_inventory_table and has_ef_keyword and found.intersection(ef_category_keys):
+                            is_ef_table = True
+                    if is_category_table:
+                        break
+
+                if not is_category_table:
+                    continue
+                # 库存表优先；无法确定类型时按前几行是否有3.X.Y编号决定
+                if is_inventory_table:
+                    inventory_tables[cat_num] = table_idx
+                elif is_ef_table:
+                    ef_tables[cat_num] = table_idx
+                elif any(detail_number for row_hits in table_hits[table_idx] for _, _, detail_number in row_hits):
+                    inventory_tables[cat_num] = table_idx
+                else:
+                    ef_tables[cat_num] = table_idx
+
+        roles = {cat_num: {} for cat_num in SCOPE3_CATEGORY_NAMES}
+        for cat_num, table_idx in inventory_tables.items():
+            roles[cat_num]['inventory'] = elements[table_idx]
+        for cat_num, table_idx in ef_tables.items():
+            roles[cat_num]['ef'] = elements[table_idx]
+        return roles
+
+
+__all__ = ['DocumentIndex', 'SCOPE3_CATEGORY_NAMES']
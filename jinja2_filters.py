@@ -7,6 +7,24 @@ Jinja2 自定义过滤器模块
 import jinja2
 
 
+def to_chinese_num(n):
+    """
+    将数字转换为中文序号（模板中的 cn_num 过滤器）
+
+    Args:
+        n: 数字 (1-15)
+
+    Returns:
+        中文大写数字字符串
+    """
+    chinese_map = {
+        1: '一', 2: '二', 3: '三', 4: '四', 5: '五',
+        6: '六', 7: '七', 8: '八', 9: '九', 10: '十',
+        11: '十一', 12: '十二', 13: '十三', 14: '十四', 15: '十五'
+    }
+    return chinese_map.get(n, str(n))
+
+
 def format_number(value, decimals=2, with_comma=True):
     """
     格式化数字：添加千分位分隔符，保留小数位（展示层格式化）
@@ -156,15 +174,20 @@ def register_filters_to_template(docx_template):
     if not hasattr(docx_template, 'jinja_env') or docx_template.jinja_env is None:
         docx_template.jinja_env = jinja2.Environment()
 
-    # 注册过滤器
-    docx_template.jinja_env.filters['format_number'] = format_number
-    docx_template.jinja_env.filters['format_emission'] = format_emission
-    docx_template.jinja_env.filters['format_percent'] = format_percent
-    docx_template.jinja_env.filters['format_yes_no'] = format_yes_no
-
+    register_filters(docx_template.jinja_env)
     return docx_template
 
 
+def register_filters(env):
+    """将所有展示层过滤器注册到 Jinja2 环境"""
+    env.filters['cn_num'] = to_chinese_num
+    env.filters['format_number'] = format_number
+    env.filters['format_emission'] = format_emission
+    env.filters['format_percent'] = format_percent
+    env.filters['format_yes_no'] = format_yes_no
+    return env
+
+
 # 如果直接运行此模块，提供测试代码
 if __name__ == "__main__":
     print("Jinja2 自定义过滤器测试")
@@ -1,12 +1,25 @@
 # main.py
 # 使用重构后的协议驱动型数据读取器（方式1: 从新包导入）
 from data_reader import ExcelDataReaderRefactored as ExcelDataReader
-from docxtpl import DocxTemplate
-from jinja2 import Environment
+from data_reader.cache import ContextCache
+from data_reader.convert import to_float as safe_float
+from data_reader.profiling import Profiler, count_rows, profiling, step as profile_step
+from data_reader.utils import KeywordMatcher
+import logging
 import os
 import re
+import time
+from collections.abc import Mapping
 from docx.oxml import OxmlElement
+from document_index import SCOPE3_CATEGORY_NAMES, DocumentIndex
 from inventory_summary_generator import generate_inventory_context
+from table_merge import merge_table_columns
+from template_cache import load_template
+
+# 日志分层：report（主流程步骤）、report.context（展示层数据准备）、report.postprocess（文档后处理）
+logger = logging.getLogger('report')
+context_logger = logging.getLogger('report.context')
+postprocess_logger = logging.getLogger('report.postprocess')
 
 DEFAULT_DY_XLSX_NAME = "DY-GHG-2026-01 大冶特殊钢-温室气体盘查清册-Update 20260317Protocol-tr-0408.xlsx"
 
@@ -68,24 +81,6 @@ def resolve_inventory_xlsx_path(xlsx_path: str) -> str:
     )
 
 
-
-def to_chinese_num(n):
-    """
-
-    Args:
-        n: 数字 (1-15)
-
-    Returns:
-        中文大写数字字符串
-    """
-    chinese_map = {
-        1: '一', 2: '二', 3: '三', 4: '四', 5: '五',
-        6: '六', 7: '七', 8: '八', 9: '九', 10: '十',
-        11: '十一', 12: '十二', 13: '十三', 14: '十四', 15: '十五'
-    }
-    return chinese_map.get(n, str(n))
-
-
 def format_number(value, decimals=2, with_comma=True):
     """
     格式化数字：添加千分位分隔符，保留指定小数位数（展示层格式化）
@@ -151,7 +146,7 @@ def prepare_context_with_formatting(context):
     # 遍历所有值，对字符串类型执行 strip() 去除冗余空格
     def clean_strings_in_dict(d):
         """递归清洗字典中的所有字符串值"""
-        if not isinstance(d, dict):
+        if not isinstance(d, Mapping):
             return d
         
         cleaned = {}
@@ -160,10 +155,10 @@ def prepare_context_with_formatting(context):
                 # 去除首尾空格，替换多个连续空格为单个空格
                 cleaned_value = re.sub(r'\s+', ' ', str(value).strip())
                 cleaned[key] = cleaned_value
-            elif isinstance(value, dict):
+            elif isinstance(value, Mapping):
                 cleaned[key] = clean_strings_in_dict(value)
             elif isinstance(value, list):
-                cleaned[key] = [clean_strings_in_dict(item) if isinstance(item, dict) else 
+                cleaned[key] = [clean_strings_in_dict(item) if isinstance(item, Mapping) else 
                                (re.sub(r'\s+', ' ', str(item).strip()) if isinstance(item, str) else item)
                                for item in value]
             else:
@@ -366,7 +361,7 @@ def prepare_context_with_formatting(context):
             formatted_act_summary.append(formatted_item)
 
         formatted_context['act_summary_loc'] = formatted_act_summary
-        print(f"[活动数据汇总表] 已格式化 {len(formatted_act_summary)} 行数据")
+        context_logger.info("[活动数据汇总表] 已格式化 %s 行数据", len(formatted_act_summary))
 
         # 添加汇总行数据（模板期望的格式）
         formatted_context['loc_CO2_emissions_sum_formatted'] = format_number(loc_sums['CO2_emissions'])
@@ -377,7 +372,7 @@ def prepare_context_with_formatting(context):
         formatted_context['loc_SF6_emissions_sum_formatted'] = format_number(loc_sums['SF6_emissions'])
         formatted_context['loc_NF3_emissions_sum_formatted'] = format_number(loc_sums['NF3_emissions'])
         formatted_context['loc_total_green_house_gas_emissions_sum_formatted'] = format_number(loc_sums['total_green_house_gas_emissions'])
-        print(f"[活动数据汇总表] 汇总行计算完成")
+        context_logger.info("[活动数据汇总表] 汇总行计算完成")
     else:
         formatted_context['act_summary_loc'] = []
         # 设置空的汇总值
@@ -447,7 +442,7 @@ def prepare_context_with_formatting(context):
             formatted_act_summary_mar.append(formatted_item)
 
         formatted_context['act_summary_mar'] = formatted_act_summary_mar
-        print(f"[活动数据汇总表] 已格式化 {len(formatted_act_summary_mar)} 行数据（基于市场）")
+        context_logger.info("[活动数据汇总表] 已格式化 %s 行数据（基于市场）", len(formatted_act_summary_mar))
 
         # 添加汇总行数据（模板期望的格式）
         formatted_context['mar_CO2_emissions_sum_formatted'] = format_number(mar_sums['CO2_emissions'])
@@ -458,7 +453,7 @@ def prepare_context_with_formatting(context):
         formatted_context['mar_SF6_emissions_sum_formatted'] = format_number(mar_sums['SF6_emissions'])
         formatted_context['mar_NF3_emissions_sum_formatted'] = format_number(mar_sums['NF3_emissions'])
         formatted_context['mar_total_green_house_gas_emissions_sum_formatted'] = format_number(mar_sums['total_green_house_gas_emissions'])
-        print(f"[活动数据汇总表] 汇总行计算完成（基于市场）")
+        context_logger.info("[活动数据汇总表] 汇总行计算完成（基于市场）")
     else:
         formatted_context['act_summary_mar'] = []
         # 设置空的汇总值
@@ -534,7 +529,7 @@ def prepare_context_with_formatting(context):
         formatted_context['pro_ef_items'] = formatted_pro_ef_items
         # 同步到旧变量名（向后兼容）
         formatted_context['emission_factor_items'] = formatted_pro_ef_items
-        print(f"[排放因子汇总表] 已格式化 {len(formatted_pro_ef_items)} 行数据")
+        context_logger.info("[排放因子汇总表] 已格式化 %s 行数据", len(formatted_pro_ef_items))
 
         # 添加汇总行数据（排放因子汇总表通常显示平均值）
         if ef_count > 0:
@@ -551,7 +546,7 @@ def prepare_context_with_formatting(context):
             formatted_context['ef_CO2_emission_factor_sum_formatted'] = '0.00'
             formatted_context['ef_CH4_emission_factor_sum_formatted'] = '0.00'
             formatted_context['ef_N2O_emission_factor_sum_formatted'] = '0.00'
-        print(f"[排放因子汇总表] 汇总行计算完成（基于{ef_count}行有效数据）")
+        context_logger.info("[排放因子汇总表] 汇总行计算完成（基于%s行有效数据）", ef_count)
     else:
         formatted_context['pro_ef_items'] = []
         formatted_context['emission_factor_items'] = []
@@ -586,7 +581,7 @@ def prepare_context_with_formatting(context):
             
             formatted_indir_items.append(formatted_item)
         formatted_context['indir_ef_items'] = formatted_indir_items
-        print(f"[范围二排放因子] 已格式化 indir_ef_items: {len(formatted_indir_items)} 行数据")
+        context_logger.info("[范围二排放因子] 已格式化 indir_ef_items: %s 行数据", len(formatted_indir_items))
 
     # ========== 格式化范围三各类别排放因子表 (cat1-cat15) ==========
     for i in range(1, 16):
@@ -610,7 +605,7 @@ def prepare_context_with_formatting(context):
                             formatted_item[k] = format_number(v)
                 formatted_items.append(formatted_item)
             formatted_context[var_name] = formatted_items
-            print(f"[范围三排放因子] 已格式化 {var_name}: {len(formatted_items)} 行数据")
+            context_logger.debug("[范围三排放因子] 已格式化 %s: %s 行数据", var_name, len(formatted_items))
 
     # ========== 格式化范围三排放明细表 (scope3_category1-15) ==========
     for i in range(1, 16):
@@ -639,7 +634,7 @@ def prepare_context_with_formatting(context):
                     formatted_item['SFs_emissions'] = formatted_item['SF6_emissions']
                 formatted_items.append(formatted_item)
             formatted_context[var_name] = formatted_items
-            print(f"[范围三明细] 已格式化 {var_name}: {len(formatted_items)} 行数据")
+            context_logger.debug("[范围三明细] 已格式化 %s: %s 行数据", var_name, len(formatted_items))
 
     # ========== 格式化范围二排放明细表 (scope2_items) ==========
     if 'scope2_items' in context and context['scope2_items']:
@@ -662,7 +657,7 @@ def prepare_context_with_formatting(context):
                 formatted_item['SFs_emissions'] = formatted_item['SF6_emissions']
             formatted_items.append(formatted_item)
         formatted_context['scope2_items'] = formatted_items
-        print(f"[范围二明细] 已格式化 scope2_items: {len(formatted_items)} 行数据")
+        context_logger.info("[范围二明细] 已格式化 scope2_items: %s 行数据", len(formatted_items))
 
     # ========== 格式化范围一直接排放源清册数据 ==========
     # 为 scope1 排放项中的数值字段添加格式化处理（2位小数 + 千分位符）
@@ -726,7 +721,7 @@ def prepare_context_with_formatting(context):
                 formatted_items.append(formatted_item)
 
             formatted_context[var_name] = formatted_items
-            print(f"[范围一排放] 已格式化 {var_name}: {len(formatted_items)} 行数据")
+            context_logger.debug("[范围一排放] 已格式化 %s: %s 行数据", var_name, len(formatted_items))
         else:
             # 如果变量不存在或为空，初始化为空列表
             formatted_context[var_name] = []
@@ -820,24 +815,16 @@ def prepare_context_with_formatting(context):
         else:
             return "所有范围"  # 默认文本
 
-    # 添加 safe_float 辅助函数（如果还没有定义）
-    def safe_float(value):
-        """安全转换为浮点数"""
-        try:
-            return float(value) if value is not None else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-
     # 生成盘查边界描述文本
     formatted_context['included_scopes_text'] = generate_included_scopes_text(context)
-    print(f"[盘查边界] 生成描述文本: {formatted_context['included_scopes_text']}")
+    context_logger.info("[盘查边界] 生成描述文本: %s", formatted_context['included_scopes_text'])
     # ========== 盘查边界描述文本生成结束 ==========
 
     # ========== 新增：最终字符串清洗步骤 ==========
     # 确保所有字符串值都已strip()，去除首尾空格
     def final_string_clean(d):
         """递归清洗所有字符串值"""
-        if isinstance(d, dict):
+        if isinstance(d, Mapping):
             return {k: final_string_clean(v) for k, v in d.items()}
         elif isinstance(d, list):
             return [final_string_clean(item) for item in d]
@@ -850,13 +837,6 @@ def prepare_context_with_formatting(context):
     # ========== 最终清洗步骤结束 ==========
 
     # ========== 计算总温室气体排放量（基于位置和基于市场） ==========
-    def safe_float(value):
-        """安全转换为浮点数"""
-        try:
-            return float(value) if value is not None else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-
     # 基于位置的总排放量 = 范围一 + 范围二（基于位置） + 范围三
     location_based_total = (
         safe_float(context.get('scope_1_emissions', 0)) +
@@ -877,103 +857,47 @@ def prepare_context_with_formatting(context):
     formatted_context['market_based_total_green_house_gas_emissions'] = formatted_market_total
     formatted_context['market_based_total_green_house_gas_emissions_formatted'] = formatted_market_total
 
-    # Debug output
-    import sys
-    print(f"[总排放量计算]", file=sys.stderr)
-    print(f"  基于位置的总排放量: {format_number(location_based_total)} 吨CO2e", file=sys.stderr)
-    print(f"  基于市场的总排放量: {format_number(market_based_total)} 吨CO2e", file=sys.stderr)
+    context_logger.info("[总排放量计算]")
+    context_logger.info("  基于位置的总排放量: %s 吨CO2e", format_number(location_based_total))
+    context_logger.info("  基于市场的总排放量: %s 吨CO2e", format_number(market_based_total))
     # ========== 总排放量计算结束 ==========
 
     return formatted_context
 
 
-def generate_report_from_xlsx(
-    xlsx_path=DEFAULT_DY_XLSX_NAME,
-    template_path="template.docx",
-    output_path="carbon_report.docx"
-):
-    """
-    使用 template.docx 作为模板，从 xlsx 文件动态读取数据生成报告
-    数字格式化在展示层通过 Jinja2 过滤器处理，数据层保持原始数字类型
-
-    Args:
-        xlsx_path: Excel 数据文件路径
-        template_path: Word 模板文件路径
-        output_path: 输出报告路径（默认: carbon_report.docx）
-    """
-    print("=" * 50)
-    print("开始生成碳盘查报告（纯xlsx，动态读取）")
-    print("=" * 50)
-
-    xlsx_path = resolve_inventory_xlsx_path(xlsx_path)
-
-    # 1. 使用 data_reader 的协议驱动方法（重构版）
-    print(f"\n[步骤1] 从 {xlsx_path} 动态提取数据...")
-    reader = ExcelDataReader(xlsx_path)
-    context = reader.get_all_context()  # 重构后使用 get_all_context()
-    reader.close()  # 重构后需要手动关闭工作簿
-
-    # 打印提取的关键数据
-    print("\n提取的关键数据:")
-    print(f"  公司名称: {context.get('company_name')}")
-    print(f"  范围一排放: {context.get('scope_1_emissions')}")
-    print(f"  范围二排放（基于位置）: {context.get('scope_2_location_based_emissions')}")
-    print(f"  范围二排放（基于市场）: {context.get('scope_2_market_based_emissions')}")
-    print(f"  范围三排放: {context.get('scope_3_emissions')}")
-
-    # 调试量化方法
-    print("\n量化方法配置检查:")
-    if 'quantification_methods' in context:
-        scope1_methods = context['quantification_methods'].get('scope_1', {})
-        print(f"  范围一方法数量: {len(scope1_methods)}")
-
-        if 'gasoline_transport' in scope1_methods:
-            gasoline_ef = scope1_methods['gasoline_transport']['ef']
-            print(f"  汽油EF配置: {gasoline_ef}")
+# 合计/小计行的关键词（汇总明细时过滤掉）
+_SUMMARY_ROW_KEYWORDS = KeywordMatcher(['合计', '小计', '总计', '汇总', 'Total', 'Sum'])
 
-        if 'diesel_transport' in scope1_methods:
-            diesel_ef = scope1_methods['diesel_transport']['ef']
-            print(f"  柴油EF配置: {diesel_ef}")
-    else:
-        print("  未找到quantification_methods")
 
-    print("\n范围三分类排放量:")
-    for i in range(1, 16):  # 范围三共15个类别
-        val = context.get(f'scope_3_category_{i}_emissions')
-        if val and val > 0:
-            print(f"  类别{i}: {val}")
+def build_render_context(context):
+    """
+    由提取结果构建模板渲染上下文（步骤3 ~ 步骤3.6）
 
-    # 2. 加载模板
-    print(f"\n[步骤2] 加载模板: {template_path}")
-    template = DocxTemplate(template_path)
+    Args:
+        context: ExcelDataReader.get_all_context() 的提取结果
 
+    Returns:
+        渲染上下文（格式化后的数据 + summary_data 汇总/明细数据）
+    """
     # 3. 准备展示层数据（格式化数字，保持数据层纯净）
-    print("\n[步骤3] 准备展示层数据（格式化数字）...")
+    profile_step('step3_prepare_context')
+    logger.info("\n[步骤3] 准备展示层数据（格式化数字）...")
     render_context = prepare_context_with_formatting(context)
 
     # 3.5 生成基准年温室气体清单汇总数据
-    print("\n[步骤3.5] 生成基准年温室气体清单汇总数据...")
+    profile_step('step3.5_inventory_summary')
+    logger.info("\n[步骤3.5] 生成基准年温室气体清单汇总数据...")
 
     # ============================================================
-    # 辅助函数：安全转换 + 过滤合计行
+    # 辅助函数：过滤合计行（数值转换使用 data_reader.convert.to_float）
     # ============================================================
-    def safe_float(value):
-        """安全转换为浮点数"""
-        try:
-            # 移除千分位逗号
-            if isinstance(value, str):
-                value = value.replace(',', '')
-            return float(value) if value else 0.0
-        except (ValueError, TypeError):
-            return 0.0
-
     def is_summary_row(item):
         """检查是否为合计/小计行，需要过滤掉"""
         # 检查多个可能的字段
         for field in ['emission_source', 'category', 'name', 'number']:
             value = str(item.get(field, '')).strip()
             # 检查是否包含合计、小计、总计等关键字
-            if any(keyword in value for keyword in ['合计', '小计', '总计', '汇总', 'Total', 'Sum']):
+            if _SUMMARY_ROW_KEYWORDS.search(value):
                 return True
         return False
 
@@ -1016,9 +940,10 @@ def generate_report_from_xlsx(
     if scope1_total_from_context > 0:
         scope1_sums['total'] = scope1_total_from_context
 
-    print(f"[范围一汇总] CO2: {scope1_sums['co2']:.2f}, CH4: {scope1_sums['ch4']:.2f}, 总计: {scope1_sums['total']:.2f}")
+    logger.info("[范围一汇总] CO2: %.2f, CH4: %.2f, 总计: %.2f",
+                scope1_sums['co2'], scope1_sums['ch4'], scope1_sums['total'])
     if filtered_count > 0:
-        print(f"[范围一汇总] 已过滤 {filtered_count} 个合计/小计行")
+        logger.info("[范围一汇总] 已过滤 %s 个合计/小计行", filtered_count)
 
     # ============================================================
     # 第二步：构建 summary_raw_data
@@ -1103,16 +1028,18 @@ def generate_report_from_xlsx(
 
         summary_raw_data[cat_key] = cat_sums
 
-    print(f"[范围三汇总] 类别1 CO2: {summary_raw_data['cat1']['co2']:.2f}, 总计: {summary_raw_data['cat1']['total']:.2f}")
+    logger.info("[范围三汇总] 类别1 CO2: %.2f, 总计: %.2f",
+                summary_raw_data['cat1']['co2'], summary_raw_data['cat1']['total'])
 
     # 生成summary_data
     summary_data = generate_inventory_context(summary_raw_data)
     render_context['summary_data'] = summary_data
-    print("[汇总数据] 已添加到渲染上下文")
+    logger.info("[汇总数据] 已添加到渲染上下文")
 
     # 添加排放源明细数据到summary_data
     # ============================================================
-    print("[步骤3.6] 添加排放源明细数据...")
+    profile_step('step3.6_detail_lists')
+    logger.info("[步骤3.6] 添加排放源明细数据...")
 
     # 范围一排放源明细（固定燃烧、移动燃烧、逸散排放、制程排放）
     scope1_detail_lists = {
@@ -1122,136 +1049,261 @@ def generate_report_from_xlsx(
         'process': context.get('scope1_process_emissions_items', []),
     }
     summary_data['scope1_detail'] = scope1_detail_lists
-    print(f"  [范围一明细] 固定燃烧: {len(scope1_detail_lists['stationary'])} 条")
-    print(f"  [范围一明细] 移动燃烧: {len(scope1_detail_lists['mobile'])} 条")
-    print(f"  [范围一明细] 逸散排放: {len(scope1_detail_lists['fugitive'])} 条")
-    print(f"  [范围一明细] 制程排放: {len(scope1_detail_lists['process'])} 条")
+    logger.info("  [范围一明细] 固定燃烧: %s 条", len(scope1_detail_lists['stationary']))
+    logger.info("  [范围一明细] 移动燃烧: %s 条", len(scope1_detail_lists['mobile']))
+    logger.info("  [范围一明细] 逸散排放: %s 条", len(scope1_detail_lists['fugitive']))
+    logger.info("  [范围一明细] 制程排放: %s 条", len(scope1_detail_lists['process']))
 
     # 范围二排放源明细（外购能源间接排放）
     summary_data['scope2_detail'] = {
         'loc': context.get('indir_ef_items', []),  # 基于位置
         'mkt': context.get('indir_ef_items', []),  # 基于市场（相同数据）
     }
-    print(f"  [范围二明细] 外购能源: {len(summary_data['scope2_detail']['loc'])} 条")
+    logger.info("  [范围二明细] 外购能源: %s 条", len(summary_data['scope2_detail']['loc']))
 
     # 范围三排放源明细（15个类别）
     scope3_detail_lists = {}
     for i in range(1, 16):
         scope3_detail_lists[f'cat{i}'] = context.get(f'scope3_category{i}', [])
     summary_data['scope3_detail'] = scope3_detail_lists
-    print(f"  [范围三明细] 共 {sum(len(v) for v in scope3_detail_lists.values())} 条明细")
+    logger.info("  [范围三明细] 共 %s 条明细", sum(len(v) for v in scope3_detail_lists.values()))
 
     # 活动数据汇总明细
     summary_data['activity_summary_detail'] = {
         'loc': context.get('activity_summary_items', []),   # 基于位置
         'mkt': context.get('activity_summary_market_items', []),  # 基于市场
     }
-    print(f"  [活动数据汇总] 基于位置: {len(summary_data['activity_summary_detail']['loc'])} 条")
-    print(f"  [活动数据汇总] 基于市场: {len(summary_data['activity_summary_detail']['mkt'])} 条")
+    logger.info("  [活动数据汇总] 基于位置: %s 条", len(summary_data['activity_summary_detail']['loc']))
+    logger.info("  [活动数据汇总] 基于市场: %s 条", len(summary_data['activity_summary_detail']['mkt']))
 
     # 更新render_context中的summary_data
     render_context['summary_data'] = summary_data
 
+    return render_context
+
+def generate_report_from_xlsx(
+    xlsx_path=DEFAULT_DY_XLSX_NAME,
+    template_path="template.docx",
+    output_path="carbon_report.docx",
+    use_cache=True,
+    debug_snapshots=False,
+    timings=None,
+    profile_path=None
+):
+    """
+    使用 template.docx 作为模板，从 xlsx 文件动态读取数据生成报告
+    数字格式化在展示层通过 Jinja2 过滤器处理，数据层保持原始数字类型
+
+    Args:
+        xlsx_path: Excel 数据文件路径
+        template_path: Word 模板文件路径
+        output_path: 输出报告路径（默认: carbon_report.docx）
+        use_cache: 是否使用提取结果的磁盘缓存（xlsx 内容未变化时跳过数据提取；
+                   只修改了部分工作表时，只重新运行依赖这些工作表的读取器）
+        debug_snapshots: 是否在每个后处理步骤后保存中间文档快照（调试用）
+        timings: 可选的字典，用于回填各阶段耗时（秒）：
+                 extract（数据提取）、render（准备数据并渲染模板）、postprocess（后处理）、save（保存）
+        profile_path: 提供时剖析每个步骤、读取器和后处理的耗时与峰值内存，结果写入该 JSON 文件
+
+    渲染后的所有后处理步骤都在同一个内存中的 Document 上进行，最后统一保存一次。
+    """
+    if not profile_path:
+        return _generate_report_from_xlsx(xlsx_path, template_path, output_path,
+                                          use_cache, debug_snapshots, timings)
+
+    profiler = Profiler(trace_memory=True)
+    try:
+        with profiling(profiler):
+            return _generate_report_from_xlsx(xlsx_path, template_path, output_path,
+                                              use_cache, debug_snapshots, timings)
+    finally:
+        profiler.write_json(profile_path)
+        logger.info("[剖析] 剖析结果已写入: %s", profile_path)
+
+
+def _generate_report_from_xlsx(xlsx_path, template_path, output_path,
+                               use_cache, debug_snapshots, timings):
+    """generate_report_from_xlsx 的实际流程（参数含义相同）"""
+    logger.info("=" * 50)
+    logger.info("开始生成碳盘查报告（纯xlsx，动态读取）")
+    logger.info("=" * 50)
+
+    stage_start = time.perf_counter()
+
+    def mark_stage(name):
+        """记录从上一个阶段结束到现在的耗时"""
+        nonlocal stage_start
+        now = time.perf_counter()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + (now - stage_start)
+        stage_start = now
+
+    xlsx_path = resolve_inventory_xlsx_path(xlsx_path)
+
+    # 1. 使用 data_reader 的协议驱动方法（重构版）
+    extract_step = profile_step('step1_extract')
+    logger.info("\n[步骤1] 从 %s 动态提取数据...", xlsx_path)
+    cache = ContextCache() if use_cache else None
+    cache_key = cache.make_key(xlsx_path) if cache else None
+    context = cache.load(cache_key) if cache else None
+    if context is not None:
+        logger.info("[缓存] 命中提取结果缓存，跳过数据提取 (%s)", cache_key[:12])
+    else:
+        # 只读流式加载，降低内存占用；启用缓存时只重新提取内容发生变化的工作表相关的读取器
+        reader = ExcelDataReader(xlsx_path, read_only=True, cache=cache)
+        try:
+            context = reader.extract_context()
+        finally:
+            reader.close()  # 只读模式在 close() 之前一直持有工作簿文件句柄
+        if cache:
+            cache.store(cache_key, context)
+    # 量化方法说明来自 report_config，不进入缓存，每次都根据提取结果重新生成
+    ExcelDataReader.add_quantification_methods(context)
+    extract_step.rows = count_rows(context)
+    mark_stage('extract')
+
+    # 打印提取的关键数据
+    logger.info("\n提取的关键数据:")
+    logger.info("  公司名称: %s", context.get('company_name'))
+    logger.info("  范围一排放: %s", context.get('scope_1_emissions'))
+    logger.info("  范围二排放（基于位置）: %s", context.get('scope_2_location_based_emissions'))
+    logger.info("  范围二排放（基于市场）: %s", context.get('scope_2_market_based_emissions'))
+    logger.info("  范围三排放: %s", context.get('scope_3_emissions'))
+
+    # 调试量化方法
+    logger.debug("\n量化方法配置检查:")
+    if 'quantification_methods' in context:
+        scope1_methods = context['quantification_methods'].get('scope_1', {})
+        logger.debug("  范围一方法数量: %s", len(scope1_methods))
+
+        if 'gasoline_transport' in scope1_methods:
+            gasoline_ef = scope1_methods['gasoline_transport']['ef']
+            logger.debug("  汽油EF配置: %s", gasoline_ef)
+
+        if 'diesel_transport' in scope1_methods:
+            diesel_ef = scope1_methods['diesel_transport']['ef']
+            logger.debug("  柴油EF配置: %s", diesel_ef)
+    else:
+        logger.debug("  未找到quantification_methods")
+
+    logger.debug("\n范围三分类排放量:")
+    for i in range(1, 16):  # 范围三共15个类别
+        val = context.get(f'scope_3_category_{i}_emissions')
+        if val and val > 0:
+            logger.debug("  类别%s: %s", i, val)
+
+    # 2. 加载模板
+    profile_step('step2_load_template')
+    logger.info("\n[步骤2] 加载模板: %s", template_path)
+    template = load_template(template_path)
+
+    # 3. 准备渲染上下文（展示层格式化 + 清单汇总 + 排放源明细）
+    render_context = build_render_context(context)
+
     # 4. 渲染模板
-    print("[步骤4] 渲染模板...")
+    profile_step('step4_render')
+    logger.info("[步骤4] 渲染模板...")
     
-    # 注册自定义 Jinja2 过滤器
-    from jinja2 import Environment
-    from jinja2_filters import format_number, format_emission, register_filters_to_template
-
-    env = Environment()
-    env.filters['cn_num'] = to_chinese_num
-    env.filters['format_number'] = format_number
-    env.filters['format_emission'] = format_emission
-    template.jinja_env = env
-
-    print("[渲染] 已注册过滤器: cn_num, format_number, format_emission")
-
-    # 调试：检查scope3_category10数据
-    print(f"[调试] scope3_category10 数据检查:")
-    print(f"  - 是否存在: {'scope3_category10' in render_context}")
-    if 'scope3_category10' in render_context:
-        cat10_data = render_context['scope3_category10']
-        print(f"  - 数据类型: {type(cat10_data)}")
-        print(f"  - 数据长度: {len(cat10_data) if isinstance(cat10_data, list) else 'N/A'}")
-        if isinstance(cat10_data, list) and len(cat10_data) > 0:
-            print(f"  - 第一条数据: {cat10_data[0]}")
-
-    # 调试：检查scope_3_category_10_emissions_display
-    print(f"[调试] scope_3_category_10_emissions_display 检查:")
-    print(f"  - scope_3_category_10_emissions: {render_context.get('scope_3_category_10_emissions', 'NOT FOUND')}")
-    print(f"  - scope_3_category_10_emissions_display: '{render_context.get('scope_3_category_10_emissions_display', 'NOT FOUND')}'")
-    print(f"  - 条件判断结果: {bool(render_context.get('scope_3_category_10_emissions_display', ''))}")
-
-    template.render(render_context)
-
-    # 5. 保存报告
-    print(f"\n[步骤5] 保存报告到: {output_path}")
-    template.save(output_path)
+    # 共用的 Jinja2 环境（创建时已一次性注册 jinja2_filters 中的全部过滤器）
+    env = template.jinja_env
+    logger.info("[渲染] 已注册过滤器: cn_num, format_number, format_emission, format_percent, format_yes_no")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        # 调试：检查scope3_category10数据
+        logger.debug("[调试] scope3_category10 数据检查:")
+        logger.debug("  - 是否存在: %s", 'scope3_category10' in render_context)
+        if 'scope3_category10' in render_context:
+            cat10_data = render_context['scope3_category10']
+            logger.debug("  - 数据类型: %s", type(cat10_data))
+            logger.debug("  - 数据长度: %s", len(cat10_data) if isinstance(cat10_data, list) else 'N/A')
+            if isinstance(cat10_data, list) and len(cat10_data) > 0:
+                logger.debug("  - 第一条数据: %s", cat10_data[0])
+
+        # 调试：检查scope_3_category_10_emissions_display
+        logger.debug("[调试] scope_3_category_10_emissions_display 检查:")
+        logger.debug("  - scope_3_category_10_emissions: %s",
+                     render_context.get('scope_3_category_10_emissions', 'NOT FOUND'))
+        logger.debug("  - scope_3_category_10_emissions_display: '%s'",
+                     render_context.get('scope_3_category_10_emissions_display', 'NOT FOUND'))
+        logger.debug("  - 条件判断结果: %s",
+                     bool(render_context.get('scope_3_category_10_emissions_display', '')))
+
+    template.render(render_context, env)
+    mark_stage('render')
+
+    # 5. 后续步骤直接处理渲染结果（内存中的 Document），不再保存后重新加载
+    profile_step('step5_document')
+    logger.info("\n[步骤5] 获取渲染后的文档（内存处理，最后统一保存）")
+    doc = template.docx
+    if debug_snapshots:
+        _save_debug_snapshot(doc, output_path, 'step5')
+
+    # 建立文档索引（段落/表格文本只读取一次，后续步骤的增删改同步到索引）
+    index = DocumentIndex(doc)
 
     # 5.3. 检查类别12排放因子表是否被渲染
-    print(f"\n[步骤5.3] 检查类别12排放因子表...")
-    from docx import Document
-    doc_check = Document(output_path)
+    profile_step('step5.3_check_cat12')
+    logger.info("\n[步骤5.3] 检查类别12排放因子表...")
     cat12_ef_found = False
     cat11_ef_idx = None
 
     # 首先找到类别11的表格
-    for i, table in enumerate(doc_check.tables):
-        for row in table.rows[:3]:
-            for cell in row.cells:
-                if '类别11' in cell.text and '排放因子' in cell.text:
+    for i in range(len(index.tables)):
+        for row_idx in range(min(3, index.row_count(i))):
+            for cell_text in index.cell_texts(i, row_idx):
+                if '类别11' in cell_text and '排放因子' in cell_text:
                     cat11_ef_idx = i
-                    print(f"  找到类别11排放因子表: 表格{i}")
+                    logger.debug("  找到类别11排放因子表: 表格%s", i)
                     break
             if cat11_ef_idx is not None:
                 break
         if cat11_ef_idx is not None:
             break
 
-    # 检查类别11之后的表格
-    if cat11_ef_idx is not None:
-        print(f"  检查类别11之后的表格（表格{cat11_ef_idx+1}到{min(cat11_ef_idx+3, len(doc_check.tables))}）")
-        for i in range(cat11_ef_idx+1, min(cat11_ef_idx+3, len(doc_check.tables))):
-            table = doc_check.tables[i]
-            first_cell = table.rows[0].cells[0].text[:40] if table.rows[0].cells else ''
-            row_count = len(table.rows)
-            print(f"    表格{i}: {row_count}行, 首单元格=\"{first_cell}\"")
+    # 检查类别11之后的表格（只用于调试输出）
+    if cat11_ef_idx is not None and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("  检查类别11之后的表格（表格%s到%s）",
+                     cat11_ef_idx+1, min(cat11_ef_idx+3, len(index.tables)))
+        for i in range(cat11_ef_idx+1, min(cat11_ef_idx+3, len(index.tables))):
+            first_row = index.cell_texts(i, 0)
+            first_cell = first_row[0][:40] if first_row else ''
+            row_count = index.row_count(i)
+            logger.debug('    表格%s: %s行, 首单元格="%s"', i, row_count, first_cell)
 
     # 搜索类别12
-    for i, table in enumerate(doc_check.tables):
-        for row in table.rows[:3]:
-            for cell in row.cells:
-                if '类别12' in cell.text and '排放因子' in cell.text:
+    for i in range(len(index.tables)):
+        for row_idx in range(min(3, index.row_count(i))):
+            for cell_text in index.cell_texts(i, row_idx):
+                if '类别12' in cell_text and '排放因子' in cell_text:
                     cat12_ef_found = True
-                    print(f"  找到类别12排放因子表: 表格{i}")
+                    logger.debug("  找到类别12排放因子表: 表格%s", i)
                     break
             if cat12_ef_found:
                 break
         if cat12_ef_found:
             break
     if not cat12_ef_found:
-        print(f"  警告: 类别12排放因子表未被渲染!")
-        print(f"  文档中共有 {len(doc_check.tables)} 个表格")
+        logger.warning("  警告: 类别12排放因子表未被渲染!")
+        logger.info("  文档中共有 %s 个表格", len(index.tables))
 
     # 5.5. 检查模板渲染后的数据（调试用）
-    print(f"\n[步骤5.5] 检查模板渲染后的数据...")
-    check_template_rendering(output_path)
+    profile_step('step5.5_check_rendering')
+    logger.info("\n[步骤5.5] 检查模板渲染后的数据...")
+    check_template_rendering(doc, context)
 
     # 6. 统一公司简介和经营范围的段落格式
-    print(f"\n[步骤6] 统一段落格式...")
-    from docx import Document
+    profile_step('step6_paragraph_format')
+    logger.info("\n[步骤6] 统一段落格式...")
     from docx.shared import Pt, Inches, Cm
 
-    doc = Document(output_path)
     company_name = context.get('company_name', '')
 
     # 设置统一的首行缩进：4个空格 ≈ 2个中文字符 ≈ 0.4厘米
     first_line_indent = Cm(0.4)  # 约2个中文字符的宽度
 
     # 遍历所有段落，精确处理公司简介和经营范围
-    for para in doc.paragraphs:
-        text = para.text.strip()
+    for para in index.paragraphs:
+        text = index.paragraph_text(para).strip()
         if not text:
             continue
 
@@ -1261,46 +1313,51 @@ def generate_report_from_xlsx(
                 # 设置统一的首行缩进，左缩进为0
                 para.paragraph_format.first_line_indent = first_line_indent
                 para.paragraph_format.left_indent = 0
-                print(f"  已处理公司简介段落（长度: {len(text)} 字符）")
+                logger.info("  已处理公司简介段落（长度: %s 字符）", len(text))
 
         # 检查是否是经营范围段落（包含经营范围特征）
         elif '经营范围' in text and len(text) > 100:
             # 设置统一的首行缩进，左缩进为0
             para.paragraph_format.first_line_indent = first_line_indent
             para.paragraph_format.left_indent = 0
-            print(f"  已处理经营范围段落（长度: {len(text)} 字符）")
+            logger.info("  已处理经营范围段落（长度: %s 字符）", len(text))
 
     # 7. 设置表2的列宽相等
-    print(f"\n[步骤7] 设置表2列宽...")
+    profile_step('step7_table2_width')
+    logger.info("\n[步骤7] 设置表2列宽...")
     # 找到表2（范围二、三间接排放源表格）
-    if len(doc.tables) >= 2:
-        table2 = doc.tables[1]  # 第二个表格是表2
+    if len(index.tables) >= 2:
+        table2 = index.tables[1]  # 第二个表格是表2
         # 设置所有列宽相等（使用 Inches 单位）
         equal_width = Inches(2.0)  # 每列2英寸
         for row in table2.rows:
             for cell in row.cells:
                 # 设置单元格宽度
                 cell.width = equal_width
-        print("  表2列宽已设置为相等")
+        logger.info("  表2列宽已设置为相等")
 
-    doc.save(output_path)
-    print("段落格式统一完成")
+    if debug_snapshots:
+        _save_debug_snapshot(doc, output_path, 'step7')
+    logger.info("段落格式统一完成")
 
     # 8. 清理量化方法说明部分的过多空行
-    print(f"\n[步骤8] 清理量化方法说明部分的空行...")
-    clean_excessive_blank_lines(doc)
+    profile_step('step8_blank_lines')
+    logger.info("\n[步骤8] 清理量化方法说明部分的空行...")
+    clean_excessive_blank_lines(doc, index=index)
 
-    doc.save(output_path)
-    print("空行清理完成")
+    if debug_snapshots:
+        _save_debug_snapshot(doc, output_path, 'step8')
+    logger.info("空行清理完成")
 
     # 8.5. 调试：检查模板渲染后的类别10表格状态
-    print(f"\n[步骤8.5] 检查模板渲染后的类别10表格...")
+    profile_step('step8.5_cat10_table')
+    logger.info("\n[步骤8.5] 检查模板渲染后的类别10表格...")
     cat10_found = False
-    for i, table in enumerate(doc.tables):
-        for row in table.rows:
-            for cell in row.cells:
-                if '3.10.1' in cell.text or '3.10.2' in cell.text:
-                    print(f"  找到类别10数据在表格{i}!")
+    for i in range(len(index.tables)):
+        for row_idx in range(index.row_count(i)):
+            for cell_text in index.cell_texts(i, row_idx):
+                if '3.10.1' in cell_text or '3.10.2' in cell_text:
+                    logger.debug("  找到类别10数据在表格%s!", i)
                     cat10_found = True
                     break
             if cat10_found:
@@ -1308,27 +1365,24 @@ def generate_report_from_xlsx(
         if cat10_found:
             break
     if not cat10_found:
-        print("  警告：模板渲染后未找到类别10数据（3.10.1/3.10.2）")
+        logger.warning("  警告：模板渲染后未找到类别10数据（3.10.1/3.10.2）")
 
         # 变通方案：直接添加类别10库存表格到文档
         if 'scope3_category10' in context:
             cat10_items = context['scope3_category10']
-            print(f"  尝试直接添加类别10库存表格（{len(cat10_items)}条数据）...")
+            logger.info("  尝试直接添加类别10库存表格（%s条数据）...", len(cat10_items))
 
             # 查找类别10标题段落后插入表格
             inserted = False
-            for i, para in enumerate(doc.paragraphs):
-                if '10' in para.text and '销售产品加工' in para.text and '排放清册' in para.text:
+            for i, para in enumerate(index.paragraphs):
+                para_text = index.paragraph_text(para)
+                if '10' in para_text and '销售产品加工' in para_text and '排放清册' in para_text:
                     # 在此段落后插入新表格
                     from docx.oxml import OxmlElement
                     from docx.oxml.ns import qn
 
                     # 获取段落元素
-                    para_elem = para._element
-                    parent = para_elem.getparent()
-
-                    # 获取段落索引
-                    elem_idx = list(parent).index(para_elem)
+                    parent = para._element.getparent()
 
                     # 创建表格
                     table_xml = OxmlElement('{' + parent.nsmap['w'] + '}tbl')
@@ -1401,217 +1455,257 @@ def generate_report_from_xlsx(
                         table_xml.append(tr)
 
                     # 在段落后插入表格
-                    parent.insert(elem_idx + 1, table_xml)
+                    index.insert_table_after(para, table_xml)
                     inserted = True
-                    print(f"  成功在段落后添加类别10库存表格")
+                    logger.info("  成功在段落后添加类别10库存表格")
                     break
 
             if inserted:
-                # 重新加载文档以获取新表格
-                doc = Document(output_path)
-                print(f"  文档已重新加载，当前共有{len(doc.tables)}个表格")
+                # 表格直接插入内存中的文档，索引已包含新表格
+                logger.info("  当前共有%s个表格", len(index.tables))
             else:
-                print(f"  无法找到插入位置")
+                logger.info("  无法找到插入位置")
 
     # 9. 删除没有数据的类别表格（仅删除标题段落，保留表格结构）
-    print(f"\n[步骤9] 删除没有数据的类别表格...")
-    clean_empty_category_tables_v2(doc, context)
+    profile_step('step9_empty_categories')
+    logger.info("\n[步骤9] 删除没有数据的类别表格...")
+    clean_empty_category_tables_v2(doc, context, index=index)
 
-    doc.save(output_path)
-    print("空类别表格清理完成")
+    if debug_snapshots:
+        _save_debug_snapshot(doc, output_path, 'step9')
+    logger.info("空类别表格清理完成")
 
     # 9.4. 修复范围三类别标题缺失类别名称的问题
-    print(f"\n[步骤9.4] 修复范围三类别标题...")
-    fix_scope3_category_headers(doc)
+    profile_step('step9.4_scope3_headers')
+    logger.info("\n[步骤9.4] 修复范围三类别标题...")
+    fix_scope3_category_headers(doc, index=index)
 
-    doc.save(output_path)
-    print("范围三类别标题修复完成")
+    if debug_snapshots:
+        _save_debug_snapshot(doc, output_path, 'step9_4')
+    logger.info("范围三类别标题修复完成")
 
     # 9.5. 检查合并前的表格数据
-    print(f"\n[步骤9.5] 检查合并前的表格数据...")
-    check_table_before_merge(output_path)
+    profile_step('step9.5_check_merge')
+    logger.info("\n[步骤9.5] 检查合并前的表格数据...")
+    check_table_before_merge(doc)
 
     # 10. 使用 XML vMerge 方法合并表格中的纵向单元格（针对表1和表2）
-    print(f"\n[步骤10] 使用 XML vMerge 方法合并表格中的纵向单元格...")
+    profile_step('step10_merge_tables')
+    logger.info("\n[步骤10] 使用 XML vMerge 方法合并表格中的纵向单元格...")
 
     # 处理表1（doc.tables[0]）
-    if len(doc.tables) >= 1:
-        table1 = doc.tables[0]
-        print(f"  处理表1（表格索引0）...")
+    if len(index.tables) >= 1:
+        table1 = index.tables[0]
+        logger.debug("  处理表1（表格索引0）...")
         try:
             merge_vertical_cells(table1, 0)
         except Exception as e:
-            print(f"  处理表1时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("  处理表1时出错: %s", e, exc_info=True)
+        index.table_changed(table1)
 
     # 处理表2（doc.tables[1]）
-    if len(doc.tables) >= 2:
-        table2 = doc.tables[1]
-        print(f"  处理表2（表格索引1）...")
+    if len(index.tables) >= 2:
+        table2 = index.tables[1]
+        logger.debug("  处理表2（表格索引1）...")
         try:
             merge_vertical_cells(table2, 0)
         except Exception as e:
-            print(f"  处理表2时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("  处理表2时出错: %s", e, exc_info=True)
+        index.table_changed(table2)
 
-    doc.save(output_path)
-    print("表格纵向单元格合并完成（XML vMerge 方法）")
+    if debug_snapshots:
+        _save_debug_snapshot(doc, output_path, 'step10')
+    logger.info("表格纵向单元格合并完成（XML vMerge 方法）")
 
     # 10.5. 合并其他表格中的纵向单元格（XML方法）- 范围三类别表格
-    print(f"\n[步骤10.5] 合并范围三类别表格的纵向单元格（XML方法）...")
-    merge_other_tables_vertical_cells(doc, context)
+    profile_step('step10.5_merge_scope3')
+    logger.info("\n[步骤10.5] 合并范围三类别表格的纵向单元格（XML方法）...")
+    merge_other_tables_vertical_cells(doc, context, index=index)
+    logger.info("范围三类别表格纵向单元格合并完成（XML方法）")
 
-    doc.save(output_path)
-    print("范围三类别表格纵向单元格合并完成（XML方法）")
+    mark_stage('postprocess')
 
-    print("\n" + "=" * 50)
-    print(f"报告生成成功: {output_path}")
-    print("=" * 50)
+    # 11. 统一保存（唯一一次写文件）
+    profile_step('step11_save')
+    logger.info("\n[步骤11] 保存报告到: %s", output_path)
+    template.save(output_path)
+    mark_stage('save')
+
+    logger.info("\n" + "=" * 50)
+    logger.info("报告生成成功: %s", output_path)
+    logger.info("=" * 50)
 
     return output_path
 
 
-def check_template_rendering(doc_path):
+def profile_path_for(output_path):
+    """报告对应的剖析结果路径，如 carbon_report.profile.json"""
+    return os.path.splitext(output_path)[0] + '.profile.json'
+
+
+def _save_debug_snapshot(doc, output_path, step):
+    """保存中间步骤的文档快照（仅调试模式），如 carbon_report.step9.docx"""
+    base, ext = os.path.splitext(output_path)
+    snapshot_path = f"{base}.{step}{ext or '.docx'}"
+    doc.save(snapshot_path)
+    postprocess_logger.info("  [调试快照] 已保存: %s", snapshot_path)
+
+
+def check_template_rendering(doc, context=None):
     """
     检查模板渲染后的数据填充情况
+
+    Args:
+        doc: 渲染后的 Document 对象或文档路径
+        context: 已提取的数据上下文（提供时直接使用，不再重新读取 xlsx）
     """
+    # 只输出调试信息，DEBUG 级别未开启时直接跳过
+    if not postprocess_logger.isEnabledFor(logging.DEBUG):
+        return
+
     from docx import Document
 
     try:
-        doc = Document(doc_path)
+        if not hasattr(doc, 'tables'):
+            doc = Document(doc)
 
         # 检查表格0
         if len(doc.tables) > 0:
             table = doc.tables[0]
-            print(f"  表格0大小: {len(table.rows)} 行 x {len(table.columns)} 列")
+            postprocess_logger.debug("  表格0大小: %s 行 x %s 列", len(table.rows), len(table.columns))
 
             # 显示前5行的类别列数据
-            print(f"  表格0第一列前5行:")
+            postprocess_logger.debug("  表格0第一列前5行:")
             for row_idx in range(min(5, len(table.rows))):
                 cell_text = table.rows[row_idx].cells[0].text.strip()
-                print(f"    第{row_idx}行: '{cell_text}'")
+                postprocess_logger.debug("    第%s行: '%s'", row_idx, cell_text)
 
         # 检查 scope1 排放数据
-        print(f"  scope1_stationary_combustion_emissions_items 前3条数据:")
-        reader = ExcelDataReader('DY-GHG-2026-01 大冶特殊钢-温室气体盘查清册-Update 20260317Protocol-tr-0408.xlsx')
-        data = reader.get_all_context()
-        scope1_items = data.get('scope1_stationary_combustion_emissions_items', [])
+        postprocess_logger.debug("  scope1_stationary_combustion_emissions_items 前3条数据:")
+        if context is None:
+            reader = ExcelDataReader(DEFAULT_DY_XLSX_NAME)
+            try:
+                context = reader.get_all_context()
+            finally:
+                reader.close()
+        scope1_items = context.get('scope1_stationary_combustion_emissions_items', [])
         for i, item in enumerate(scope1_items[:3]):
-            print(f"    {i+1}. category='{item.get('category')}', emission_source='{item.get('emission_source')}'")
-        reader.close()
+            postprocess_logger.debug("    %s. category='%s', emission_source='%s'",
+                                     i+1, item.get('category'), item.get('emission_source'))
 
     except Exception as e:
-        print(f"  检查时出错: {e}")
+        postprocess_logger.warning("  检查时出错: %s", e)
 
 
-def check_table_before_merge(doc_path):
+def check_table_before_merge(doc):
     """
     检查合并前的表格数据
+
+    Args:
+        doc: Document 对象或文档路径
     """
+    # 只输出调试信息，DEBUG 级别未开启时直接跳过
+    if not postprocess_logger.isEnabledFor(logging.DEBUG):
+        return
+
     from docx import Document
 
     try:
-        doc = Document(doc_path)
+        if not hasattr(doc, 'tables'):
+            doc = Document(doc)
 
         if len(doc.tables) > 0:
             table = doc.tables[0]
-            print(f"  表格0大小: {len(table.rows)} 行 x {len(table.columns)} 列")
+            postprocess_logger.debug("  表格0大小: %s 行 x %s 列", len(table.rows), len(table.columns))
 
             # 检查前3行的数据
-            print(f"  前3行数据:")
+            postprocess_logger.debug("  前3行数据:")
             for row_idx in range(min(3, len(table.rows))):
                 col0_text = table.rows[row_idx].cells[0].text.strip()
                 col1_text = table.rows[row_idx].cells[1].text.strip()
-                print(f"    第{row_idx}行: 列0='{col0_text}', 列1='{col1_text}'")
+                postprocess_logger.debug("    第%s行: 列0='%s', 列1='%s'", row_idx, col0_text, col1_text)
 
     except Exception as e:
-        print(f"  检查时出错: {e}")
+        postprocess_logger.warning("  检查时出错: %s", e)
 
 
-def find_table_by_content(doc, search_keywords):
+def find_table_by_content(doc, search_keywords, index=None):
     """
     根据表格内容动态查找表格索引
 
     Args:
         doc: Word文档对象
         search_keywords: 要搜索的关键词列表（表格中包含任一关键词即匹配）
+        index: 文档索引（DocumentIndex，可选，提供时直接查询缓存的表格文本）
 
     Returns:
         匹配的表格索引，如果未找到返回None
     """
-    for idx, table in enumerate(doc.tables):
-        # 获取表格中所有文本
-        table_text = ""
-        try:
-            # 直接访问XML元素，避免python-docx的导航问题
-            for row in table._element.tr_lst:
-                for tc in row.tc_lst:
-                    # 获取单元格文本
-                    for p in tc.p_lst:
-                        for r in p.r_lst:
-                            for t in r.t_lst:
-                                table_text += t.text + " "
-        except Exception as e:
-            # 如果遍历出错（如合并单元格），跳过该表格
-            continue
-
-        # 检查是否包含任一关键词
-        for keyword in search_keywords:
-            if keyword in table_text:
-                return idx
-
-    return None
+    if index is None:
+        index = DocumentIndex(doc)
+    return index.find_table(search_keywords)
 
 
-def find_summary_table(doc):
+def find_summary_table(doc, index=None):
     """
     查找范围三排放汇总表格
 
+    Args:
+        doc: Word文档对象
+        index: 文档索引（DocumentIndex，可选）
+
     Returns:
         汇总表格的索引，如果未找到返回None
     """
-    for idx, table in enumerate(doc.tables):
+    if index is None:
+        index = DocumentIndex(doc)
+    for idx in range(len(index.tables)):
         # 汇总表格的特征：包含多个"范围三 类别X"和"排放量(tCO2e)"等
-        table_text = ""
-        for row in table.rows:
-            for cell in row.cells:
-                table_text += cell.text + " "
+        table_text = "".join(
+            text + " "
+            for row_idx in range(index.row_count(idx))
+            for text in index.cell_texts(idx, row_idx)
+        )
 
         # 检查是否是汇总表格（包含至少5个类别，且有"排放量"列）
         category_count = table_text.count("范围三 类别")
-        
-        # Skip debug output
-        
+
         if category_count >= 5 and "排放量" in table_text:
             return idx
 
     return None
 
 
-def clean_excessive_blank_lines(doc):
+def clean_excessive_blank_lines(doc, index=None):
     """
     清理量化方法说明部分过多的空行
     策略：确保排放源之间只有一行物理间距
+
+    Args:
+        doc: Word文档对象
+        index: 文档索引（DocumentIndex，可选，删除的段落会同步到索引）
     """
-    print("  正在清理量化方法说明部分的空行...")
+    postprocess_logger.debug("  正在清理量化方法说明部分的空行...")
+
+    if index is None:
+        index = DocumentIndex(doc)
+    paragraphs = index.paragraphs
 
     # 找到量化方法说明章节
     start_idx = None
-    for i, para in enumerate(doc.paragraphs):
-        if '量化方法说明' in para.text:
+    for i, para in enumerate(paragraphs):
+        if '量化方法说明' in index.paragraph_text(para):
             start_idx = i
             break
 
     if not start_idx:
-        print("  未找到量化方法说明章节")
+        postprocess_logger.info("  未找到量化方法说明章节")
         return
 
     # 找到该部分的结束位置
     end_idx = start_idx + 1
-    for i in range(start_idx + 1, len(doc.paragraphs)):
-        text = doc.paragraphs[i].text.strip()
+    for i in range(start_idx + 1, len(paragraphs)):
+        text = index.paragraph_text(paragraphs[i]).strip()
         # 找到下一个主要章节
         if text and ('四、' in text or '参考文献' in text or '附录' in text):
             end_idx = i
@@ -1620,34 +1714,25 @@ def clean_excessive_blank_lines(doc):
             end_idx = i
             break
 
-    print(f"  量化方法说明部分: {start_idx} 到 {end_idx}")
+    postprocess_logger.debug("  量化方法说明部分: %s 到 %s", start_idx, end_idx)
 
     # 在该部分内，删除连续的空段落，保留最多1个空行
     consecutive_empty = 0
-    indices_to_remove = []
+    paras_to_remove = []
 
-    for i in range(start_idx, end_idx):
-        if i >= len(doc.paragraphs):
-            break
-        text = doc.paragraphs[i].text.strip()
+    for i in range(start_idx, min(end_idx, len(paragraphs))):
+        text = index.paragraph_text(paragraphs[i]).strip()
         if not text:
             consecutive_empty += 1
             # 如果超过1个连续空行，标记删除
             if consecutive_empty > 1:
-                indices_to_remove.append(i)
+                paras_to_remove.append(paragraphs[i])
         else:
             consecutive_empty = 0
 
-    # 从后往前删除
-    removed_count = 0
-    for idx in sorted(indices_to_remove, reverse=True):
-        if idx < len(doc.paragraphs):
-            para = doc.paragraphs[idx]
-            parent = para._element.getparent()
-            parent.remove(para._element)
-            removed_count += 1
+    removed_count = index.remove_paragraphs(paras_to_remove)
 
-    print(f"  删除了 {removed_count} 个多余空行")
+    postprocess_logger.info("  删除了 %s 个多余空行", removed_count)
 
 
 
@@ -1702,10 +1787,10 @@ def clean_empty_category_tables(doc, context):
             empty_categories.append(i)
 
     if not empty_categories:
-        print("  所有类别都有数据，无需删除空类别表格")
+        postprocess_logger.info("  所有类别都有数据，无需删除空类别表格")
         return
 
-    print(f"  没有数据的类别: {empty_categories}")
+    postprocess_logger.info("  没有数据的类别: %s", empty_categories)
 
     deleted_count = 0
 
@@ -1770,9 +1855,9 @@ def clean_empty_category_tables(doc, context):
                 parent.remove(para_element)
                 deleted_count += 1
         except Exception as e:
-            print(f"  删除段落时出错: {e}")
+            postprocess_logger.warning("  删除段落时出错: %s", e)
 
-    print(f"  已删除 {deleted_count} 个空类别相关段落")
+    postprocess_logger.info("  已删除 %s 个空类别相关段落", deleted_count)
 
     # 步骤4：删除空类别相关的表格
     # 表格26-40对应范围三类别1-15的排放因子表，需要根据空类别列表删除相应表格
@@ -1830,10 +1915,10 @@ def clean_empty_category_tables(doc, context):
 
                 if not has_data:
                     tables_to_remove.append(table_idx)
-                    print(f"  标记删除类别{cat_num}的排放因子表: 索引{table_idx}")
+                    postprocess_logger.debug("  标记删除类别%s的排放因子表: 索引%s", cat_num, table_idx)
 
     # 同时检查所有范围三类别表格（表格26-40），删除只有表头的表格
-    print(f"  [后处理] 检查表格26-40（文档共有{len(doc.tables)}个表格）")
+    postprocess_logger.debug("  [后处理] 检查表格26-40（文档共有%s个表格）", len(doc.tables))
     for table_idx in range(26, min(41, len(doc.tables))):
         if table_idx in tables_to_remove:
             continue  # 已经标记删除
@@ -1844,12 +1929,12 @@ def clean_empty_category_tables(doc, context):
         # 调试：打印表格信息
         if row_count <= 6:
             first_cell = table.rows[0].cells[0].text[:30] if table.rows[0].cells else ''
-            print(f"  [后处理] 表格{table_idx}: {row_count}行, 首单元格=\"{first_cell}\"")
+            postprocess_logger.debug('  [后处理] 表格%s: %s行, 首单元格="%s"', table_idx, row_count, first_cell)
 
         # 首先检查表格行数，如果只有2行（表头+子表头），直接判定为空表格
         if row_count <= 2:
             tables_to_remove.append(table_idx)
-            print(f"  标记删除空表格: 索引{table_idx}（只有表头，行数={row_count}）")
+            postprocess_logger.debug("  标记删除空表格: 索引%s（只有表头，行数=%s）", table_idx, row_count)
             continue
 
         # 对于3-5行的表格，需要更仔细地检查是否有数据
@@ -1877,7 +1962,7 @@ def clean_empty_category_tables(doc, context):
 
             if not has_data:
                 tables_to_remove.append(table_idx)
-                print(f"  标记删除空表格: 索引{table_idx}（只有表头，行数={row_count}）")
+                postprocess_logger.debug("  标记删除空表格: 索引%s（只有表头，行数=%s）", table_idx, row_count)
 
     # 从后往前删除表格
     for table_idx in sorted(tables_to_remove, reverse=True):
@@ -1923,8 +2008,8 @@ def clean_empty_category_tables(doc, context):
             para_element.getparent().remove(para_element)
             deleted_count += 1
 
-    print(f"  彻底删除完成，共删除 {deleted_count} 个元素")
-    print(f"  包括标题段落、单位段落、表格和孤立单位段落")
+    postprocess_logger.info("  彻底删除完成，共删除 %s 个元素", deleted_count)
+    postprocess_logger.info("  包括标题段落、单位段落、表格和孤立单位段落")
 
     # 步骤6：删除孤立的"排放因子表"标题
     # 这些标题在删除表格后变成了孤立的
@@ -1956,9 +2041,9 @@ def clean_empty_category_tables(doc, context):
                     if parent is not None:
                         parent.remove(para_element)
                         orphan_headers_deleted += 1
-                        print(f"  删除孤立标题: 类别{cat_num}的排放因子表标题（无数据）")
+                        postprocess_logger.debug("  删除孤立标题: 类别%s的排放因子表标题（无数据）", cat_num)
                 except Exception as e:
-                    print(f"  删除孤立标题时出错: {e}")
+                    postprocess_logger.warning("  删除孤立标题时出错: %s", e)
             else:
                 # 检查这个标题后面是否有表格（如果有数据，应该有表格）
                 # 检查后面是否有表格元素，而不仅仅是文本内容
@@ -1993,15 +2078,15 @@ def clean_empty_category_tables(doc, context):
                         if parent is not None:
                             parent.remove(para_element)
                             orphan_headers_deleted += 1
-                            print(f"  删除孤立标题: 类别{cat_num}的排放因子表标题（未找到对应的表格）")
+                            postprocess_logger.debug("  删除孤立标题: 类别%s的排放因子表标题（未找到对应的表格）", cat_num)
                     except Exception as e:
-                        print(f"  删除孤立标题时出错: {e}")
+                        postprocess_logger.warning("  删除孤立标题时出错: %s", e)
 
     if orphan_headers_deleted > 0:
-        print(f"  已删除 {orphan_headers_deleted} 个孤立的排放因子表标题")
+        postprocess_logger.info("  已删除 %s 个孤立的排放因子表标题", orphan_headers_deleted)
 
 
-def fix_scope3_category_headers(doc):
+def fix_scope3_category_headers(doc, index=None):
     """
     修复第四章量化说明中范围三类别标题缺失类别名称的问题
 
@@ -2009,8 +2094,15 @@ def fix_scope3_category_headers(doc):
     - 将 "（一）" 替换为 "（一）购买的商品和服务"
     - 将 "（二）" 替换为 "（二）资本货物"
     - 其他类别的类似标题
+
+    Args:
+        doc: Word文档对象
+        index: 文档索引（DocumentIndex，可选，插入和修改的段落会同步到索引）
     """
-    print("  正在修复范围三类别标题...")
+    postprocess_logger.debug("  正在修复范围三类别标题...")
+
+    if index is None:
+        index = DocumentIndex(doc)
 
     # 类别编号到名称的映射（与模板中的顺序对应）
     category_names = {
@@ -2033,26 +2125,26 @@ def fix_scope3_category_headers(doc):
 
     # 找到"范围三：其他间接温室气体排放"的位置
     scope3_section_start = None
-    paragraphs_list = list(doc.paragraphs)
+    paragraphs_list = list(index.paragraphs)
 
     for i, para in enumerate(paragraphs_list):
-        text = para.text.strip()
+        text = index.paragraph_text(para).strip()
         if '范围三' in text and '其他间接温室气体排放' in text:
             scope3_section_start = i
             break
 
     if scope3_section_start is None:
-        print("    未找到范围三章节，跳过修复")
+        postprocess_logger.info("    未找到范围三章节，跳过修复")
         return
 
-    print(f"    找到范围三章节在段落 {scope3_section_start}")
+    postprocess_logger.debug("    找到范围三章节在段落 %s", scope3_section_start)
 
     # 新增：在范围三标题之前插入分组标题"（三）范围三其他类别相关排放"
     # 检查是否已经有这个分组标题
     has_group_header = False
     for i in range(max(0, scope3_section_start - 3), scope3_section_start):
         if i < len(paragraphs_list):
-            text = paragraphs_list[i].text.strip()
+            text = index.paragraph_text(paragraphs_list[i]).strip()
             if '（三）' in text and ('范围三' in text or '其他类别' in text):
                 has_group_header = True
                 break
@@ -2089,19 +2181,19 @@ def fix_scope3_category_headers(doc):
         new_para.append(r)
 
         # 在目标段落前插入新段落
-        target_para._element.addprevious(new_para)
-        print(f"    已在范围三章节前插入分组标题 '（三）范围三其他类别相关排放'")
+        index.insert_paragraph_before(target_para, new_para)
+        postprocess_logger.info("    已在范围三章节前插入分组标题 '（三）范围三其他类别相关排放'")
 
     # 在范围三章节内查找只有编号没有类别名称的标题
     fixed_count = 0
     for i in range(scope3_section_start + 1, len(paragraphs_list)):
-        text = paragraphs_list[i].text.strip()
+        text = index.paragraph_text(paragraphs_list[i]).strip()
 
         # 检查是否是纯编号标题（只有"（X）"而没有其他内容）
         if text in category_names:
             # 检查下一段落是否是"（1）量化模型"等，确认这确实是一个类别标题
             if i + 1 < len(paragraphs_list):
-                next_text = paragraphs_list[i + 1].text.strip()
+                next_text = index.paragraph_text(paragraphs_list[i + 1]).strip()
                 if next_text.startswith('（1') or next_text.startswith('（2'):
                     # 这是一个需要修复的类别标题
                     full_title = f"{text}{category_names[text]}"
@@ -2116,24 +2208,33 @@ def fix_scope3_category_headers(doc):
                         para.runs[0].text = full_title
                     else:
                         para.add_run(full_title)
+                    index.paragraph_changed(para)
 
                     fixed_count += 1
-                    print(f"    修复段落{i}: '{text}' -> '{full_title}'")
+                    postprocess_logger.debug("    修复段落%s: '%s' -> '%s'", i, text, full_title)
 
         # 如果到达下一个范围章节，停止处理
         if text and ('第四章' in text or '参考文献' in text or '附录' in text):
             break
 
-    print(f"    已修复 {fixed_count} 个范围三类别标题")
+    postprocess_logger.info("    已修复 %s 个范围三类别标题", fixed_count)
 
 
-def clean_empty_category_tables_v2(doc, context):
+def clean_empty_category_tables_v2(doc, context, index=None):
     """
     删除没有数据的类别的标题段落和单位段落，但保留表格结构
 
     新版本：不删除表格本身，避免表格索引偏移问题
     只删除与空类别相关的标题段落和单位段落
+
+    Args:
+        doc: Word文档对象
+        context: 数据上下文字典
+        index: 文档索引（DocumentIndex，可选，删除的段落和表格会同步到索引）
     """
+    if index is None:
+        index = DocumentIndex(doc)
+
     TOTAL_SCOPE3_CATEGORIES = 15
 
     category_names = {
@@ -2176,64 +2277,56 @@ def clean_empty_category_tables_v2(doc, context):
         if not has_ef_items:
             empty_ef_table_categories.append(i)
 
-    print(f"  空排放因子表类别: {empty_ef_table_categories}")  # 调试输出
+    postprocess_logger.debug("  空排放因子表类别: %s", empty_ef_table_categories)  # 调试输出
 
     if not empty_categories and not empty_ef_table_categories:
-        print("  所有类别都有数据，无需删除空类别标题")
+        postprocess_logger.info("  所有类别都有数据，无需删除空类别标题")
         return
 
-    print(f"  完全空类别（无任何数据）: {empty_categories}")
-    print(f"  排放因子表为空的类别: {[c for c in empty_ef_table_categories if c not in empty_categories]}")
+    postprocess_logger.info("  完全空类别（无任何数据）: %s", empty_categories)
+    postprocess_logger.info("  排放因子表为空的类别: %s",
+                            [c for c in empty_ef_table_categories if c not in empty_categories])
 
     # 收集要删除的段落
     all_paragraphs_to_remove = []
 
     # 步骤1：查找并删除完全空类别的标题段落（只删除真正空的类别，不删除只有EF表为空但有其他数据的类别）
-    for para in doc.paragraphs:
-        text = para.text.strip()
+    # 只使用 empty_categories，不使用 empty_ef_table_categories；所有空类别的标题关键词
+    # 编译为一个匹配器，每个段落只扫描一次
+    empty_category_keywords = KeywordMatcher(
+        keyword
+        for cat_num in empty_categories
+        for keyword in (
+            f'范围三 类别{cat_num}',
+            f'范围三类别{cat_num}',
+            f'类别{cat_num} ',  # 类别X后面有空格，避免匹配"类别10"到"类别1"
+            category_names.get(cat_num, ""),
+        )
+    )
+    for para in index.paragraphs:
+        text = index.paragraph_text(para).strip()
         if not text:
             continue
 
-        # 只检查完全空类别（不包含只有EF表为空的类别）
-        is_empty_category_para = False
-
-        for cat_num in empty_categories:  # 只使用 empty_categories，不使用 empty_ef_table_categories
-            category_name = category_names.get(cat_num, "")
-            is_target_category = (
-                f'范围三 类别{cat_num}' in text or
-                f'范围三类别{cat_num}' in text or
-                f'类别{cat_num} ' in text or  # 类别X后面有空格，避免匹配"类别10"到"类别1"
-                (category_name and category_name in text)
-            )
-
-            if is_target_category:
-                is_empty_category_para = True
-                break
-
-        if is_empty_category_para:
+        if empty_category_keywords.search(text):
             all_paragraphs_to_remove.append(para)
 
     # 步骤2：删除所有标记的段落
     deleted_count = 0
-    for para in all_paragraphs_to_remove:
-        try:
-            para_element = para._element
-            parent = para_element.getparent()
-            if parent is not None:
-                parent.remove(para_element)
-                deleted_count += 1
-        except Exception as e:
-            print(f"  删除段落时出错: {e}")
+    try:
+        deleted_count += index.remove_paragraphs(all_paragraphs_to_remove)
+    except Exception as e:
+        postprocess_logger.warning("  删除段落时出错: %s", e)
 
-    print(f"  已删除 {deleted_count} 个空类别相关段落")
+    postprocess_logger.info("  已删除 %s 个空类别相关段落", deleted_count)
 
     # 步骤2.5：删除孤立的单位描述段落（类别表格被删除后留下的单位描述）
     # 这些段落通常只包含"单位：吨CO2e"或类似内容
 
     # 删除孤立的单位列/段落
     orphan_unit_paras = []
-    for para in doc.paragraphs:
-        text = para.text.strip()
+    for para in index.paragraphs:
+        text = index.paragraph_text(para).strip()
         # 检查是否是单位描述段落
         if text in ['单位：吨CO2e', '单位: 吨CO2e', '单位：tCO2e', '单位: tCO2e', '单位：吨二氧化碳当量', '单位: 吨二氧化碳当量']:
             # 检查这个段落是否在已删除类别的位置附近
@@ -2244,18 +2337,13 @@ def clean_empty_category_tables_v2(doc, context):
             orphan_unit_paras.append(para)
 
     # 删除孤立的单位段落
-    for para in orphan_unit_paras:
-        try:
-            para_element = para._element
-            parent = para_element.getparent()
-            if parent is not None:
-                parent.remove(para_element)
-                deleted_count += 1
-        except Exception as e:
-            print(f"  删除单位段落时出错: {e}")
+    try:
+        deleted_count += index.remove_paragraphs(orphan_unit_paras)
+    except Exception as e:
+        postprocess_logger.warning("  删除单位段落时出错: %s", e)
 
     if orphan_unit_paras:
-        print(f"  已删除 {len(orphan_unit_paras)} 个孤立单位描述段落")
+        postprocess_logger.info("  已删除 %s 个孤立单位描述段落", len(orphan_unit_paras))
 
     # 步骤3：删除空类别相关的表格
     tables_to_remove = []
@@ -2265,69 +2353,16 @@ def clean_empty_category_tables_v2(doc, context):
                      'Geography', 'CO2', 'CH4', 'N2O', '单位', '引用源',
                      '排放因子', '缺省', '基于热值']
 
-    # 动态查找每个类别对应的表格（区分库存表和EF表）
+    # 每个类别对应的表格（区分库存表和EF表），由文档索引识别一次
     category_inventory_table_indices = {}  # 库存表：包含3.10.1这类详细数据
     category_ef_table_indices = {}  # EF表：包含排放因子数据
-    for cat_num in range(1, 16):
-        # 在所有表格中查找属于该类别的表格（从表格4开始，包含范围三类别汇总表）
-        for table_idx in range(4, min(50, len(doc.tables))):
-            if table_idx in category_inventory_table_indices.values() or table_idx in category_ef_table_indices.values():
-                continue  # 已经被其他类别占用
-
-            table = doc.tables[table_idx]
-            row_count = len(table.rows)
-
-            # 检查表格是否属于该类别
-            is_category_table = False
-            is_inventory_table = False  # 是否是库存表（包含3.10.1这类编号）
-            is_ef_table = False  # 是否是EF表（包含排放因子相关列）
-
-            for row_idx in range(min(6, row_count)):
-                row = table.rows[row_idx]
-                for cell in row.cells:
-                    text = cell.text.strip()
-                    if f'范围三 类别{cat_num}' in text or f'范围三类别{cat_num}' in text:
-                        is_category_table = True
-                    # 检查是否包含详细数据编号（如3.10.1）- 库存表判断
-                    if f'3.{cat_num}.' in text or f'3.{cat_num} ' in text:
-                        is_inventory_table = True
-                    # 检查是否是EF表（包含排放因子相关关键词）- 只有在不是库存表的情况下才判断
-                    if not is_inventory_table and any(keyword in text for keyword in ['排放因子', '缺省', '引用源', 'Activity name', 'Geography']):
-                        if f'类别{cat_num}' in text or f'范围{cat_num}' in text:
-                            is_ef_table = True
-                if is_category_table:
-                    break
-
-            if is_category_table:
-                # 根据表格内容判断类型 - 确保库存表优先级最高
-                if is_inventory_table:
-                    category_inventory_table_indices[cat_num] = table_idx
-                    print(f"  [DEBUG] 类别{cat_num} -> 库存表{table_idx}（行数={row_count}）")
-                elif is_ef_table:
-                    category_ef_table_indices[cat_num] = table_idx
-                    print(f"  [DEBUG] 类别{cat_num} -> EF表{table_idx}（行数={row_count}）")
-                else:
-                    # 如果无法确定类型，先检查是否有类似3.X.Y的编号模式，再决定类型
-                    has_detail_number_pattern = False
-                    for row_idx in range(min(6, row_count)):
-                        row = table.rows[row_idx]
-                        for cell in row.cells:
-                            text = cell.text.strip()
-                            if re.search(r'3\.\d+\.\d+', text):
-                                has_detail_number_pattern = True
-                                break
-                        if has_detail_number_pattern:
-                            break
-
-                    if has_detail_number_pattern:
-                        category_inventory_table_indices[cat_num] = table_idx
-                        print(f"  [DEBUG] 类别{cat_num} -> 库存表{table_idx}（行数={row_count}，模式匹配）")
-                    else:
-                        category_ef_table_indices[cat_num] = table_idx
-                        print(f"  [DEBUG] 类别{cat_num} -> EF表{table_idx}（默认，行数={row_count}）")
-                
-                # 注意：不要 break，继续寻找该类别的其他表格（一个类别可能有 EF 表和 库存表）
-                # continue
+    for cat_num, roles in index.category_tables().items():
+        if 'inventory' in roles:
+            category_inventory_table_indices[cat_num] = roles['inventory']
+            postprocess_logger.debug("  类别%s -> 库存表%s", cat_num, roles['inventory'])
+        if 'ef' in roles:
+            category_ef_table_indices[cat_num] = roles['ef']
+            postprocess_logger.debug("  类别%s -> EF表%s", cat_num, roles['ef'])
 
     # 检查哪些类别的表格需要删除
     # 1. 完全空类别（没有任何数据）- 删除所有相关表格
@@ -2335,15 +2370,15 @@ def clean_empty_category_tables_v2(doc, context):
         # 删除库存表
         if cat_num in category_inventory_table_indices:
             table_idx = category_inventory_table_indices[cat_num]
-            if table_idx < len(doc.tables):
+            if table_idx < len(index.tables):
                 tables_to_remove.append(table_idx)
-                print(f"  标记删除类别{cat_num}的库存表（完全空类别）: 索引{table_idx}")
+                postprocess_logger.debug("  标记删除类别%s的库存表（完全空类别）: 索引%s", cat_num, table_idx)
         # 删除EF表
         if cat_num in category_ef_table_indices:
             table_idx = category_ef_table_indices[cat_num]
-            if table_idx < len(doc.tables) and table_idx not in tables_to_remove:
+            if table_idx < len(index.tables) and table_idx not in tables_to_remove:
                 tables_to_remove.append(table_idx)
-                print(f"  标记删除类别{cat_num}的EF表（完全空类别）: 索引{table_idx}")
+                postprocess_logger.debug("  标记删除类别%s的EF表（完全空类别）: 索引%s", cat_num, table_idx)
 
     # 2. 只有EF表为空的类别（有详细数据或排放量）- 只删除EF表，保留库存表
     for cat_num in empty_ef_table_categories:
@@ -2351,19 +2386,18 @@ def clean_empty_category_tables_v2(doc, context):
             # 只删除EF表，不删除库存表
             if cat_num in category_ef_table_indices:
                 table_idx = category_ef_table_indices[cat_num]
-                if table_idx < len(doc.tables):
+                if table_idx < len(index.tables):
                     tables_to_remove.append(table_idx)
-                    print(f"  标记删除类别{cat_num}的EF表（EF表为空但有库存数据）: 索引{table_idx}")
+                    postprocess_logger.debug("  标记删除类别%s的EF表（EF表为空但有库存数据）: 索引%s", cat_num, table_idx)
 
     # 同时检查所有范围三类别表格，删除明显的空表格
     # 搜索从表格4开始的所有表格（第四章范围三表格从表格4开始）
     all_category_tables = set(category_inventory_table_indices.values()) | set(category_ef_table_indices.values())
-    for table_idx in range(4, len(doc.tables)):  # 搜索所有范围三表格
+    for table_idx in range(4, len(index.tables)):  # 搜索所有范围三表格
         if table_idx in tables_to_remove or table_idx in all_category_tables:
             continue  # 已经处理过
 
-        table = doc.tables[table_idx]
-        row_count = len(table.rows)
+        row_count = index.row_count(table_idx)
 
         # 对于3行或更少的表格，检查是否真的为空
         if row_count <= 3:
@@ -2371,9 +2405,9 @@ def clean_empty_category_tables_v2(doc, context):
             is_scope3_table = False
             table_contains_unit_only = False  # 新增：标记表格只包含单位行
 
-            for row in table.rows[:3]:
-                for cell in row.cells:
-                    text = cell.text.strip()
+            for row_idx in range(min(3, row_count)):
+                for cell_text in index.cell_texts(table_idx, row_idx):
+                    text = cell_text.strip()
                     if 'GHG排放类别' in text or '范围三' in text:
                         is_scope3_table = True
                     # 检查是否只包含"单位：吨CO2e"这类内容
@@ -2384,8 +2418,8 @@ def clean_empty_category_tables_v2(doc, context):
                 # 对于3行的表格，检查第3行是否有数据（编号>0或非空内容）
                 has_data = False
                 if row_count >= 3:
-                    for cell in table.rows[2].cells:
-                        text = cell.text.strip()
+                    for cell_text in index.cell_texts(table_idx, 2):
+                        text = cell_text.strip()
                         # 检查是否有数字编号
                         try:
                             if float(text) > 0:
@@ -2404,7 +2438,7 @@ def clean_empty_category_tables_v2(doc, context):
                 # 如果没有数据，或者表格只包含单位行，标记为删除
                 if not has_data or table_contains_unit_only:
                     tables_to_remove.append(table_idx)
-                    print(f"  标记删除明显空表格: 索引{table_idx}（范围三表格，只有表头/单位行，行数={row_count}）")
+                    postprocess_logger.debug("  标记删除明显空表格: 索引%s（范围三表格，只有表头/单位行，行数=%s）", table_idx, row_count)
             continue
 
         # 对于4-6行的表格，检查是否有数据行
@@ -2413,9 +2447,9 @@ def clean_empty_category_tables_v2(doc, context):
             # 跳过最后可能的"单位"行
             data_row_end = row_count - 1
             for row_idx in range(2, data_row_end):  # 从第2行开始检查到倒数第二行
-                row = table.rows[row_idx]
-                if len(row.cells) > 0:
-                    first_cell_text = row.cells[0].text.strip()
+                cell_texts = index.cell_texts(table_idx, row_idx)
+                if len(cell_texts) > 0:
+                    first_cell_text = cell_texts[0].strip()
                     # 跳过单位行
                     if first_cell_text in ['单位：吨CO2e', '单位: 吨CO2e', '单位：tCO2e', '单位: tCO2e', '单位', 'Unit']:
                         continue
@@ -2432,7 +2466,7 @@ def clean_empty_category_tables_v2(doc, context):
 
             if not has_data:
                 tables_to_remove.append(table_idx)
-                print(f"  标记删除空表格: 索引{table_idx}（无数据行，行数={row_count}）")
+                postprocess_logger.debug("  标记删除空表格: 索引%s（无数据行，行数=%s）", table_idx, row_count)
             continue
 
         # 对于7行以上的表格，检查是否只有表头和单位行（没有实际数据）
@@ -2440,11 +2474,11 @@ def clean_empty_category_tables_v2(doc, context):
             has_real_data = False
             # 从第2行开始检查，跳过可能的单位行
             for row_idx in range(2, row_count - 1):
-                if row_idx >= len(table.rows):
+                if row_idx >= row_count:
                     break
-                row = table.rows[row_idx]
-                if len(row.cells) > 0:
-                    first_cell_text = row.cells[0].text.strip()
+                cell_texts = index.cell_texts(table_idx, row_idx)
+                if len(cell_texts) > 0:
+                    first_cell_text = cell_texts[0].strip()
                     # 跳过单位行
                     if first_cell_text in ['单位：吨CO2e', '单位: 吨CO2e', '单位：tCO2e', '单位: tCO2e', '单位', 'Unit']:
                         continue
@@ -2461,86 +2495,52 @@ def clean_empty_category_tables_v2(doc, context):
 
             if not has_real_data:
                 tables_to_remove.append(table_idx)
-                print(f"  标记删除空表格: 索引{table_idx}（只有表头/单位行，行数={row_count}）")
+                postprocess_logger.debug("  标记删除空表格: 索引%s（只有表头/单位行，行数=%s）", table_idx, row_count)
+
+    # EF表标题段落：包含"排放因子表"/"EF表"字样且提及待删除类别的段落（文本不随删除变化，只收集一次）
+    deleted_categories = empty_categories + empty_ef_table_categories
+    ef_title_candidates = []
+    for para in index.paragraphs:
+        para_text = index.paragraph_text(para).strip()
+        if ('排放因子表' in para_text or 'EF表' in para_text) and para_text:
+            if any(f'类别{deleted_cat}' in para_text for deleted_cat in deleted_categories):
+                ef_title_candidates.append(para)
 
     # 从后往前删除表格
     deleted_table_count = 0
     deleted_title_count = 0
     for table_idx in sorted(tables_to_remove, reverse=True):
-        if table_idx < len(doc.tables):
-            # 先查找并删除表格前面的标题段落
-            # EF表标题通常在表格前的一个段落，包含"排放因子表"字样
-            table = doc.tables[table_idx]
-            table_element = table._element
+        if table_idx < len(index.tables):
+            table = index.tables[table_idx]
 
-            # 获取表格在文档中的位置
-            # 通过遍历所有表格元素来找到当前表格的索引
-            all_table_elements = [t._element for t in doc.tables]
-            current_position = all_table_elements.index(table_element)
-
-            # 查找表格前可能存在的标题段落
-            # 遍历所有段落，找到在表格之前的最后一个段落
-            para_before_table = None
-            for para in doc.paragraphs:
-                para_element = para._element
-                para_position = -1
-                try:
-                    # 获取段落位置
-                    body = table_element.getparent().getparent()
-                    if hasattr(body, 'index'):
-                        para_position = body.index(para_element)
-                except:
-                    pass
-
-                # 简单方法：通过检查段落内容是否匹配EF表标题模式
-                para_text = para.text.strip()
-                if ('排放因子表' in para_text or 'EF表' in para_text) and para_text:
-                    # 检查是否是要删除类别的标题
-                    for deleted_cat in empty_categories + empty_ef_table_categories:
-                        if f'类别{deleted_cat}' in para_text or f'类别{deleted_cat}排放因子表' in para_text:
-                            # 检查这个段落是否在表格附近（通过检查它后面的元素是否是表格）
-                            # 获取段落的下一个兄弟元素
-                            next_sibling = para_element.getnext()
-                            if next_sibling is not None:
-                                # 检查下一个元素是否是当前表格或指向当前表格
-                                try:
-                                    next_table = next_sibling
-                                    # 检查是否是表格元素
-                                    if next_table.tag.endswith('}tbl'):
-                                        # 找到了标题段落
-                                        para_before_table = para
-                                        break
-                                except:
-                                    pass
-                    if para_before_table:
-                        break
+            # 查找表格前可能存在的标题段落：
+            # 文档中第一个紧跟着表格元素的候选标题段落
+            para_before_table = next(
+                (para for para in ef_title_candidates if index.table_after(para) is not None), None)
 
             # 删除标题段落
             if para_before_table:
+                ef_title_candidates.remove(para_before_table)
                 try:
-                    para_element = para_before_table._element
-                    parent = para_element.getparent()
-                    if parent is not None:
-                        parent.remove(para_element)
+                    if index.remove_paragraphs([para_before_table]):
                         deleted_title_count += 1
-                        print(f"  删除表格{table_idx}前的EF表标题段落")
+                        postprocess_logger.debug("  删除表格%s前的EF表标题段落", table_idx)
                 except Exception as e:
-                    print(f"  删除标题段落时出错: {e}")
+                    postprocess_logger.warning("  删除标题段落时出错: %s", e)
 
             # 删除表格
-            table_element = table._element
-            table_element.getparent().remove(table_element)
+            index.remove_table(table)
             deleted_table_count += 1
 
-    print(f"  已删除 {deleted_table_count} 个空类别表格和 {deleted_title_count} 个EF表标题段落")
+    postprocess_logger.info("  已删除 %s 个空类别表格和 %s 个EF表标题段落", deleted_table_count, deleted_title_count)
 
 
 def merge_vertical_cells(table, col_idx):
     """
     纵向合并表格指定列中内容相同的相邻单元格
 
-    使用底层 XML 操作，正确设置 vMerge 属性来实现合并。
-    直接访问 XML 元素，避免 python-docx 的导航问题。
+    使用 table_merge.merge_table_columns 直接操作 XML，正确设置 vMerge 属性来实现合并。
+    表头行（第0行）不参与合并。
 
     Args:
         table: python-docx 表格对象
@@ -2549,260 +2549,23 @@ def merge_vertical_cells(table, col_idx):
     Returns:
         合并的单元格数量
     """
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT
-    from docx.oxml.ns import qn
-    from docx.oxml import OxmlElement
-
-    if col_idx >= len(table.columns):
-        print(f"  警告：列索引 {col_idx} 超出表格范围（表格共 {len(table.columns)} 列）")
+    column_count = len(table.columns)
+    if col_idx >= column_count:
+        postprocess_logger.warning("  警告：列索引 %s 超出表格范围（表格共 %s 列）", col_idx, column_count)
         return 0
 
-    merged_count = 0
-    rows_count = len(table.rows)
-
-    # 跳过表头行，从第1行开始处理（索引1）
-    start_row = 1
-
-    # 第一步：直接从 XML 读取所有行的文本内容
-    print(f"  开始识别合并组（总行数：{rows_count}，从行{start_row}开始）...")
-
-    # 获取表格的 XML 元素
-    table_element = table._element
-    tr_lst = table_element.tr_lst
-
-    # 存储每行的文本内容
-    row_texts = []
-
-    for row_idx in range(len(tr_lst)):
-        if row_idx < start_row:
-            # 跳过表头行
-            row_texts.append("")
-            continue
-
-        try:
-            tr = tr_lst[row_idx]
-            tc_lst = tr.tc_lst
-
-            if col_idx >= len(tc_lst):
-                print(f"  警告：行{row_idx}的列索引{col_idx}超出范围")
-                row_texts.append("")
-                continue
-
-            tc = tc_lst[col_idx]
-
-            # 获取单元格文本
-            cell_text = ""
-            for p in tc.p_lst:
-                for r in r_lst if (r_lst := p.r_lst) else []:
-                    for t in t_lst if (t_lst := r.t_lst) else []:
-                        cell_text += t.text
-
-            cell_text = cell_text.strip()
-            row_texts.append(cell_text)
-        except Exception as e:
-            print(f"  警告：读取行{row_idx}时出错: {e}")
-            row_texts.append("")
-
-    # 第二步：识别需要合并的单元格组
-    merge_groups = []
-    group_start = start_row
-    current_value = None
-
-    for row_idx in range(start_row, rows_count):
-        cell_text = row_texts[row_idx] if row_idx < len(row_texts) else ""
-
-        # 初始化当前值（第一行）
-        if current_value is None:
-            current_value = cell_text
-            group_start = row_idx
-            text_preview = cell_text[:40] if cell_text else ""
-            print(f"  行{row_idx}: 初始化，内容=\"{text_preview}\"")
-            continue
-
-        # 如果当前单元格内容与前一单元格相同，继续累积
-        if cell_text == current_value and cell_text != "":
-            continue
-
-        # 内容不同或遇到空值，记录之前的合并组
-        if row_idx - 1 > group_start:
-            merge_groups.append((group_start, row_idx - 1))
-            value_preview = current_value[:40] if current_value else ""
-            print(f"  识别合并组: 行{group_start}-{row_idx-1} (共{row_idx-1-group_start}行), 内容=\"{value_preview}\"")
-
-        # 开始新的合并组
-        current_value = cell_text
-        group_start = row_idx
-        if cell_text:
-            text_preview = cell_text[:40] if cell_text else ""
-            print(f"  行{row_idx}: 新组开始，内容=\"{text_preview}\"")
-
-    # 处理最后一组
-    if rows_count - 1 > group_start:
-        merge_groups.append((group_start, rows_count - 1))
-        value_preview = current_value[:40] if current_value else ""
-        print(f"  识别合并组: 行{group_start}-{rows_count-1} (共{rows_count-1-group_start}行), 内容=\"{value_preview}\"")
-
-    print(f"  总共识别到 {len(merge_groups)} 个合并组")
-
-    # 第三步：执行合并操作（直接操作 XML）
-    print(f"  开始执行合并操作，共 {len(merge_groups)} 个合并组...")
-
-    for group_start, group_end in merge_groups:
-        if group_end <= group_start:
-            print(f"  跳过无效合并组: 行{group_start}-{group_end}")
-            continue
-
-        print(f"  处理合并组: 行{group_start}-{group_end} (共{group_end-group_start}行)")
-
-        try:
-            # 获取顶部单元格的 XML 元素
-            tr_start = tr_lst[group_start]
-            tc_lst_start = tr_start.tc_lst
-
-            if col_idx >= len(tc_lst_start):
-                print(f"    警告：列索引{col_idx}超出范围")
-                continue
-
-            tc_start = tc_lst_start[col_idx]
-
-            # 保存顶部单元格的文本内容
-            merged_text = row_texts[group_start] if group_start < len(row_texts) else ""
-            text_preview = merged_text[:40] if merged_text else ""
-            print(f"    顶部单元格（行{group_start}）内容: \"{text_preview}\"")
-
-            # 设置顶部单元格的 vMerge 属性为 "restart"
-            tc_pr = tc_start.get_or_add_tcPr()
-            for old_vmerge in tc_pr.findall(qn('w:vMerge')):
-                tc_pr.remove(old_vmerge)
-            v_merge = OxmlElement('w:vMerge')
-            v_merge.set(qn('w:val'), 'restart')
-            tc_pr.append(v_merge)
-
-            # 验证vMerge属性是否设置成功
-            verify_vm = tc_pr.find(qn('w:vMerge'))
-            verify_val = verify_vm.get(qn('w:val')) if verify_vm is not None else 'not found'
-            print(f"    设置行{group_start} vMerge=\"restart\" (验证: {verify_val})")
-
-            # 处理其他单元格（设置为 "continue"）
-            for row_idx in range(group_start + 1, group_end + 1):
-                if row_idx >= len(tr_lst):
-                    break
-
-                try:
-                    tr = tr_lst[row_idx]
-                    tc_lst = tr.tc_lst
-
-                    if col_idx >= len(tc_lst):
-                        continue
-
-                    tc = tc_lst[col_idx]
-
-                    # 清空被合并单元格的内容
-                    for p in tc.p_lst:
-                        # 移除所有 run 元素
-                        for r in p.r_lst[:]:
-                            p.remove(r)
-
-                    # 设置 vMerge 属性为 "continue"
-                    merge_tc_pr = tc.get_or_add_tcPr()
-                    for old_vmerge in merge_tc_pr.findall(qn('w:vMerge')):
-                        merge_tc_pr.remove(old_vmerge)
-                    continue_vmerge = OxmlElement('w:vMerge')
-                    continue_vmerge.set(qn('w:val'), 'continue')
-                    merge_tc_pr.append(continue_vmerge)
-
-                    merged_count += 1
-                except Exception as e:
-                    print(f"    警告：处理行{row_idx}时出错: {e}")
-
-            print(f"    设置行{group_start+1}-{group_end} vMerge=\"continue\" (共{group_end-group_start}行)")
-
-            # 设置顶部单元格的内容
-            # 清空现有内容
-            for p in tc_start.p_lst[:]:
-                # 移除所有段落（除了保留一个）
-                if len(tc_start.p_lst) > 1:
-                    tc_start.remove(p)
-
-            # 确保至少有一个段落
-            if len(tc_start.p_lst) == 0:
-                from docx.oxml import parse_xml
-                new_p = parse_xml(r'<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-                tc_start.append(new_p)
-
-            # 设置内容到第一个段落
-            p = tc_start.p_lst[0]
-            if merged_text:
-                # 清空现有 run
-                for r in p.r_lst[:]:
-                    p.remove(r)
-
-                # 添加新的 run 和 text
-                from docx.oxml import parse_xml
-                new_r = parse_xml(r'<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:t xml:space="preserve"></w:t></w:r>')
-                t_element = new_r.find(qn('w:t'))
-                if t_element is not None:
-                    t_element.text = merged_text
-                p.append(new_r)
-
-                content_preview = merged_text[:40] if merged_text else ""
-                print(f"    设置行{group_start}内容: \"{content_preview}\"")
-
-                # 验证内容是否设置成功
-                verify_text = ""
-                for r in p.r_lst:
-                    for t in t_lst if (t_lst := r.t_lst) else []:
-                        verify_text += t.text
-                verify_preview = verify_text[:40] if verify_text else ""
-                print(f"    验证行{group_start}内容: \"{verify_preview}\"")
-            else:
-                print(f"    [警告] merged_text 为空，跳过内容设置")
-
-            # 设置合并后单元格的对齐方式
-            try:
-                # 验证vMerge属性在设置对齐方式之前是否仍然存在
-                tc_pr_check = tc_start.get_or_add_tcPr()
-                vmerge_check = tc_pr_check.find(qn('w:vMerge'))
-                vmerge_val_check = vmerge_check.get(qn('w:val')) if vmerge_check is not None else 'None'
-                print(f"    设置对齐方式前vMerge验证: vMerge=\"{vmerge_val_check}\"")
-
-                # 垂直居中对齐
-                tc_pr = tc_start.get_or_add_tcPr()
-                v_align = tc_pr.find(qn('w:vAlign'))
-                if v_align is None:
-                    v_align = OxmlElement('w:vAlign')
-                    v_align.set(qn('w:val'), 'center')
-                    tc_pr.append(v_align)
-
-                # 段落居中对齐
-                jc = OxmlElement('w:jc')
-                jc.set(qn('w:val'), 'center')
-                p_pr = p.get_or_add_pPr()
-                p_pr.append(jc)
-
-                # 验证vMerge属性在设置对齐方式后是否仍然存在
-                vmerge_check2 = tc_pr.find(qn('w:vMerge'))
-                vmerge_val_check2 = vmerge_check2.get(qn('w:val')) if vmerge_check2 is not None else 'None'
-                print(f"    设置对齐方式后vMerge验证: vMerge=\"{vmerge_val_check2}\"")
-            except Exception as e:
-                print(f"    设置单元格对齐方式时出错: {e}")
-
-        except Exception as e:
-            print(f"    处理合并组时出错: {e}")
-            import traceback
-            traceback.print_exc()
-
-    print(f"  第 {col_idx} 列纵向合并完成，合并了 {merged_count} 个单元格")
-    return merged_count
+    stats = merge_table_columns(table._element, [col_idx])
+    postprocess_logger.debug("  第 %s 列纵向合并完成：%s 行，%s 个合并组，合并了 %s 个单元格",
+                             col_idx, stats.rows, stats.groups, stats.merged_cells)
+    return stats.merged_cells
 
 
 def merge_table_cells(table, col_idx):
     """
     纵向合并相同内容的单元格并居中（使用 XML vMerge 方法）
 
-    使用 XML vMerge 属性进行单元格合并，这种方法更可靠。
-    在合并前先清除所有现有的 vMerge 属性，避免干扰。
+    在合并前先清除该列所有现有的 vMerge 属性，避免干扰；
+    合并后该列所有单元格都设置为居中。
 
     Args:
         table: python-docx 表格对象
@@ -2811,160 +2574,16 @@ def merge_table_cells(table, col_idx):
     Returns:
         合并的单元格数量
     """
-    from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.oxml.ns import qn
-    from docx.oxml import OxmlElement
-
-    rows = table.rows
-    if len(rows) < 2:
+    # 第0行是表头，至少需要两行数据才可能合并
+    if len(table.rows) < 3:
         return 0
 
-    merged_count = 0
-
-    # 跳过表头行，从第1行开始（索引1）
-    # 假设第0行是表头，不需要合并
-    if len(rows) < 3:
-        return 0
-
-    # 第一步：清除所有现有的 vMerge 属性
-    for row in rows:
-        if col_idx < len(row.cells):
-            cell = row.cells[col_idx]
-            tc_pr = cell._element.get_or_add_tcPr()
-            # 移除所有 vMerge 属性
-            for old_vmerge in tc_pr.findall(qn('w:vMerge')):
-                tc_pr.remove(old_vmerge)
-
-    # 第二步：收集所有单元格的文本内容
-    cell_texts = []
-    for row in rows[1:]:  # 跳过表头
-        if col_idx < len(row.cells):
-            cell = row.cells[col_idx]
-            text = cell.text.strip()
-            cell_texts.append(text)
-
-    # 第三步：使用组检测逻辑，识别需要合并的单元格组
-    merge_groups = []
-    start_idx = 0
-    current_text = cell_texts[0] if cell_texts else ""
-
-    for i in range(1, len(cell_texts)):
-        if cell_texts[i] == current_text and current_text != "":
-            # 继续累积，等待发现不同的内容
-            continue
-        else:
-            # 内容不同或遇到空值，记录之前的组
-            if i - 1 > start_idx:
-                merge_groups.append((start_idx, i - 1))
-            # 开始新的组
-            current_text = cell_texts[i]
-            start_idx = i
-
-    # 处理最后一组
-    if len(cell_texts) - 1 > start_idx:
-        merge_groups.append((start_idx, len(cell_texts) - 1))
-
-    # 调试输出
-    print(f"  识别到 {len(merge_groups)} 个合并组:")
-    for i, (group_start, group_end) in enumerate(merge_groups):
-        print(f"    组{i+1}: 行 {group_start+1}-{group_end+1} (共 {group_end-group_start+1} 行), 内容=\"{cell_texts[group_start][:30]}\"")
-
-    # 第四步：使用 XML vMerge 属性进行合并
-    for group_start, group_end in merge_groups:
-        if group_end > group_start:
-            try:
-                # 获取起始单元格（在数据行中的索引，需要加1因为跳过了表头）
-                start_row_idx = group_start + 1
-                start_cell = rows[start_row_idx].cells[col_idx]
-                start_cell_element = start_cell._element
-
-                # 保存起始单元格的文本内容
-                merged_text = cell_texts[group_start]
-
-                print(f"  合并组: 行{group_start+1}-{group_end+1} (共{group_end-group_start+1}行), 内容前30字符=\"{merged_text[:30]}\"")
-
-                # 先设置 vMerge 属性（在清空内容之前）
-                # 设置起始单元格的 vMerge 属性为 "restart"
-                tc_pr = start_cell_element.get_or_add_tcPr()
-                v_merge = OxmlElement('w:vMerge')
-                v_merge.set(qn('w:val'), 'restart')
-                tc_pr.append(v_merge)
-
-                # 设置其他单元格的 vMerge 属性为 "continue"
-                for row_offset in range(1, group_end - group_start + 1):
-                    curr_row_idx = start_row_idx + row_offset
-                    curr_cell = rows[curr_row_idx].cells[col_idx]
-                    curr_cell_element = curr_cell._element
-
-                    merge_tc_pr = curr_cell_element.get_or_add_tcPr()
-                    continue_vmerge = OxmlElement('w:vMerge')
-                    continue_vmerge.set(qn('w:val'), 'continue')
-                    merge_tc_pr.append(continue_vmerge)
-
-                    merged_count += 1
-
-                # 然后清空并设置内容（在设置 vMerge 之后）
-                # 清空所有要合并的单元格的内容（除了第一个）
-                for row_offset in range(1, group_end - group_start + 1):
-                    curr_row_idx = start_row_idx + row_offset
-                    curr_cell = rows[curr_row_idx].cells[col_idx]
-                    for paragraph in curr_cell.paragraphs:
-                        paragraph.text = ""
-
-                # 在起始单元格中设置内容（不清空，只确保有内容）
-                if merged_text:
-                    # 检查起始单元格是否已有内容
-                    current_text = start_cell.text.strip()
-                    if not current_text or current_text != merged_text:
-                        # 清空并重新设置
-                        for paragraph in start_cell.paragraphs:
-                            paragraph.text = ""
-                        # 确保至少有一个段落
-                        if not start_cell.paragraphs:
-                            start_cell.add_paragraph()
-                        start_cell.paragraphs[0].text = merged_text
-
-                print(f"    完成: vMerge=\"restart\" 设置于行{start_row_idx}")
-            except Exception as e:
-                print(f"  合并单元格组时出错（行 {group_start+1}-{group_end+1}）: {e}")
-                import traceback
-                traceback.print_exc()
-
-    # 第五步：设置所有单元格的对齐方式（居中）
-    for row in table.rows:
-        if col_idx < len(row.cells):
-            cell = row.cells[col_idx]
-            try:
-                # 垂直居中对齐
-                cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                # 段落居中对齐
-                for paragraph in cell.paragraphs:
-                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            except Exception as e:
-                print(f"  设置单元格对齐方式时出错: {e}")
-
-    print(f"  第 {col_idx} 列物理合并完成，合并了 {merged_count} 个单元格")
-    return merged_count
+    stats = merge_table_columns(table._element, [col_idx], reset_existing=True, align_all=True)
+    postprocess_logger.debug("  第 %s 列物理合并完成：%s 个合并组，合并了 %s 个单元格", col_idx, stats.groups, stats.merged_cells)
+    return stats.merged_cells
 
-    # 设置所有单元格的对齐方式（居中）
-    for row in table.rows:
-        if col_idx < len(row.cells):
-            cell = row.cells[col_idx]
-            try:
-                # 垂直居中对齐
-                cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                # 段落居中对齐
-                for paragraph in cell.paragraphs:
-                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            except Exception as e:
-                print(f"  设置单元格对齐方式时出错: {e}")
-
-    print(f"  第 {col_idx} 列物理合并完成，合并了 {merged_count} 个单元格")
-    return merged_count
 
-
-def merge_other_tables_vertical_cells(doc, context):
+def merge_other_tables_vertical_cells(doc, context, index=None):
     """
     处理范围三类别表格的纵向单元格合并（XML方法）
 
@@ -2973,25 +2592,10 @@ def merge_other_tables_vertical_cells(doc, context):
     Args:
         doc: Word文档对象
         context: 数据上下文字典（用于判断哪些表格有数据）
+        index: 文档索引（DocumentIndex，可选）
     """
-    # 范围三类别名称映射
-    category_names = {
-        1: "购买的商品和服务",
-        2: "资本商品",
-        3: "燃料和能源相关活动",
-        4: "上游运输和配送",
-        5: "运营中产生的废弃物",
-        6: "员工商务旅行",
-        7: "员工通勤",
-        8: "上游租赁资产",
-        9: "下游运输和配送",
-        10: "销售产品的加工",
-        11: "销售产品的使用",
-        12: "寿命终结处理",
-        13: "下游租赁资产",
-        14: "特许经营",
-        15: "投资"
-    }
+    if index is None:
+        index = DocumentIndex(doc)
 
     total_merged = 0
 
@@ -3005,34 +2609,35 @@ def merge_other_tables_vertical_cells(doc, context):
 
         # 只处理有数据的类别
         if (detail_items and len(detail_items) > 0) or (emission_value and emission_value > 0):
-            category_name = category_names.get(cat_num, "")
+            category_name = SCOPE3_CATEGORY_NAMES.get(cat_num, "")
 
-            # 查找对应的表格
-            table_idx = find_table_by_content(doc, [category_name, f'类别{cat_num}'])
+            # 对应的表格：首个提及类别名称或"类别N"的表格（由文档索引按表格缓存）
+            table_idx = index.category_tables()[cat_num].get('mentioned')
 
             # 跳过表1和表2（索引0和1）以及已处理的表格
-            if table_idx is not None and table_idx < len(doc.tables) and table_idx not in processed_tables:
+            if table_idx is not None and table_idx < len(index.tables) and table_idx not in processed_tables:
                 # 跳过表1和表2
                 if table_idx < 2:
-                    print(f"  跳过范围三类别{cat_num}表格（{category_name}，表格索引：{table_idx}），这是主表格")
+                    postprocess_logger.debug("  跳过范围三类别%s表格（%s，表格索引：%s），这是主表格",
+                                             cat_num, category_name, table_idx)
                     continue
 
-                table = doc.tables[table_idx]
-                print(f"  找到范围三类别{cat_num}表格（{category_name}，表格索引：{table_idx}）")
+                table = index.tables[table_idx]
+                postprocess_logger.debug("  找到范围三类别%s表格（%s，表格索引：%s）", cat_num, category_name, table_idx)
                 processed_tables.add(table_idx)
 
                 try:
                     merged = merge_vertical_cells(table, 0)
                     total_merged += merged
                 except Exception as e:
-                    print(f"  处理范围三类别{cat_num}表格时出错: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    postprocess_logger.warning("  处理范围三类别%s表格时出错: %s", cat_num, e, exc_info=True)
+                # 合并会改写单元格文本，丢弃该表格的缓存
+                index.table_changed(table)
 
-    print(f"  范围三类别表格合并总计：合并了 {total_merged} 个单元格")
+    postprocess_logger.info("  范围三类别表格合并总计：合并了 %s 个单元格", total_merged)
 
 
-def merge_table_vertical_cells(doc, context):
+def merge_table_vertical_cells(doc, context, index=None):
     """
     处理文档中表格的纵向单元格合并
 
@@ -3042,7 +2647,11 @@ def merge_table_vertical_cells(doc, context):
     Args:
         doc: Word文档对象
         context: 数据上下文字典（用于判断哪些表格有数据）
+        index: 文档索引（DocumentIndex，可选）
     """
+    if index is None:
+        index = DocumentIndex(doc)
+
     # 定义要处理的表格标识关键词
     table_keywords = [
         # 表1：范围一直接排放源表格
@@ -3055,22 +2664,21 @@ def merge_table_vertical_cells(doc, context):
 
     for table_info in table_keywords:
         # 根据关键词查找表格
-        table_idx = find_table_by_content(doc, table_info['keywords'])
+        table_idx = find_table_by_content(doc, table_info['keywords'], index=index)
 
-        if table_idx is not None and table_idx < len(doc.tables):
-            table = doc.tables[table_idx]
-            print(f"  找到{table_info['name']}（表格索引：{table_idx}）")
+        if table_idx is not None and table_idx < len(index.tables):
+            table = index.tables[table_idx]
+            postprocess_logger.debug("  找到%s（表格索引：%s）", table_info['name'], table_idx)
 
             # 处理第一列（类别列）的纵向合并
             try:
                 merged = merge_vertical_cells(table, 0)
                 total_merged += merged
             except Exception as e:
-                print(f"  处理{table_info['name']}时出错: {e}")
-                import traceback
-                traceback.print_exc()
+                postprocess_logger.warning("  处理%s时出错: %s", table_info['name'], e, exc_info=True)
+            index.table_changed(table)
         else:
-            print(f"  未找到{table_info['name']}，跳过")
+            postprocess_logger.debug("  未找到%s，跳过", table_info['name'])
 
     # 处理范围三各类别的详细表格（如果有）
     # 范围三类别名称映射
@@ -3099,35 +2707,83 @@ def merge_table_vertical_cells(doc, context):
 
         # 只处理有数据的类别
         if (detail_items and len(detail_items) > 0) or (emission_value and emission_value > 0):
-            category_name = category_names.get(cat_num, "")
+            category_name = SCOPE3_CATEGORY_NAMES.get(cat_num, "")
 
-            # 查找对应的表格
-            table_idx = find_table_by_content(doc, [category_name, f'类别{cat_num}'])
+            # 对应的表格：首个提及类别名称或"类别N"的表格（由文档索引按表格缓存）
+            table_idx = index.category_tables()[cat_num].get('mentioned')
 
-            if table_idx is not None and table_idx < len(doc.tables):
-                table = doc.tables[table_idx]
-                print(f"  找到范围三类别{cat_num}表格（表格索引：{table_idx}）")
+            if table_idx is not None and table_idx < len(index.tables):
+                table = index.tables[table_idx]
+                postprocess_logger.debug("  找到范围三类别%s表格（表格索引：%s）", cat_num, table_idx)
 
                 # 处理第一列（类别列）的纵向合并
                 try:
                     merged = merge_vertical_cells(table, 0)
                     total_merged += merged
                 except Exception as e:
-                    print(f"  处理范围三类别{cat_num}表格时出错: {e}")
+                    postprocess_logger.warning("  处理范围三类别%s表格时出错: %s", cat_num, e)
+                index.table_changed(table)
 
-    print(f"  表格纵向合并总计：合并了 {total_merged} 个单元格")
+    postprocess_logger.info("  表格纵向合并总计：合并了 %s 个单元格", total_merged)
 
 
 if __name__ == "__main__":
     import sys
 
+    from report_logging import configure_logging
+
+    # 缓存相关参数：--no-cache 跳过提取结果缓存，--clear-cache 先清空缓存
+    # 调试参数：--debug-snapshots 保存每个后处理步骤的中间文档
+    # 批量参数：--workers N 工作进程数，--timeout S 单个任务的时间限制（秒；卡在 C 扩展中无法中断的任务，
+    #           超时后由主进程强制结束其工作进程）
+    # 剖析参数：--profile 将各步骤的耗时与内存剖析结果写入 <报告名>.profile.json
+    # 日志参数：--log-level LEVEL 日志级别（默认 INFO），--verbose 等同于 --log-level DEBUG
+    option_flags = ('--no-cache', '--clear-cache', '--debug-snapshots', '--profile', '--verbose')
+    value_options = {'--workers': None, '--timeout': None, '--log-level': None}
+    argv = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in value_options:
+            value_options[arg] = next(args, None)
+        elif arg not in option_flags:
+            argv.append(arg)
+    use_cache = '--no-cache' not in sys.argv
+    debug_snapshots = '--debug-snapshots' in sys.argv
+    profile = '--profile' in sys.argv
+    log_level = 'DEBUG' if '--verbose' in sys.argv else (value_options['--log-level'] or 'INFO')
+    configure_logging(log_level)
+    if '--clear-cache' in sys.argv:
+        removed = ContextCache().clear()
+        logger.info("[缓存] 已清空 %s 个缓存条目", removed)
+
     # 检查命令行参数
-    if len(sys.argv) > 1 and sys.argv[1] == '--generate':
+    if len(argv) > 1 and argv[0] == '--batch':
+        # 批量生成模式：目录或清单文件 -> 输出目录
+        from batch import generate_reports
+        workers = value_options['--workers']
+        timeout = value_options['--timeout']
+        results = generate_reports(
+            argv[1],
+            output_dir=argv[2] if len(argv) > 2 else "reports",
+            workers=int(workers) if workers else None,
+            timeout=float(timeout) if timeout else None,
+            use_cache=use_cache,
+            profile=profile,
+            log_level=log_level,
+        )
+        sys.exit(0 if results and all(r.ok for r in results) else 1)
+    elif len(argv) > 0 and argv[0] == '--generate':
         # 生成报告模式
-        xlsx_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_DY_XLSX_NAME
-        output_path = sys.argv[3] if len(sys.argv) > 3 else "carbon_report_v15.docx"
-        generate_report_from_xlsx(xlsx_path=xlsx_path, output_path=output_path)
+        xlsx_path = argv[1] if len(argv) > 1 else DEFAULT_DY_XLSX_NAME
+        output_path = argv[2] if len(argv) > 2 else "carbon_report_v15.docx"
+        generate_report_from_xlsx(xlsx_path=xlsx_path, output_path=output_path,
+                                  use_cache=use_cache, debug_snapshots=debug_snapshots,
+                                  profile_path=profile_path_for(output_path) if profile else None)
     else:
         # 默认执行生成报告
-        print("使用 'python main.py --generate' 生成报告")
-        generate_report_from_xlsx(output_path="carbon_report_v15.docx")
+        print("使用 'python main.py --generate [--no-cache] [--clear-cache] [--debug-snapshots] [--profile] [--log-level LEVEL]' 生成报告")
+        print("批量生成: 'python main.py --batch <目录或清单文件> [输出目录] [--workers N] [--timeout 秒（超时仍未结束的任务会被强制结束）] [--profile]'")
+        output_path = "carbon_report_v15.docx"
+        generate_report_from_xlsx(output_path=output_path,
+                                  use_cache=use_cache, debug_snapshots=debug_snapshots,
+                                  profile_path=profile_path_for(output_path) if profile else None)
@@ -0,0 +1,69 @@
+"""
+日志配置模块
+
+报告生成过程的输出按模块分层记录：
+- data_reader.*：数据提取（如 data_reader.fingerprint、data_reader.readers.scope1）
+- report：报告生成主流程的步骤信息
+- report.context：展示层数据准备
+- report.postprocess：渲染后的文档后处理
+- report.batch：批量生成
+
+INFO 级别只输出步骤和汇总信息，逐行/逐表的明细为 DEBUG 级别。
+日志消息使用 %s 占位符，级别未开启时不会格式化字符串。
+"""
+import logging
+import sys
+from typing import Union
+
+# 需要配置输出的顶层日志名称
+LOGGER_NAMES = ('data_reader', 'report')
+
+DEFAULT_FORMAT = '%(message)s'
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """写入当前 sys.stdout 的处理器（跟随 redirect_stdout，批量任务的日志写入各自的 .log 文件）"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def parse_level(level: Union[int, str]) -> int:
+    """把级别名称（如 'debug'、'INFO'）或数值转换为 logging 级别"""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"未知的日志级别: {level}")
+    return value
+
+
+def configure_logging(level: Union[int, str] = logging.INFO, fmt: str = DEFAULT_FORMAT):
+    """
+    为 data_reader 和 report 日志配置控制台输出（可重复调用，重复调用只更新级别和格式）
+
+    Args:
+        level: 日志级别（数值或名称）
+        fmt: 日志格式，默认只输出消息本身
+    """
+    level = parse_level(level)
+    for name in LOGGER_NAMES:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        handler = next((h for h in logger.handlers if isinstance(h, _StdoutHandler)), None)
+        if handler is None:
+            handler = _StdoutHandler()
+            logger.addHandler(handler)
+        handler.setFormatter(logging.Formatter(fmt))
+        logger.propagate = False
+
+
+__all__ = ['LOGGER_NAMES', 'configure_logging', 'parse_level']
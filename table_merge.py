@@ -0,0 +1,223 @@
+"""
+表格纵向合并模块
+
+对 Word 表格（w:tbl 元素）的指定列，把内容相同的相邻单元格合并为一个（w:vMerge）：
+- 一次遍历读取所有目标列的单元格文本（编译好的 XPath，只取 w:p/w:r/w:t）
+- 识别每列的合并段（连续相同且非空的单元格）
+- 统一设置 vMerge（restart/continue）和居中对齐，返回统计信息，不逐行输出日志
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+
+_W_NS = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+
+_TR = qn('w:tr')
+_TC = qn('w:tc')
+_P = qn('w:p')
+_R = qn('w:r')
+_V_MERGE = qn('w:vMerge')
+_V_ALIGN = qn('w:vAlign')
+_VAL = qn('w:val')
+
+# 单元格文本：直接段落 -> 直接文本运行 -> w:t
+_CELL_TEXT_NODES = etree.XPath('./w:p/w:r/w:t', namespaces=_W_NS)
+
+_EMPTY_P_XML = r'<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>'
+_TEXT_RUN_XML = (r'<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                 r'<w:t xml:space="preserve"></w:t></w:r>')
+
+
+@dataclass
+class MergeStats:
+    """一次合并操作的统计信息"""
+    rows: int = 0                 # 表格总行数
+    groups: int = 0               # 合并段数量
+    merged_cells: int = 0         # 被合并（设置为 continue）的单元格数量
+    skipped_cells: int = 0        # 缺少目标列或文本无法读取的单元格数量
+    columns: Dict[int, int] = field(default_factory=dict)  # 列索引 -> 该列合并的单元格数量
+
+    def __iadd__(self, other: 'MergeStats') -> 'MergeStats':
+        self.rows += other.rows
+        self.groups += other.groups
+        self.merged_cells += other.merged_cells
+        self.skipped_cells += other.skipped_cells
+        for col_idx, count in other.columns.items():
+            self.columns[col_idx] = self.columns.get(col_idx, 0) + count
+        return self
+
+
+def find_merge_runs(texts: Sequence[str], start_row: int = 1) -> List[Tuple[int, int]]:
+    """
+    识别连续相同且非空的单元格段
+
+    Args:
+        texts: 每行的单元格文本（按行号索引）
+        start_row: 开始处理的行（之前的行视为表头）
+
+    Returns:
+        合并段列表 [(起始行, 结束行), ...]，每段至少两行
+    """
+    runs = []
+    group_start = start_row
+    current = None
+    for row_idx in range(start_row, len(texts)):
+        text = texts[row_idx]
+        if current is None:
+            current = text
+            group_start = row_idx
+            continue
+        if text == current and text != "":
+            continue
+        if row_idx - 1 > group_start:
+            runs.append((group_start, row_idx - 1))
+        current = text
+        group_start = row_idx
+
+    if len(texts) - 1 > group_start:
+        runs.append((group_start, len(texts) - 1))
+    return runs
+
+
+def _cell_text(tc) -> Optional[str]:
+    """读取单元格文本（已去除首尾空白），存在空 w:t 时返回 None"""
+    parts = []
+    for t in _CELL_TEXT_NODES(tc):
+        if t.text is None:
+            return None
+        parts.append(t.text)
+    return "".join(parts).strip()
+
+
+def _set_v_merge(tc, value: str):
+    """替换单元格的 vMerge 设置"""
+    tc_pr = tc.get_or_add_tcPr()
+    for old in tc_pr.findall(_V_MERGE):
+        tc_pr.remove(old)
+    v_merge = OxmlElement('w:vMerge')
+    v_merge.set(_VAL, value)
+    tc_pr.append(v_merge)
+
+
+def _clear_runs(tc):
+    """移除单元格中各段落的文本运行"""
+    for p in tc.findall(_P):
+        for r in p.findall(_R):
+            p.remove(r)
+
+
+def _set_merged_text(tc, text: str):
+    """合并段顶部单元格只保留一个段落，并写入合并后的文本"""
+    paragraphs = tc.findall(_P)
+    for p in paragraphs[:-1]:
+        tc.remove(p)
+    if not paragraphs:
+        tc.append(parse_xml(_EMPTY_P_XML))
+
+    p = tc.findall(_P)[0]
+    for r in p.findall(_R):
+        p.remove(r)
+    new_r = parse_xml(_TEXT_RUN_XML)
+    new_r.find(qn('w:t')).text = text
+    p.append(new_r)
+    return p
+
+
+def _center_merged_cell(tc, p):
+    """合并段顶部单元格垂直居中，段落居中"""
+    tc_pr = tc.get_or_add_tcPr()
+    if tc_pr.find(_V_ALIGN) is None:
+        v_align = OxmlElement('w:vAlign')
+        v_align.set(_VAL, 'center')
+        tc_pr.append(v_align)
+
+    jc = OxmlElement('w:jc')
+    jc.set(_VAL, 'center')
+    p.get_or_add_pPr().append(jc)
+
+
+def _center_cell(tc):
+    """单元格垂直居中，所有段落居中"""
+    tc.get_or_add_tcPr().vAlign_val = WD_CELL_VERTICAL_ALIGNMENT.CENTER
+    for p in tc.findall(_P):
+        p.get_or_add_pPr().jc_val = WD_ALIGN_PARAGRAPH.CENTER
+
+
+def merge_table_columns(tbl, columns: Iterable[int] = (0,), start_row: int = 1,
+                        reset_existing: bool = False, align_all: bool = False) -> MergeStats:
+    """
+    纵向合并表格指定列中内容相同的相邻单元格
+
+    Args:
+        tbl: 表格的 w:tbl 元素（python-docx 表格对象的 table._element）
+        columns: 要处理的列（按行内 w:tc 的位置，从0开始）
+        start_row: 开始处理的行，之前的行视为表头
+        reset_existing: 读取文本前先清除目标列已有的 vMerge 设置
+        align_all: 目标列所有单元格都设置居中（默认只设置合并段的顶部单元格）
+
+    Returns:
+        MergeStats 统计信息
+    """
+    columns = sorted(set(columns))
+    rows = [tr.findall(_TC) for tr in tbl.iterchildren(_TR)]
+    stats = MergeStats(rows=len(rows))
+
+    # 第一步：一次遍历读取所有目标列的文本
+    texts: Dict[int, List[str]] = {col_idx: [""] * len(rows) for col_idx in columns}
+    for row_idx, tcs in enumerate(rows):
+        for col_idx in columns:
+            if col_idx >= len(tcs):
+                if row_idx >= start_row:
+                    stats.skipped_cells += 1
+                continue
+            tc = tcs[col_idx]
+            if reset_existing:
+                tc_pr = tc.tcPr
+                if tc_pr is not None:
+                    for old in tc_pr.findall(_V_MERGE):
+                        tc_pr.remove(old)
+            if row_idx < start_row:
+                continue
+            text = _cell_text(tc)
+            if text is None:
+                stats.skipped_cells += 1
+                continue
+            texts[col_idx][row_idx] = text
+
+    # 第二步：识别所有合并段
+    runs = {col_idx: find_merge_runs(texts[col_idx], start_row) for col_idx in columns}
+
+    # 第三步：统一写入 vMerge、合并文本和对齐方式
+    for col_idx in columns:
+        merged = 0
+        for group_start, group_end in runs[col_idx]:
+            top = rows[group_start][col_idx]
+            _set_v_merge(top, 'restart')
+            for row_idx in range(group_start + 1, group_end + 1):
+                tc = rows[row_idx][col_idx]
+                _clear_runs(tc)
+                _set_v_merge(tc, 'continue')
+                merged += 1
+            p = _set_merged_text(top, texts[col_idx][group_start])
+            if not align_all:
+                _center_merged_cell(top, p)
+
+        if align_all:
+            for tcs in rows:
+                if col_idx < len(tcs):
+                    _center_cell(tcs[col_idx])
+
+        stats.groups += len(runs[col_idx])
+        stats.merged_cells += merged
+        stats.columns[col_idx] = merged
+
+    return stats
+
+
+__all__ = ['MergeStats', 'find_merge_runs', 'merge_table_columns']
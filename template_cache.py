@@ -0,0 +1,163 @@
+"""
+模板缓存模块
+
+批量生成报告时同一个 template.docx 会被渲染很多次，这里按模板路径缓存（每个路径只保留
+最新内容的一份，内容的 SHA-256 变化时整体替换，旧的解析和编译结果随之释放）：
+- 解析后的 Document（只解析一次，每次渲染深拷贝一份：lxml 直接复制节点树，
+  不再解析约 1MB 的 XML；图片等二进制部件的字节在副本间共享）
+- patch_xml 清理后的 XML 源码
+- 编译好的 Jinja2 模板对象（按 Jinja2 环境和 XML 源码缓存）
+
+所有模板共用一个 Jinja2 环境，创建时由 jinja2_filters.register_filters 一次性注册全部过滤器。
+"""
+import copy
+import hashlib
+import io
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from docx import Document
+from docxtpl import DocxTemplate
+from jinja2 import Environment, TemplateError
+
+from jinja2_filters import register_filters
+
+
+class _TemplateEntry:
+    """单个模板文件（某一版内容）的缓存数据"""
+
+    __slots__ = ('digest', 'data', 'document', 'patched', 'compiled', '_lock')
+
+    def __init__(self, digest: str, data: bytes):
+        self.digest = digest
+        self.data = data
+        # 解析后的原始 Document（只作为深拷贝的来源，本身从不修改）
+        self.document = None
+        # 原始 XML -> patch_xml 结果
+        self.patched: Dict[str, str] = {}
+        # (Jinja2 环境, XML 源码) -> 编译好的模板
+        self.compiled: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def clone_document(self):
+        """深拷贝解析后的 Document（第一次调用时解析），副本拥有独立的部件和节点树"""
+        with self._lock:
+            if self.document is None:
+                self.document = Document(io.BytesIO(self.data))
+        return copy.deepcopy(self.document)
+
+
+# 模板绝对路径 -> 该路径最新内容的缓存数据
+_TEMPLATE_CACHE: Dict[str, _TemplateEntry] = {}
+_CACHE_LOCK = threading.Lock()
+
+_SHARED_ENV: Optional[Environment] = None
+
+
+def shared_jinja_env() -> Environment:
+    """获取所有模板共用的 Jinja2 环境（首次创建时注册过滤器）"""
+    global _SHARED_ENV
+    if _SHARED_ENV is None:
+        _SHARED_ENV = register_filters(Environment())
+    return _SHARED_ENV
+
+
+class CachedDocxTemplate(DocxTemplate):
+    """复用模板缓存的 DocxTemplate（接口与 DocxTemplate 相同）"""
+
+    def __init__(self, entry: _TemplateEntry):
+        # template_file 只在 docxtpl 的少数路径（未渲染直接保存、分析未声明变量）中使用
+        super().__init__(io.BytesIO(entry.data))
+        self._entry = entry
+
+    def init_docx(self, reload: bool = True):
+        # 与 DocxTemplate.init_docx 相同，只是从缓存的 Document 深拷贝而不是重新解析
+        if not self.docx or (self.is_rendered and reload):
+            self.docx = self._entry.clone_document()
+            self.is_rendered = False
+
+    def patch_xml(self, src_xml):
+        patched = self._entry.patched.get(src_xml)
+        if patched is None:
+            patched = super().patch_xml(src_xml)
+            self._entry.patched[src_xml] = patched
+        return patched
+
+    def render_xml_part(self, src_xml, part, context, jinja_env=None):
+        if jinja_env is None:
+            return super().render_xml_part(src_xml, part, context, jinja_env)
+
+        # 以下与 DocxTemplate.render_xml_part 相同，只是编译结果按环境和源码缓存
+        src_xml = re.sub(r"<w:p([ >])", r"\n<w:p\1", src_xml)
+        try:
+            self.current_rendering_part = part
+            key = (jinja_env, src_xml)
+            template = self._entry.compiled.get(key)
+            if template is None:
+                template = jinja_env.from_string(src_xml)
+                self._entry.compiled[key] = template
+            dst_xml = template.render(context)
+        except TemplateError as exc:
+            if hasattr(exc, "lineno") and exc.lineno is not None:
+                line_number = max(exc.lineno - 4, 0)
+                exc.docx_context = map(
+                    lambda x: re.sub(r"<[^>]+>", "", x),
+                    src_xml.splitlines()[line_number:line_number + 7],
+                )
+            raise exc
+        dst_xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", dst_xml)
+        dst_xml = (
+            dst_xml.replace("{_{", "{{")
+            .replace("}_}", "}}")
+            .replace("{_%", "{%")
+            .replace("%_}", "%}")
+        )
+        return self.resolve_listing(dst_xml)
+
+    def map_tree(self, tree):
+        # 覆盖 docxtpl 0.20.x 的 DocxTemplate.map_tree（root.replace(root.body, tree)），
+        # 依赖其行为：渲染结果整体替换 python-docx CT_Document 下唯一的 w:body，
+        # 旧 body 替换后不再被 docxtpl 使用。升级 docxtpl 时需核对该方法是否变化。
+        # 先清空旧的 body 再替换：直接移除整棵旧 body 时 lxml 需要逐个节点迁移，
+        # 大文档（数万个节点）耗时可达十几秒，clear() 则直接释放
+        root = self.docx._element
+        body = root.body
+        body.clear()
+        root.replace(body, tree)
+
+
+def load_template(template_path: str) -> CachedDocxTemplate:
+    """
+    加载模板（按路径缓存解析和编译结果，文件内容变化时重新解析）
+
+    Args:
+        template_path: 模板文件路径
+
+    Returns:
+        新的 CachedDocxTemplate 实例，已设置共用的 Jinja2 环境（含全部过滤器）
+    """
+    with open(template_path, 'rb') as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+    key = os.path.abspath(template_path)
+
+    with _CACHE_LOCK:
+        entry = _TEMPLATE_CACHE.get(key)
+        if entry is None or entry.digest != digest:
+            entry = _TemplateEntry(digest, data)
+            _TEMPLATE_CACHE[key] = entry
+
+    template = CachedDocxTemplate(entry)
+    template.jinja_env = shared_jinja_env()
+    return template
+
+
+def clear_template_cache():
+    """清空模板缓存"""
+    with _CACHE_LOCK:
+        _TEMPLATE_CACHE.clear()
+
+
+__all__ = ['CachedDocxTemplate', 'clear_template_cache', 'load_template', 'shared_jinja_env']
@@ -0,0 +1,5 @@
+"""测试公共配置：把项目根目录加入 sys.path，使 data_reader、table_merge 等模块可直接导入"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
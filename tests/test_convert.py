@@ -0,0 +1,113 @@
+"""
+单元格值转换测试
+
+to_float / to_str 与原 BaseReader.safe_float / safe_str（下方 legacy_* 参考实现）结果一致，
+to_floats 与逐个 to_float 一致。
+"""
+import datetime
+import math
+from decimal import Decimal
+
+import pytest
+
+from data_reader import utils
+from data_reader.convert import EXCEL_ERRORS, is_error, to_float, to_floats, to_str
+
+_LEGACY_ERRORS = ['#REF!', '#VALUE!', '#DIV/0!', '#NAME?', '#N/A', '#NULL!', '#NUM!']
+
+
+def legacy_safe_float(value):
+    """原 BaseReader.safe_float"""
+    try:
+        if value is None:
+            return 0.0
+        if isinstance(value, str):
+            v_str = value.strip().upper()
+            if v_str in _LEGACY_ERRORS:
+                return 0.0
+            v_str = v_str.replace(',', '')
+            if not v_str:
+                return 0.0
+            return float(v_str)
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def legacy_safe_str(value):
+    """原 BaseReader.safe_str"""
+    if value is None:
+        return ''
+    v_str = str(value).strip()
+    if v_str.upper() in _LEGACY_ERRORS:
+        return ''
+    return v_str
+
+
+CELL_VALUES = [
+    None, 0, 1, -7, 10 ** 20, 0.0, -0.0, 3.25, float('inf'), float('nan'),
+    True, False, Decimal('1.5'),
+    '', '   ', ',', '0', ' 42 ', '-3.5', '+2', '1e3', '1E-2', '1_000', '１２',
+    '1,234', '1,234,567.89', ' -1,000 ', '1,,2', '12,',
+    '#N/A', '#n/a', ' #REF! ', '#DIV/0!', '#VALUE!', '#NAME?', '#NULL!', '#NUM!', '#', '#N/A!',
+    'nan', 'inf', '-Infinity', 'abc', '12abc', '—',
+    datetime.datetime(2025, 1, 2), datetime.date(2025, 1, 2), datetime.time(8, 30),
+    [1], (1,), b'1',
+]
+
+
+def _same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or (a == b and math.copysign(1, a) == math.copysign(1, b))
+
+
+@pytest.mark.parametrize('value', CELL_VALUES, ids=repr)
+def test_to_float_matches_legacy_safe_float(value):
+    result = to_float(value)
+    assert type(result) is float
+    assert _same(result, legacy_safe_float(value))
+
+
+@pytest.mark.parametrize('value', CELL_VALUES, ids=repr)
+def test_to_str_matches_legacy_safe_str(value):
+    assert to_str(value) == legacy_safe_str(value)
+
+
+@pytest.mark.parametrize('value', CELL_VALUES, ids=repr)
+def test_is_error(value):
+    expected = value is not None and str(value).strip().upper() in EXCEL_ERRORS
+    assert is_error(value) == expected
+
+
+def test_to_float_examples():
+    assert to_float('1,234.5') == 1234.5
+    assert to_float('#N/A') == 0.0
+    assert to_float(True) == 1.0
+    assert to_float(False) == 0.0
+    assert to_float(None) == 0.0
+
+
+def test_to_float_default():
+    assert to_float(None, default=-1.0) == -1.0
+    assert to_float('', default=-1.0) == -1.0
+    assert to_float('#REF!', default=-1.0) == -1.0
+    assert to_float(datetime.date(2025, 1, 2), default=-1.0) == -1.0
+    # 可解析的值不使用默认值
+    assert to_float('0', default=-1.0) == 0.0
+    assert to_float(0, default=-1.0) == 0.0
+
+
+def test_to_floats_matches_to_float():
+    values = CELL_VALUES + [5, 2.5, None]
+    result = to_floats(values)
+    assert len(result) == len(values)
+    assert all(_same(r, to_float(v)) for r, v in zip(result, values))
+    assert to_floats([None, 'x', 1], default=-1.0) == [-1.0, -1.0, 1.0]
+    assert to_floats(iter(())) == []
+
+
+def test_utils_safe_float_is_unchanged():
+    # utils.safe_float 是独立的公开函数，不处理千分位逗号
+    assert utils.safe_float('1,234') == 0.0
+    assert utils.safe_float('12.5') == 12.5
+    assert utils.safe_float(None) == 0.0
+    assert utils.safe_float(True) == 1.0
@@ -0,0 +1,175 @@
+"""
+附表2-EF 子表识别与切分测试
+
+classify_subtable 与逐个关键词 `in` 判断的旧实现（下方 legacy_classify）结果一致；
+segment_subtables 的边界、表头文本与逐行扫描的结果一致。
+"""
+import random
+
+from data_reader.readers.emission_factor import classify_subtable, segment_subtables
+from data_reader.workbook_index import SheetIndex
+
+_LEGACY_SCOPE3_KEYWORDS = {
+    '外购商品和服务': 'scope3_cat1',
+    '铁矿石': 'scope3_cat1',
+    '资本货物': 'scope3_cat2',
+    '燃料和能源相关': 'scope3_cat3',
+    '上下游运输配送': 'scope3_cat4',
+    '运营中产生的废物': 'scope3_cat5',
+    '商务旅行': 'scope3_cat6',
+    '员工通勤': 'scope3_cat7',
+    '上游租赁资产': 'scope3_cat8',
+    '下游运输配送': 'scope3_cat9',
+    '外销产品加工': 'scope3_cat10',
+    '外销产品使用': 'scope3_cat11',
+    '外售产品报废': 'scope3_cat12',
+}
+
+
+def legacy_classify(all_text):
+    """旧版 EmissionFactorReader._identify_subtable_type 的判断顺序"""
+    for cat_num in range(15, 0, -1):
+        if (f'范围三 类别{cat_num}' in all_text or f'范围三类别{cat_num}' in all_text
+                or f'范围3 类别{cat_num}' in all_text):
+            return f'scope3_cat{cat_num}'
+    if '范围二' in all_text or '范围2' in all_text:
+        return 'scope2'
+    if '范围一' in all_text or '范围1' in all_text:
+        if '低位发热量' in all_text and '氧化率' in all_text:
+            return 'combustion'
+        elif '制程排放' in all_text or '工艺排放' in all_text:
+            return 'process'
+        elif '逸散排放' in all_text or 'HFCs/PFCs' in all_text:
+            return 'fugitive'
+        return 'scope1_combustion'
+    if '低位发热量' in all_text and '氧化率' in all_text:
+        return 'combustion'
+    elif 'CO2排放因子' in all_text and '制程排放' in all_text:
+        return 'process'
+    elif 'HFCs/PFCs' in all_text or 'MCF' in all_text or 'Bo' in all_text:
+        return 'fugitive'
+    elif '外购能源间接排放' in all_text:
+        return 'scope2'
+    for keyword, subtable_type in _LEGACY_SCOPE3_KEYWORDS.items():
+        if keyword in all_text:
+            return subtable_type
+    return 'unknown'
+
+
+def test_classify_explicit_scope3_categories():
+    assert classify_subtable('编号 范围三 类别1 外购商品') == 'scope3_cat1'
+    assert classify_subtable('范围三类别15 报废') == 'scope3_cat15'
+    assert classify_subtable('范围3 类别12') == 'scope3_cat12'
+    # "类别16" 不是合法类别，但按子串语义包含 "类别1"
+    assert classify_subtable('范围三 类别16') == 'scope3_cat1'
+    # 多个类别时取编号最大的
+    assert classify_subtable('范围三 类别2 范围三 类别11') == 'scope3_cat11'
+    assert classify_subtable('范围三 类别0') == 'unknown'
+
+
+def test_classify_scope_priority():
+    assert classify_subtable('范围二 外购电力 范围一') == 'scope2'
+    assert classify_subtable('范围一 低位发热量 氧化率') == 'combustion'
+    assert classify_subtable('范围一 工艺排放') == 'process'
+    assert classify_subtable('范围1 HFCs/PFCs') == 'fugitive'
+    assert classify_subtable('范围一 其他') == 'scope1_combustion'
+    assert classify_subtable('低位发热量 氧化率 范围三 类别3') == 'scope3_cat3'
+
+
+def test_classify_legacy_keywords():
+    assert classify_subtable('CO2排放因子 制程排放') == 'process'
+    assert classify_subtable('CO2排放因子') == 'unknown'
+    assert classify_subtable('MCF Bo') == 'fugitive'
+    assert classify_subtable('外购能源间接排放') == 'scope2'
+    assert classify_subtable('铁矿石 资本货物') == 'scope3_cat1'
+    assert classify_subtable('外售产品报废') == 'scope3_cat12'
+    assert classify_subtable('') == 'unknown'
+
+
+def test_classify_matches_legacy_on_random_headers():
+    fragments = [
+        '范围三 类别', '范围三类别', '范围3 类别', '范围三', '类别', '1', '5', '10', '15', '16', '0',
+        '范围二', '范围2', '范围一', '范围1', '低位发热量', '氧化率', '制程排放', '工艺排放',
+        '逸散排放', 'HFCs/PFCs', 'CO2排放因子', 'MCF', 'B', 'o', '外购能源间接排放',
+        ' ', '编号', '单位',
+    ] + list(_LEGACY_SCOPE3_KEYWORDS)
+    rng = random.Random(20261018)
+    for _ in range(3000):
+        text = ''.join(rng.choice(fragments) for _ in range(rng.randint(0, 8)))
+        assert classify_subtable(text) == legacy_classify(text), text
+
+
+def _sheet(rows, width=8):
+    return SheetIndex('附表2-EF', tuple(tuple(row) + (None,) * (width - len(row)) for row in rows))
+
+
+def _row_text(row, limit=None):
+    values = row if limit is None else row[:limit]
+    return ' '.join('' if v is None else str(v).strip() for v in values)
+
+
+def legacy_segments(sheet):
+    """逐行扫描的参考实现：(开始行, 结束行, 表头文本)"""
+    starts = [i for i, row in enumerate(sheet.iter_values(), start=1)
+              if any(v and str(v).strip() == '编号' for v in row)]
+    result = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else sheet.max_row + 1
+        texts = [_row_text(row) for row in sheet.iter_values(start, min(start + 4, end - 1))]
+        for row in sheet.iter_values(start + 2, min(start + 9, end - 1)):
+            try:
+                float(row[1] if row[1] is not None else '')
+            except (ValueError, TypeError):
+                continue
+            texts.append(_row_text(row, 8))
+            break
+        result.append((start, end, ' '.join(texts)))
+    return result
+
+
+def test_segment_boundaries_and_types():
+    rows = [
+        ('附表2 排放因子',),
+        ('范围一 固定燃烧', '编号', '燃料', '低位发热量', '氧化率'),
+        (None, '', '', 'GJ/t', '%'),
+        (None, 1, '原煤', 20.9, 0.98),
+        (None, 2, '焦炭', 28.4, 0.93),
+        ('范围二', '编号', '能源'),
+        (None, 1, '外购电力'),
+        ('范围三 类别4', ' 编号 ', '运输方式'),
+        (None, '说明'),
+        (None, '3', '公路'),
+    ]
+    sheet = _sheet(rows)
+    subtables = segment_subtables(sheet)
+
+    assert [(s.start, s.end, s.header_text) for s in subtables] == legacy_segments(sheet)
+    assert [s.type for s in subtables] == ['combustion', 'scope2', 'scope3_cat4']
+    assert [s.data_start for s in subtables] == [4, 7, 10]
+    assert [s.has_combustion_format for s in subtables] == [True, False, False]
+    # 最后一个子表延伸到工作表末尾
+    assert subtables[-1].end == sheet.max_row + 1
+
+
+def test_segment_without_starts_and_adjacent_starts():
+    assert segment_subtables(_sheet([('无子表',), (None, 1)])) == []
+
+    # 相邻的两个开始行：前一个子表只有表头行，没有数据行
+    sheet = _sheet([('编号', '范围二'), ('编号', '范围一'), (None, 1)])
+    subtables = segment_subtables(sheet)
+    assert [(s.start, s.end, s.header_text) for s in subtables] == legacy_segments(sheet)
+    assert [s.type for s in subtables] == ['scope2', 'scope1_combustion']
+
+
+def test_segment_matches_reference_on_random_sheets():
+    cells = [None, '', '编号', ' 编号', '编号说明', 1, '2', 3.5, 'x', '范围二', '范围一',
+             '范围三 类别7', '低位发热量', '氧化率', 'MCF']
+    rng = random.Random(7)
+    for _ in range(300):
+        width = rng.randint(2, 6)
+        rows = [tuple(rng.choice(cells) for _ in range(width)) for _ in range(rng.randint(1, 25))]
+        sheet = _sheet(rows, width)
+        subtables = segment_subtables(sheet)
+        expected = legacy_segments(sheet)
+        assert [(s.start, s.end, s.header_text) for s in subtables] == expected, rows
+        assert [s.type for s in subtables] == [legacy_classify(text) for _, _, text in expected]
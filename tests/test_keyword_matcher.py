@@ -0,0 +1,79 @@
+"""
+KeywordMatcher 等价性测试
+
+结果必须与逐个 `keyword in text` 完全一致（包括重叠、互为前缀的关键词）。
+"""
+import random
+
+from data_reader.utils import KeywordMatcher
+
+
+def naive_find_all(keywords, text):
+    return {k for k in keywords if k and k in text}
+
+
+def test_empty_keyword_list_matches_nothing():
+    matcher = KeywordMatcher([])
+    assert matcher.keywords == ()
+    assert not matcher.search('类别1')
+    assert matcher.find_all('类别1') == set()
+    assert matcher.find_all('') == set()
+
+
+def test_empty_keywords_are_ignored():
+    matcher = KeywordMatcher(['', '合计', ''])
+    assert matcher.keywords == ('合计',)
+    # '' in text 恒为真，匹配器不把它当作命中
+    assert matcher.find_all('无关文本') == set()
+    assert matcher.find_all('本页合计') == {'合计'}
+
+
+def test_duplicate_keywords_are_deduplicated():
+    matcher = KeywordMatcher(['小计', '小计', '合计'])
+    assert matcher.keywords == ('小计', '合计')
+    assert matcher.find_all('小计与合计') == {'小计', '合计'}
+
+
+def test_category_prefix_keywords():
+    # 子串语义：'类别15' 同时包含 '类别1'，与 `in` 一致
+    matcher = KeywordMatcher(['类别1', '类别15', '类别5'])
+    assert matcher.find_all('类别15') == {'类别1', '类别15'}
+    assert matcher.find_all('类别1') == {'类别1'}
+    assert matcher.find_all('范围三 类别5 运输') == {'类别5'}
+    assert matcher.find_all('类别2') == set()
+
+
+def test_overlapping_and_nested_keywords():
+    keywords = ['he', 'she', 'his', 'hers', 'ers', 's']
+    matcher = KeywordMatcher(keywords)
+    for text in ['ushers', 'shis', 'hershe', 'h', '']:
+        assert matcher.find_all(text) == naive_find_all(keywords, text)
+
+
+def test_regex_metacharacters_are_literal():
+    keywords = ['3.1.', '3.1 ', '(a)', 'a|b']
+    matcher = KeywordMatcher(keywords)
+    assert matcher.find_all('3x1x') == set()
+    assert matcher.find_all('见 3.1. 与 (a)') == {'3.1.', '(a)'}
+    assert matcher.find_all('ab') == set()
+    assert matcher.find_all('a|b') == {'a|b'}
+
+
+def test_search_agrees_with_find_all():
+    matcher = KeywordMatcher(['合计', 'Total', 'Sum'])
+    for text in ['合计', 'Grand Total', 'sum', '', '总 计']:
+        assert matcher.search(text) == bool(matcher.find_all(text))
+
+
+def test_random_equivalence_with_in():
+    rng = random.Random(20261018)
+    alphabet = 'ab类别1 5.'
+    for _ in range(300):
+        keywords = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 4)))
+                    for _ in range(rng.randint(0, 8))]
+        matcher = KeywordMatcher(keywords)
+        for _ in range(20):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            expected = naive_find_all(keywords, text)
+            assert matcher.find_all(text) == expected, (keywords, text)
+            assert matcher.search(text) == bool(expected), (keywords, text)
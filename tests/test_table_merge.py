@@ -0,0 +1,93 @@
+"""
+表格纵向合并测试
+
+find_merge_runs 与按 itertools.groupby 分组的参考实现一致；merge_table_columns 写入正确的 vMerge。
+"""
+import itertools
+import random
+
+import pytest
+from docx import Document
+from docx.oxml.ns import qn
+
+from table_merge import find_merge_runs, merge_table_columns
+
+
+def naive_runs(texts, start_row=1):
+    runs = []
+    row_idx = start_row
+    for text, group in itertools.groupby(texts[start_row:]):
+        size = len(list(group))
+        if text != "" and size > 1:
+            runs.append((row_idx, row_idx + size - 1))
+        row_idx += size
+    return runs
+
+
+@pytest.mark.parametrize('texts, start_row, expected', [
+    ([], 1, []),
+    (['表头'], 1, []),
+    (['表头', 'A'], 1, []),                       # 只有一行数据
+    (['表头', 'A', 'A'], 1, [(1, 2)]),            # 末尾的合并段
+    (['表头', 'A', 'B', 'B', 'B'], 1, [(2, 4)]),
+    (['表头', 'A', 'A', 'B', 'A', 'A'], 1, [(1, 2), (4, 5)]),
+    (['表头', '', '', 'A'], 1, []),               # 空单元格不合并
+    (['表头', 'A', '', 'A'], 1, []),
+    (['A', 'A', 'A'], 1, [(1, 2)]),               # 表头行不参与合并
+    (['A', 'A', 'A'], 0, [(0, 2)]),
+    (['h1', 'h2', 'A', 'A'], 2, [(2, 3)]),
+    (['表头', 'A'], 5, []),                       # start_row 超出行数
+])
+def test_find_merge_runs_cases(texts, start_row, expected):
+    assert find_merge_runs(texts, start_row) == expected
+    assert naive_runs(texts, start_row) == expected
+
+
+def test_find_merge_runs_matches_groupby_reference():
+    rng = random.Random(13)
+    for _ in range(2000):
+        texts = [rng.choice(['', 'A', 'B', 'C']) for _ in range(rng.randint(0, 12))]
+        start_row = rng.randint(0, 3)
+        assert find_merge_runs(texts, start_row) == naive_runs(texts, start_row), (texts, start_row)
+
+
+def _v_merge(tc):
+    tc_pr = tc.tcPr
+    v_merge = tc_pr.find(qn('w:vMerge')) if tc_pr is not None else None
+    return None if v_merge is None else v_merge.get(qn('w:val'))
+
+
+def test_merge_table_columns_sets_v_merge():
+    doc = Document()
+    values = [('类别', '数值'), ('甲', '1'), ('甲', '2'), ('乙', '3'), ('丙', '4'), ('丙', '5')]
+    table = doc.add_table(rows=len(values), cols=2)
+    for row, row_values in zip(table.rows, values):
+        for cell, value in zip(row.cells, row_values):
+            cell.text = value
+
+    stats = merge_table_columns(table._element, columns=[0], start_row=1)
+
+    assert (stats.rows, stats.groups, stats.merged_cells, stats.skipped_cells) == (6, 2, 2, 0)
+    assert stats.columns == {0: 2}
+    # 直接读取 w:tc（row.cells 会把纵向合并的续接单元格映射到顶部单元格）
+    rows = [tr.findall(qn('w:tc')) for tr in table._element.findall(qn('w:tr'))]
+    assert [_v_merge(tcs[0]) for tcs in rows] == [None, 'restart', 'continue', None, 'restart', 'continue']
+    # 合并段顶部保留文本，续接单元格清空文本
+    assert [tcs[0].xpath('string(.)') for tcs in rows] == ['类别', '甲', '', '乙', '丙', '']
+    # 未指定的列不受影响
+    assert all(_v_merge(tcs[1]) is None for tcs in rows)
+
+
+def test_merge_table_columns_skips_short_rows():
+    doc = Document()
+    table = doc.add_table(rows=3, cols=2)
+    for row, value in zip(table.rows, ['表头', 'A', 'A']):
+        row.cells[0].text = value
+    # 第3行缺少第2列
+    last_tr = table._element.findall(qn('w:tr'))[2]
+    last_tr.remove(last_tr.findall(qn('w:tc'))[1])
+
+    stats = merge_table_columns(table._element, columns=[0, 1], start_row=1)
+
+    assert stats.skipped_cells == 1
+    assert stats.columns == {0: 1, 1: 0}
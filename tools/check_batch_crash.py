@@ -0,0 +1,67 @@
+"""
+检查批量生成在工作进程崩溃和任务卡死时的行为
+
+用替身代替 generate_report_from_xlsx（需要 fork 方式启动工作进程，仅限 Linux/macOS）：
+- crash.xlsx：执行中途 os._exit 杀掉所在的工作进程
+- hang.xlsx：屏蔽 SIGALRM 后长时间阻塞（模拟卡在 C 扩展中，进程内超时无法中断）
+- 其余任务：正常完成
+
+期望：只有 crash 记为 failed，hang 记为 timeout，其余任务全部成功。
+
+用法（在项目根目录运行）：
+    python tools/check_batch_crash.py
+"""
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+import main
+
+
+def fake_generate(xlsx_path, output_path, **kwargs):
+    name = os.path.basename(xlsx_path)
+    time.sleep(0.5)
+    if name.startswith('crash'):
+        os._exit(1)
+    if name.startswith('hang'):
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(60)
+    with open(output_path, 'w') as fh:
+        fh.write('ok')
+
+
+def main_check():
+    multiprocessing.set_start_method('fork', force=True)
+    main.generate_report_from_xlsx = fake_generate
+    batch._KILL_GRACE_SECONDS = 1.0
+
+    work_dir = tempfile.mkdtemp(prefix='batch_crash_')
+    names = ['a', 'b', 'crash', 'c', 'd', 'hang', 'e', 'f']
+    jobs = [batch.BatchJob(os.path.join(work_dir, f'{name}.xlsx'),
+                           os.path.join(work_dir, 'out', f'{name}.docx')) for name in names]
+
+    start = time.perf_counter()
+    results = batch.run_batch(jobs, workers=3, timeout=2.0, use_cache=False)
+    elapsed = time.perf_counter() - start
+
+    expected = {'crash': 'failed', 'hang': 'timeout'}
+    ok = True
+    for name, result in zip(names, results):
+        want = expected.get(name, 'ok')
+        status = result.status if result else None
+        mark = '✓' if status == want else '✗'
+        ok &= status == want
+        print(f"{mark} {name}: {status}（期望 {want}）{(result.error or '') if result else ''}")
+    print(f"耗时 {elapsed:.1f} 秒")
+    print("通过" if ok else "未通过")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main_check())